@@ -0,0 +1,111 @@
+"""
+Build time, memory footprint and lookup latency of the autocomplete index.
+
+Generates random lowercase words with a Zipf-like length distribution,
+packs them into a `PrefixIndex` and measures `complete` for prefixes
+of 1-4 chars taken from the indexed words, then the same lookups
+with a full overlay of pending changes.
+
+Usage:
+    python -m benchmarks.bench_autocomplete [--words N] [--lookups N] [--limit N]
+"""
+import argparse
+import os
+import random
+import string
+import time
+import tracemalloc
+
+os.environ.setdefault('DB_CONNECTION_STRING', 'postgresql+asyncpg://localhost/postgres')
+
+from gtservice.logic.autocomplete import PackedWords, PrefixIndex  # noqa: E402
+
+
+def _generate_words(count: int, seed: int) -> list[bytes]:
+    rnd = random.Random(seed)
+    letters = string.ascii_lowercase.encode()
+    lengths = list(range(2, 17))
+    weights = [1 / (abs(length - 8) + 1) for length in lengths]
+
+    words = set()
+    while len(words) < count:
+        for length in rnd.choices(lengths, weights, k=count - len(words)):
+            words.add(bytes(rnd.choices(letters, k=length)))
+
+    return sorted(words)
+
+
+def _percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    return ' '.join(
+        f'p{q * 100:g}={samples[int(q * (len(samples) - 1))] * 1e6:8.1f}us'
+        for q in (0.5, 0.9, 0.99, 0.999)
+    )
+
+
+def _measure_lookups(index: PrefixIndex, prefixes: list[str], limit: int) -> str:
+    samples = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.complete(prefix, limit)
+        samples.append(time.perf_counter() - started)
+
+    return _percentiles(samples)
+
+
+def run(words_count: int, lookups: int, limit: int, overlay: int):
+    started = time.perf_counter()
+    words = _generate_words(words_count, seed=42)
+    print(f'generated {len(words)} words in {time.perf_counter() - started:.1f}s')
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = PrefixIndex(PackedWords(words))
+    build_time = time.perf_counter() - started
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    raw_size = sum(map(len, words))
+    print(f'packed in {build_time:.1f}s')
+    print(
+        f'index memory {index.memory_usage() / 2 ** 20:.1f} MiB '
+        f'({index.memory_usage() / len(index):.1f} B/word, '
+        f'{raw_size / 2 ** 20:.1f} MiB of word bytes), traced {traced / 2 ** 20:.1f} MiB'
+    )
+
+    rnd = random.Random(7)
+    sampled = [rnd.choice(words).decode() for _ in range(lookups)]
+    for length in (1, 2, 3, 4):
+        prefixes = [word[:length] for word in sampled]
+        print(f'prefix {length} chars, limit {limit}:      '
+              f'{_measure_lookups(index, prefixes, limit)}')
+
+    started = time.perf_counter()
+    for word in sampled[:overlay // 2]:
+        index.remove(word)
+    for word in _generate_words(overlay // 2, seed=1):
+        index.add(word.decode() + 'x')
+    print(f'{index.overlay_size} overlay changes applied in '
+          f'{(time.perf_counter() - started) / max(index.overlay_size, 1) * 1e6:.1f}us each')
+
+    prefixes = [word[:3] for word in sampled]
+    print(f'prefix 3 chars with overlay:      {_measure_lookups(index, prefixes, limit)}')
+
+    started = time.perf_counter()
+    PrefixIndex.merge(*index.snapshot())
+    print(f'overlay compacted in {time.perf_counter() - started:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--words', type=int, default=10_000_000)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--overlay', type=int, default=10_000)
+    args = parser.parse_args()
+
+    run(args.words, args.lookups, args.limit, args.overlay)
+
+
+if __name__ == '__main__':
+    main()
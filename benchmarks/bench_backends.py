@@ -0,0 +1,164 @@
+"""
+Word lookup latency on Postgres (asyncpg) and SQLite (aiosqlite).
+
+Fills each database with the same random words, every word with
+translations, synonyms, definitions and examples, then measures
+`WordModel.get_full_word` the way `get_text` runs it: a fresh session
+from the pool per lookup. Lookups run one at a time for latency
+and from concurrent tasks for throughput.
+
+The benchmark drops and recreates all tables, point it at scratch databases.
+
+Usage:
+    python -m benchmarks.bench_backends [--postgres DSN] [--sqlite PATH]
+        [--words N] [--lookups N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import time
+
+os.environ.setdefault('DB_CONNECTION_STRING', 'postgresql+asyncpg://localhost/postgres')
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker  # noqa: E402
+
+from gtservice.db import _create_engine  # noqa: E402
+from gtservice.db.common import Base  # noqa: E402
+from gtservice.db.models import WordModel  # noqa: E402
+from gtservice.logic.translation import merge_translation  # noqa: E402
+from gtservice.translation_loader.schemas import (  # noqa: E402
+    TextSchema, TranslatedWordSchema, WordSchema
+)
+
+SEED_BATCH_SIZE = 500
+
+
+def _random_word(rnd: random.Random) -> str:
+    return ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 12)))
+
+
+def _generate_words(count: int, seed: int) -> list[TranslatedWordSchema]:
+    rnd = random.Random(seed)
+    headwords = set()
+    while len(headwords) < count:
+        headwords.add(_random_word(rnd))
+
+    return [
+        TranslatedWordSchema(
+            word=WordSchema(word, 'en'),
+            translation_language='ru',
+            translations=[WordSchema(_random_word(rnd), 'ru') for _ in range(3)],
+            synonyms=[WordSchema(_random_word(rnd), 'en') for _ in range(3)],
+            definitions=[
+                TextSchema(' '.join(_random_word(rnd) for _ in range(8))) for _ in range(2)
+            ],
+            examples=[
+                TextSchema(' '.join(_random_word(rnd) for _ in range(8))) for _ in range(2)
+            ],
+        )
+        for word in sorted(headwords)
+    ]
+
+
+async def _seed(engine: AsyncEngine, words: list[TranslatedWordSchema]):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine)
+    for start in range(0, len(words), SEED_BATCH_SIZE):
+        async with session_factory() as session:
+            for info in words[start:start + SEED_BATCH_SIZE]:
+                await merge_translation(session, info)
+            await session.commit()
+
+
+def _percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    return ' '.join(
+        f'p{q * 100:g}={samples[int(q * (len(samples) - 1))] * 1e6:8.1f}us'
+        for q in (0.5, 0.9, 0.99)
+    )
+
+
+async def _lookup(session_factory: async_sessionmaker, word: str) -> float:
+    started = time.perf_counter()
+    async with session_factory() as session:
+        word_model = await WordModel.get_full_word(session, word, 'en')
+        assert word_model is not None and word_model.translations
+    return time.perf_counter() - started
+
+
+async def _measure(
+        name: str, engine: AsyncEngine, lookups: list[str], concurrency: int
+):
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    # Warm up the pool, the statement caches and the page cache
+    for word in lookups[:200]:
+        await _lookup(session_factory, word)
+
+    samples = [await _lookup(session_factory, word) for word in lookups]
+    print(f'{name:<10} sequential  {_percentiles(samples)}')
+
+    queue = list(lookups)
+    concurrent_samples = []
+
+    async def worker():
+        while queue:
+            concurrent_samples.append(await _lookup(session_factory, queue.pop()))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(
+        f'{name:<10} {concurrency:2d} tasks    {_percentiles(concurrent_samples)} '
+        f'{len(lookups) / elapsed:8.0f} lookups/s'
+    )
+
+
+async def run(
+        postgres: str | None,
+        sqlite_path: str | None,
+        words_count: int,
+        lookups_count: int,
+        concurrency: int,
+):
+    backends = []
+    if postgres:
+        backends.append(('postgres', postgres))
+    if sqlite_path:
+        backends.append(('sqlite', f'sqlite+aiosqlite:///{sqlite_path}'))
+
+    words = _generate_words(words_count, seed=42)
+    rnd = random.Random(7)
+    lookups = [rnd.choice(words).word.word for _ in range(lookups_count)]
+
+    for name, dsn in backends:
+        engine = _create_engine(dsn)
+        try:
+            started = time.perf_counter()
+            await _seed(engine, words)
+            print(f'{name:<10} seeded {len(words)} words in {time.perf_counter() - started:.1f}s')
+            await _measure(name, engine, lookups, concurrency)
+        finally:
+            await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--postgres', default=None, help='postgresql+asyncpg DSN')
+    parser.add_argument('--sqlite', default=None, help='database file path')
+    parser.add_argument('--words', type=int, default=10_000)
+    parser.add_argument('--lookups', type=int, default=5_000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(run(
+        args.postgres, args.sqlite, args.words, args.lookups, args.concurrency
+    ))
+
+
+if __name__ == '__main__':
+    main()
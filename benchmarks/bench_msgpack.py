@@ -0,0 +1,121 @@
+"""
+Encode and decode time and payload size of list pages as JSON and MessagePack.
+
+Builds `TranslatedWordsListResponse` pages of random words shaped like stored
+ones and renders them the way the API does: JSON through FastAPI's default
+response serialization and through the pydantic adapter, MessagePack through
+`msgpack_response`. Decoding is measured the way a client would do it.
+
+Usage:
+    python -m benchmarks.bench_msgpack [--page-size N] [--iterations N]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import time
+
+os.environ.setdefault('DB_CONNECTION_STRING', 'postgresql+asyncpg://localhost/postgres')
+
+import msgpack  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from gtservice.api.negotiation import msgpack_response  # noqa: E402
+from gtservice.api.translations import (  # noqa: E402
+    TranslatedWordResponse, TranslatedWordsListResponse, _LIST_RESPONSE_ADAPTER
+)
+from gtservice.logic.counting import CountMode  # noqa: E402
+from gtservice.translation_loader.schemas import TextSchema, WordSchema  # noqa: E402
+
+
+def _random_text(rnd: random.Random, words: int) -> str:
+    return ' '.join(
+        ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(2, 10)))
+        for _ in range(words)
+    )
+
+
+def _make_page(page_size: int, seed: int) -> TranslatedWordsListResponse:
+    rnd = random.Random(seed)
+    results = [
+        TranslatedWordResponse(
+            word=_random_text(rnd, 1),
+            language='en',
+            translations=[
+                WordSchema('слово' * rnd.randint(1, 2), 'ru')
+                for _ in range(rnd.randint(3, 8))
+            ],
+            synonyms=[
+                WordSchema(_random_text(rnd, 1), 'en') for _ in range(rnd.randint(3, 10))
+            ],
+            definitions=[
+                TextSchema(_random_text(rnd, rnd.randint(6, 15))) for _ in range(3)
+            ],
+            examples=[
+                TextSchema(_random_text(rnd, rnd.randint(6, 15))) for _ in range(3)
+            ],
+        )
+        for _ in range(page_size)
+    ]
+    return TranslatedWordsListResponse(
+        page=1,
+        page_size=page_size,
+        total_pages=100,
+        count=page_size * 100,
+        count_mode=CountMode.EXACT,
+        has_next=True,
+        results=results,
+    )
+
+
+def _fastapi_json(page: TranslatedWordsListResponse) -> bytes:
+    # What FastAPI does with a returned model: validate, serialize, dump
+    validated = _LIST_RESPONSE_ADAPTER.validate_python(page)
+    return JSONResponse(_LIST_RESPONSE_ADAPTER.dump_python(validated, mode='json')).body
+
+
+def _adapter_json(page: TranslatedWordsListResponse) -> bytes:
+    return _LIST_RESPONSE_ADAPTER.dump_json(page)
+
+
+def _msgpack(page: TranslatedWordsListResponse) -> bytes:
+    return msgpack_response(_LIST_RESPONSE_ADAPTER, page).body
+
+
+def _measure(func, arg, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - started) / iterations
+
+
+def run(page_size: int, iterations: int):
+    page = _make_page(page_size, seed=42)
+
+    print(f'{page_size} words per page, {iterations} iterations')
+    for name, encode, decode in (
+        ('json (fastapi default)', _fastapi_json, json.loads),
+        ('json (pydantic adapter)', _adapter_json, json.loads),
+        ('msgpack', _msgpack, msgpack.unpackb),
+    ):
+        body = encode(page)
+        encode_time = _measure(encode, page, iterations)
+        decode_time = _measure(decode, body, iterations)
+        print(
+            f'{name:<24} {len(body):8d} B '
+            f'encode {encode_time * 1e6:8.1f}us  decode {decode_time * 1e6:8.1f}us'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    run(args.page_size, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Per-request statement overhead of the hot word queries.
+
+Compares building the `get_full_word` / list statements on every request
+(as it used to be done) with executing the module-level bound statements.
+Offline part needs no database: it measures statement construction,
+cache key generation and SQL compilation for the asyncpg dialect.
+
+With --dsn it also runs `WordModel.get_full_word` against a live Postgres
+with the asyncpg prepared statement cache enabled and disabled,
+which shows the server-side parse/plan time saved by prepared statements.
+
+Usage:
+    python -m benchmarks.bench_statement_cache [--iterations N] [--dsn DSN]
+"""
+import argparse
+import asyncio
+import os
+import timeit
+
+os.environ.setdefault('DB_CONNECTION_STRING', 'postgresql+asyncpg://localhost/postgres')
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from gtservice.db.models import WordModel, _FULL_WORD_QUERY  # noqa: E402
+
+
+def _build_full_word_query(word: str, language: str):
+    return (
+        select(WordModel)
+        .options(selectinload(WordModel.translations))
+        .options(selectinload(WordModel.synonyms))
+        .options(selectinload(WordModel.examples))
+        .options(selectinload(WordModel.definitions))
+        .filter(
+            WordModel.normalized == word,
+            WordModel.language == language
+        )
+    )
+
+
+def _report(name: str, seconds: float, iterations: int):
+    print(f'{name:<48} {seconds / iterations * 1e6:10.2f} us/request')
+
+
+def run_offline(iterations: int):
+    dialect = asyncpg_dialect()
+
+    rebuilt = timeit.timeit(
+        lambda: _build_full_word_query('interesting', 'en')._generate_cache_key(),
+        number=iterations,
+    )
+    prebuilt = timeit.timeit(
+        lambda: _FULL_WORD_QUERY._generate_cache_key(),
+        number=iterations,
+    )
+    compiled = timeit.timeit(
+        lambda: _build_full_word_query('interesting', 'en').compile(dialect=dialect),
+        number=iterations,
+    )
+
+    print('Statement construction + cache key (compiled cache hit)')
+    _report('  rebuilt select() with loader options', rebuilt, iterations)
+    _report('  module-level bound statement', prebuilt, iterations)
+    _report('  saved', rebuilt - prebuilt, iterations)
+    print('Compilation on a compiled cache miss')
+    _report('  rebuilt select() compiled from scratch', compiled, iterations)
+
+
+async def run_online(dsn: str, iterations: int):
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+    print('get_full_word round trips against', dsn)
+    for cache_size in (100, 0):
+        eng = create_async_engine(
+            dsn, connect_args={'prepared_statement_cache_size': cache_size}
+        )
+        async with AsyncSession(eng) as session:
+            await WordModel.get_full_word(session, 'interesting', 'en')
+
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(iterations):
+                await WordModel.get_full_word(session, 'interesting', 'en')
+            elapsed = loop.time() - start
+
+        await eng.dispose()
+        _report(f'  prepared_statement_cache_size={cache_size}', elapsed, iterations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=10_000)
+    parser.add_argument('--dsn', default=None)
+    args = parser.parse_args()
+
+    run_offline(args.iterations)
+    if args.dsn:
+        asyncio.run(run_online(args.dsn, max(args.iterations // 10, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from gtservice import settings
+
+T = TypeVar('T')
+
+
+class OverloadedError(Exception):
+    """
+    The request can't be served in time, the client should retry later
+    """
+
+    def __init__(self, message: str, retry_after: int | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after or settings.ADMISSION_RETRY_AFTER
+
+
+class DeadlineExceededError(OverloadedError):
+    pass
+
+
+class Deadline:
+    """
+    Time budget of one request, shared by pool acquires, queueing
+    and upstream calls made on its behalf
+    """
+
+    def __init__(self, seconds: float):
+        self._expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self._expires_at - time.monotonic(), 0.0)
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError('Request deadline exceeded')
+
+
+class MissAdmission:
+    """
+    Per-worker admission of upstream-bound requests (misses).
+    At most `max_in_flight` misses run at once and at most `max_queued`
+    wait for a slot, the rest are rejected right away. Hits never pass
+    through here, and keeping `max_in_flight` below the DB pool size
+    leaves them pool connections even when misses pile up.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int):
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._max_queued = max_queued
+        self._queued = 0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @asynccontextmanager
+    async def admit(self, deadline: Deadline):
+        if self._semaphore.locked() and self._queued >= self._max_queued:
+            raise OverloadedError('Too many requests waiting for upstream')
+
+        self._queued += 1
+        try:
+            await deadline.run(self._semaphore.acquire())
+        finally:
+            self._queued -= 1
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+miss_admission = MissAdmission(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT_MISSES,
+    max_queued=settings.ADMISSION_MAX_QUEUED_MISSES,
+)
@@ -0,0 +1,74 @@
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic.dataclasses import dataclass
+
+from gtservice import settings
+from gtservice.api.translations import WORD_INPUT_PARAMS
+from gtservice.logic.autocomplete import autocomplete_index
+from gtservice.translation_loader.schemas import Language, normalize_word
+
+router = APIRouter(prefix='/autocomplete', tags=['autocomplete'])
+
+
+@dataclass
+class AutocompleteResponse:
+    prefix: str
+    language: Language
+    results: list[str]
+
+
+@dataclass
+class LanguageIndexStats:
+    language: Language
+    words: int
+    pending_changes: int
+    memory_bytes: int
+
+
+@dataclass
+class AutocompleteStatsResponse:
+    ready: bool
+    rebuilding: bool
+    words: int
+    memory_bytes: int
+    languages: list[LanguageIndexStats]
+
+
+@router.get('/', response_model=AutocompleteResponse)
+async def autocomplete(
+        prefix: Annotated[str, Query(**WORD_INPUT_PARAMS)],
+        language: Language,
+        limit: Annotated[int, Query(ge=1, le=settings.AUTOCOMPLETE_MAX_RESULTS)] = 10,
+) -> AutocompleteResponse:
+    if not autocomplete_index.enabled:
+        raise HTTPException(status_code=404, detail='Autocomplete is disabled')
+    if not autocomplete_index.ready:
+        raise HTTPException(status_code=503, detail='Autocomplete index is loading')
+
+    return AutocompleteResponse(
+        prefix=prefix,
+        language=language,
+        results=autocomplete_index.complete(normalize_word(prefix), language, limit),
+    )
+
+
+@router.get('/stats', response_model=AutocompleteStatsResponse)
+async def autocomplete_stats() -> AutocompleteStatsResponse:
+    languages = [
+        LanguageIndexStats(
+            language=language,
+            words=len(index),
+            pending_changes=index.overlay_size,
+            memory_bytes=index.memory_usage(),
+        )
+        for language, index in sorted(autocomplete_index.indexes().items())
+    ]
+
+    return AutocompleteStatsResponse(
+        ready=autocomplete_index.ready,
+        rebuilding=autocomplete_index.rebuilding,
+        words=sum(item.words for item in languages),
+        memory_bytes=sum(item.memory_bytes for item in languages),
+        languages=languages,
+    )
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+from gtservice import settings
+from gtservice.api.negotiation import VARY_ACCEPT
+
+
+def make_etag(word_id: int, version: int) -> str:
+    # Weak: the same version may be rendered in several formats
+    return f'W/"{word_id}-{version}"'
+
+
+def cache_headers(word_id: int, version: int, updated_at: datetime) -> dict[str, str]:
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+
+    return {
+        'ETag': make_etag(word_id, version),
+        'Last-Modified': format_datetime(updated_at.astimezone(timezone.utc), usegmt=True),
+        'Cache-Control': f'public, max-age={settings.HTTP_CACHE_MAX_AGE}',
+        **VARY_ACCEPT,
+    }
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request: Request, headers: dict[str, str]) -> bool:
+    """
+    Evaluates If-None-Match and If-Modified-Since against
+    the validators of the current version (RFC 9110, 13.1.2 and 13.1.3)
+    :param request: incoming request
+    :param headers: validators built by `cache_headers`
+    :return: True if the client's copy is still valid
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+
+        etag = _strip_weak(headers['ETag'])
+        return any(
+            _strip_weak(item.strip()) == etag for item in if_none_match.split(',')
+        )
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+
+        return parsedate_to_datetime(headers['Last-Modified']) <= since
+
+    return False
+
+
+def has_conditional_headers(request: Request) -> bool:
+    return 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
@@ -0,0 +1,83 @@
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import msgpack
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+# Names clients used before application/msgpack was registered
+MSGPACK_MEDIA_TYPES = frozenset({
+    MSGPACK_MEDIA_TYPE, 'application/x-msgpack', 'application/vnd.msgpack',
+})
+JSON_MEDIA_RANGES = frozenset({JSON_MEDIA_TYPE, 'application/*', '*/*'})
+
+# On every negotiated response, so shared caches keep JSON and MessagePack apart
+VARY_ACCEPT = {'Vary': 'Accept'}
+
+# OpenAPI description of the alternative representation, for `responses=`
+MSGPACK_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {'content': {MSGPACK_MEDIA_TYPE: {}}},
+}
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+
+def _media_ranges(accept: str) -> Iterator[tuple[str, float]]:
+    for item in accept.split(','):
+        media_type, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        yield media_type.strip().lower(), quality
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    MessagePack is only sent when it is listed explicitly and not
+    ranked below JSON, JSON stays the default for everyone else
+    :param request: incoming request
+    :return: True if the response should be MessagePack
+    """
+    accept = request.headers.get('Accept')
+    if not accept:
+        return False
+
+    msgpack_quality = 0.0
+    json_quality = 0.0
+    for media_type, quality in _media_ranges(accept):
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in JSON_MEDIA_RANGES:
+            json_quality = max(json_quality, quality)
+
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def msgpack_response(
+        adapter: TypeAdapter, content: Any, headers: dict[str, str] | None = None
+) -> MsgPackResponse:
+    """
+    Packs the same structure the JSON response has
+    :param adapter: adapter of the response model
+    :param content: response model instance
+    :param headers: extra response headers
+    """
+    return MsgPackResponse(adapter.dump_python(content, mode='json'), headers=headers)
+
+
+def json_to_msgpack(body: bytes) -> bytes:
+    return msgpack.packb(json.loads(body))
@@ -0,0 +1,48 @@
+import os
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Path, Request
+from fastapi.responses import FileResponse
+
+from gtservice.profiling import is_profiling_allowed, profile_path
+
+PROFILE_ID_PARAMS: dict = {
+    "pattern": "^[0-9a-f]{32}$",
+}
+
+router = APIRouter(prefix='/profiles', tags=['profiling'])
+
+
+def _profile_file(request: Request, profile_id: str, extension: str) -> str:
+    path = profile_path(profile_id, extension)
+
+    if (
+        not is_profiling_allowed(request.client.host if request.client else None)
+        or not os.path.exists(path)
+    ):
+        raise HTTPException(status_code=404, detail='Profile not found')
+
+    return path
+
+
+@router.get('/{profile_id}', response_class=FileResponse)
+async def get_profile(
+        request: Request,
+        profile_id: Annotated[str, Path(**PROFILE_ID_PARAMS)],
+) -> FileResponse:
+    return FileResponse(
+        _profile_file(request, profile_id, 'json'),
+        media_type='application/json',
+        filename=f'{profile_id}.json',
+    )
+
+
+@router.get('/{profile_id}/flamegraph', response_class=FileResponse)
+async def get_profile_flamegraph(
+        request: Request,
+        profile_id: Annotated[str, Path(**PROFILE_ID_PARAMS)],
+) -> FileResponse:
+    return FileResponse(
+        _profile_file(request, profile_id, 'html'),
+        media_type='text/html',
+    )
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import Field, TypeAdapter
+from pydantic.dataclasses import dataclass
+
+from gtservice import settings
+from gtservice.admission import Deadline, miss_admission
+from gtservice.api.translations import MAX_WORD_LENGTH, TranslatedWordResponse
+from gtservice.db import database_session_context
+from gtservice.db.common import Actuality
+from gtservice.db.models import WordModel
+from gtservice.logic.text import TextToken, tokenize
+from gtservice.logic.translation import insert_or_update_translation
+from gtservice.logic.write_behind import write_behind
+from gtservice.translation_loader.loader import fetch_translation
+from gtservice.translation_loader.schemas import Language, TranslatedWordSchema
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+router = APIRouter(prefix='/translations', tags=['translate'])
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextTranslationRequest:
+    text: Annotated[str, Field(min_length=1, max_length=settings.TEXT_MAX_LENGTH)]
+    source_language: Language
+    translation_language: Language
+
+
+@dataclass
+class TextTokenResponse:
+    word: str
+    positions: list[int]
+    result: TranslatedWordResponse | None = None
+    error: str | None = None
+
+
+_token_response_adapter = TypeAdapter(TextTokenResponse)
+
+
+async def _fetch_word(
+        word: str,
+        source_language: Language,
+        translation_language: Language,
+        semaphore: asyncio.Semaphore,
+) -> TranslatedWordSchema:
+    async with semaphore:
+        deadline = Deadline(settings.REQUEST_DEADLINE)
+        async with miss_admission.admit(deadline):
+            return await deadline.run(fetch_translation(
+                word=word,
+                source_language=source_language,
+                translation_language=translation_language,
+            ))
+
+
+async def _translate_tokens(
+        tokens: list[TextToken],
+        source_language: Language,
+        translation_language: Language,
+) -> AsyncIterator[bytes]:
+    """
+    Yields one NDJSON line per token, in text order.
+    Stored words are resolved with one query, missing ones are fetched
+    concurrently and persisted (or queued for write-behind) one by one
+    as the stream reaches them.
+    """
+    semaphore = asyncio.Semaphore(settings.TEXT_FETCH_CONCURRENCY)
+    fetches: dict[str, asyncio.Task] = {}
+
+    try:
+        async with database_session_context() as db_session:
+            # Rendered right away: committing missing words expires loaded models
+            stored = {
+                word_model.normalized: TranslatedWordResponse.from_model(word_model)
+                for word_model in await WordModel.get_full_words(
+                    db_session, [token.word for token in tokens], source_language
+                )
+                if word_model.actuality == Actuality.ACTUAL
+            }
+            # Don't hold a pooled connection while the missing words are fetched
+            await db_session.rollback()
+
+            fetches = {
+                token.word: asyncio.create_task(_fetch_word(
+                    token.word, source_language, translation_language, semaphore
+                ))
+                for token in tokens
+                if token.word not in stored
+            }
+
+            for token in tokens:
+                result = stored.get(token.word)
+                error = None
+
+                if result is None:
+                    try:
+                        data = await fetches[token.word]
+                        if write_behind.running:
+                            await write_behind.submit(data)
+                            result = TranslatedWordResponse.from_schema(data)
+                        else:
+                            word_model = await insert_or_update_translation(
+                                db_session=db_session, updated_word_info=data
+                            )
+                            result = TranslatedWordResponse.from_model(word_model)
+                    except Exception:
+                        logger.exception('Failed to translate %s', token.word)
+                        error = 'Translation is not available'
+                    # Rendered already, the connection goes back to the pool
+                    # before the next fetch is awaited or the line is sent
+                    await db_session.rollback()
+
+                yield _token_response_adapter.dump_json(TextTokenResponse(
+                    word=token.word,
+                    positions=token.positions,
+                    result=result,
+                    error=error,
+                )) + b'\n'
+    finally:
+        for task in fetches.values():
+            task.cancel()
+
+
+@router.post(
+    '/text',
+    response_class=StreamingResponse,
+    responses={200: {'content': {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def translate_text(body: TextTranslationRequest) -> StreamingResponse:
+    tokens = tokenize(body.text, MAX_WORD_LENGTH)
+
+    if len(tokens) > settings.TEXT_MAX_UNIQUE_TOKENS:
+        raise HTTPException(
+            status_code=422,
+            detail=f'Text has more than {settings.TEXT_MAX_UNIQUE_TOKENS} unique words',
+        )
+
+    return StreamingResponse(
+        _translate_tokens(tokens, body.source_language, body.translation_language),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
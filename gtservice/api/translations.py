@@ -1,20 +1,40 @@
 import logging
+from collections import Counter
 from math import ceil
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from pydantic import Field
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from pydantic import Field, TypeAdapter
 from pydantic.dataclasses import dataclass
-from sqlalchemy import select, func
+from sqlalchemy import Select, bindparam, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from gtservice import settings
+from gtservice.admission import Deadline, OverloadedError, miss_admission
+from gtservice.api.caching import cache_headers, has_conditional_headers, is_not_modified
+from gtservice.api.negotiation import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    MSGPACK_RESPONSES,
+    VARY_ACCEPT,
+    accepts_msgpack,
+    json_to_msgpack,
+    msgpack_response,
+)
 from gtservice.db import database_session
 from gtservice.db.common import Actuality
-from gtservice.db.models import WordModel
-from gtservice.logic.translation import insert_or_update_translation
+from gtservice.db.models import WordModel, WordCounterModel, FULL_WORD_LOAD_OPTIONS
+from gtservice.db.routing import use_primary
+from gtservice.logic.access_stats import access_tracker
+from gtservice.logic.autocomplete import autocomplete_index
+from gtservice.logic.counting import CountMode, count_cache, estimate_count
+from gtservice.logic.translation import insert_or_update_translation, linked_words
+from gtservice.logic.write_behind import write_behind
+from gtservice.node_cache import CachedResponse, node_cache, word_key
 from gtservice.translation_loader.loader import fetch_translation
-from gtservice.translation_loader.schemas import WordSchema, TextSchema, Language
+from gtservice.translation_loader.schemas import (
+    WordSchema, TextSchema, TranslatedWordSchema, Language, normalize_word
+)
 
 MAX_WORD_LENGTH = 64
 
@@ -28,6 +48,35 @@ router = APIRouter(prefix='/translations', tags=['translate'])
 logger = logging.getLogger(__name__)
 
 
+def _build_list_queries(
+        by_word_part: bool, by_language: bool
+) -> tuple[Select, Select, Select]:
+    query = select(WordModel)
+
+    if by_word_part:
+        query = query.filter(WordModel.normalized.like(bindparam('word_pattern')))
+
+    if by_language:
+        query = query.filter(WordModel.language == bindparam('language'))
+
+    count_query = select(func.count()).select_from(query.subquery())
+    page_query = (
+        query
+        .options(*FULL_WORD_LOAD_OPTIONS)
+        .offset(bindparam('offset'))
+        .limit(bindparam('limit'))
+    )
+    return query, count_query, page_query
+
+
+# (filter, count, page) statements for every combination of (word_part, language) filters
+_LIST_QUERIES = {
+    (by_word_part, by_language): _build_list_queries(by_word_part, by_language)
+    for by_word_part in (False, True)
+    for by_language in (False, True)
+}
+
+
 @dataclass
 class TranslatedWordResponse:
     word: str
@@ -57,93 +106,254 @@ class TranslatedWordResponse:
             ],
         )
 
+    @staticmethod
+    def from_schema(word_info: TranslatedWordSchema) -> 'TranslatedWordResponse':
+        """
+        Renders fetched data the way it looks once persisted
+        """
+        return TranslatedWordResponse(
+            word=word_info.word.word,
+            language=word_info.word.language,
+            translations=linked_words(word_info.word, word_info.translations),
+            synonyms=linked_words(word_info.word, word_info.synonyms),
+            definitions=[
+                TextSchema(text) for text in dict.fromkeys(
+                    item.text for item in word_info.definitions
+                )
+            ],
+            examples=[
+                TextSchema(text) for text in dict.fromkeys(
+                    item.text for item in word_info.examples
+                )
+            ],
+        )
+
+
+_WORD_RESPONSE_ADAPTER = TypeAdapter(TranslatedWordResponse)
+
 
 @dataclass
 class TranslatedWordsListResponse:
     page: int
     page_size: int
-    total_pages: int
-    count: int
+    # Totals are missing with count_mode=none and approximate with cached/estimated
+    total_pages: int | None
+    count: int | None
+    count_mode: CountMode
+    has_next: bool
     results: list[TranslatedWordResponse]
 
 
+_LIST_RESPONSE_ADAPTER = TypeAdapter(TranslatedWordsListResponse)
+
+
 @dataclass
 class SimpleOperationResponse:
     status: bool = Field(default=True)
 
 
-@router.get('/', response_model=TranslatedWordsListResponse)
+async def _count_words(
+        db_session: AsyncSession,
+        word_part: str | None,
+        language: str | None,
+        count_mode: CountMode,
+        params: dict,
+) -> int | None:
+    if count_mode == CountMode.NONE:
+        return None
+
+    filter_query, count_query, _ = _LIST_QUERIES[(word_part is not None, language is not None)]
+
+    if count_mode == CountMode.EXACT:
+        return (await db_session.execute(count_query, params)).scalar_one()
+
+    if word_part is None:
+        # Maintained by the write paths: cheap, but never recounted
+        return await WordCounterModel.get_total(db_session, language)
+
+    if count_mode == CountMode.ESTIMATED:
+        estimate = await estimate_count(db_session, filter_query, params)
+        if estimate is not None:
+            return estimate
+
+    if count_mode == CountMode.CACHED:
+        cached = count_cache.get((word_part, language))
+        if cached is not None:
+            return cached
+
+    total = (await db_session.execute(count_query, params)).scalar_one()
+    if count_mode == CountMode.CACHED:
+        count_cache.set((word_part, language), total)
+
+    return total
+
+
+@router.get(
+    '/', response_model=TranslatedWordsListResponse, responses=MSGPACK_RESPONSES
+)
 async def get_translated_words(
+        request: Request,
+        response: Response,
         word_part: Annotated[str | None, Query(**WORD_INPUT_PARAMS)] = None,
         language: Language | None = None,
         page: Annotated[int, Query(ge=1)] = 1,
         page_size: Annotated[int, Query(ge=1, le=50)] = 10,
+        count_mode: CountMode = CountMode(settings.LIST_COUNT_DEFAULT_MODE),
         db_session: AsyncSession = Depends(database_session),
-) -> TranslatedWordsListResponse:
-    query = (
-        select(WordModel)
-        .options(selectinload(WordModel.translations))
-        .options(selectinload(WordModel.synonyms))
-        .options(selectinload(WordModel.examples))
-        .options(selectinload(WordModel.definitions))
-    )
-
+) -> TranslatedWordsListResponse | Response:
     if word_part is not None:
-        query = query.filter(
-            WordModel.word.like(f"%{word_part}%")
-        )
+        word_part = normalize_word(word_part)
 
-    if language is not None:
-        query = query.filter(
-            WordModel.language == language
-        )
+    _, _, page_query = _LIST_QUERIES[(word_part is not None, language is not None)]
+    params = {
+        'word_pattern': f"%{word_part}%",
+        'language': language,
+        'offset': (page - 1) * page_size,
+        # One extra row tells whether there is a next page without counting
+        'limit': page_size + 1,
+    }
 
-    total = (await db_session.execute(
-        select(func.count()).select_from(query)
-    )).scalar_one()
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    total_pages = ceil(total / page_size)
+    total = await _count_words(db_session, word_part, language, count_mode, params)
 
-    models = (await db_session.execute(query)).scalars().all()
+    models = (await db_session.execute(page_query, params)).scalars().all()
+    access_tracker.record_many(
+        (model.normalized, model.language) for model in models[:page_size]
+    )
 
-    return TranslatedWordsListResponse(
+    result = TranslatedWordsListResponse(
         page=page,
         page_size=page_size,
         count=total,
-        total_pages=total_pages,
-        results=[TranslatedWordResponse.from_model(model) for model in models],
+        total_pages=None if total is None else ceil(total / page_size),
+        count_mode=count_mode,
+        has_next=len(models) > page_size,
+        results=[
+            TranslatedWordResponse.from_model(model) for model in models[:page_size]
+        ],
     )
 
+    if accepts_msgpack(request):
+        return msgpack_response(_LIST_RESPONSE_ADAPTER, result, VARY_ACCEPT)
 
-@router.get('/{word}', response_model=TranslatedWordResponse)
+    response.headers.update(VARY_ACCEPT)
+    return result
+
+
+def _word_response(result: TranslatedWordResponse, use_msgpack: bool) -> Response:
+    # Not stored yet, so no validators, but the format still varies
+    if use_msgpack:
+        return msgpack_response(_WORD_RESPONSE_ADAPTER, result, VARY_ACCEPT)
+    return Response(
+        _WORD_RESPONSE_ADAPTER.dump_json(result),
+        media_type=JSON_MEDIA_TYPE,
+        headers=VARY_ACCEPT,
+    )
+
+
+@router.get(
+    '/{word}', response_model=TranslatedWordResponse, responses=MSGPACK_RESPONSES
+)
 async def get_text(
         word: Annotated[str, Path(**WORD_INPUT_PARAMS)],
         source_language: Language,
         translation_language: Language,
+        request: Request,
+        response: Response,
         db_session: AsyncSession = Depends(database_session),
-) -> TranslatedWordResponse:
-    lowercased_word = word.lower()
-    word_model = await WordModel.get_full_word(db_session, word, source_language)
+) -> TranslatedWordResponse | Response:
+    # One form for the cache, the database and the upstream request
+    word = normalize_word(word)
+    if not word:
+        raise HTTPException(status_code=422, detail='Word is empty')
 
-    if word_model is None or word_model.actuality == Actuality.OUTDATED:
-        try:
-            data = await fetch_translation(
-                word=lowercased_word,
-                source_language=Language(source_language),
-                translation_language=Language(translation_language),
+    access_tracker.record(word, source_language)
+    deadline = Deadline(settings.REQUEST_DEADLINE)
+    use_msgpack = accepts_msgpack(request)
+
+    cache_key = word_key(word, source_language)
+    cached = node_cache.get(cache_key)
+    if cached is not None:
+        # Entries may outlive a change of the headers, the format always varies
+        headers = {**cached.headers, **VARY_ACCEPT}
+        if is_not_modified(request, headers):
+            return Response(status_code=304, headers=headers)
+        if use_msgpack:
+            # Only JSON is cached, transcoding is still much cheaper than a query
+            return Response(
+                json_to_msgpack(cached.body),
+                media_type=MSGPACK_MEDIA_TYPE,
+                headers=headers,
             )
-        except Exception:
-            logger.exception('Failed requesting google API')
-            raise HTTPException(status_code=500, detail='Internal server error')
+        return Response(cached.body, media_type=JSON_MEDIA_TYPE, headers=headers)
 
-        try:
-            word_model = await insert_or_update_translation(db_session=db_session,
-                                                            updated_word_info=data)
-        except Exception:
-            logger.exception(f'Failed to update data for {word}')
-            raise HTTPException(status_code=500, detail='Internal server error')
+    if has_conditional_headers(request):
+        # Revalidation only needs the version row, not the related data
+        version = await deadline.run(
+            WordModel.get_word_version(db_session, word, source_language)
+        )
+        if version is not None and version.actuality == Actuality.ACTUAL:
+            headers = cache_headers(version.id, version.version, version.updated_at)
+            if is_not_modified(request, headers):
+                return Response(status_code=304, headers=headers)
+
+    word_model = await deadline.run(
+        WordModel.get_full_word(db_session, word, source_language)
+    )
+
+    if word_model is None or word_model.actuality == Actuality.OUTDATED:
+        # Don't hold a pooled connection while waiting for a slot and upstream
+        await db_session.rollback()
+
+        if write_behind.running:
+            pending = write_behind.pending(word, source_language)
+            if pending is not None:
+                return _word_response(
+                    TranslatedWordResponse.from_schema(pending), use_msgpack
+                )
+
+        async with miss_admission.admit(deadline):
+            try:
+                data = await deadline.run(fetch_translation(
+                    word=word,
+                    source_language=Language(source_language),
+                    translation_language=Language(translation_language),
+                ))
+            except OverloadedError:
+                raise
+            except Exception:
+                logger.exception('Failed requesting google API')
+                raise HTTPException(status_code=500, detail='Internal server error')
 
-    return TranslatedWordResponse.from_model(word_model)
+            if write_behind.running:
+                await deadline.run(write_behind.submit(data))
+                return _word_response(
+                    TranslatedWordResponse.from_schema(data), use_msgpack
+                )
+
+            try:
+                word_model = await deadline.run(insert_or_update_translation(
+                    db_session=db_session, updated_word_info=data
+                ))
+            except OverloadedError:
+                raise
+            except Exception:
+                logger.exception('Failed to update data for %s', word)
+                raise HTTPException(status_code=500, detail='Internal server error')
+
+    headers = cache_headers(word_model.id, word_model.version, word_model.updated_at)
+    result = TranslatedWordResponse.from_model(word_model)
+
+    if node_cache.enabled:
+        body = _WORD_RESPONSE_ADAPTER.dump_json(result)
+        await node_cache.set(cache_key, CachedResponse(body=body, headers=headers))
+        if not use_msgpack:
+            return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+    if use_msgpack:
+        return msgpack_response(_WORD_RESPONSE_ADAPTER, result, headers)
+
+    response.headers.update(headers)
+    return result
 
 
 @router.delete('/{language}/{word}', response_model=SimpleOperationResponse)
@@ -152,14 +362,26 @@ async def delete_text(
         word: str,
         db_session: AsyncSession = Depends(database_session),
 ) -> SimpleOperationResponse:
+    use_primary(db_session)
     deletion_list = await WordModel.get_words_by_list(
         db_session, [WordSchema(word, language)]
     )
     if deletion_list:
+        deleted_words = [WordSchema(*mdl.as_tuple()) for mdl in deletion_list]
+        await WordCounterModel.increment(
+            db_session,
+            words={},
+            deleted=Counter(mdl.language for mdl in deletion_list if not mdl.deleted),
+        )
         for word in deletion_list:
             word.deleted = True
+            word.touch()
             db_session.add(word)
 
         await db_session.commit()
+        autocomplete_index.remove_words(deleted_words)
+        await node_cache.delete(
+            word_key(item.word, item.language) for item in deleted_words
+        )
 
     return SimpleOperationResponse()
@@ -1,42 +1,198 @@
+import asyncio
 import logging
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-from gtservice import settings
+from gtservice import log, profiling, settings
+from gtservice.admission import OverloadedError
 
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger(log.ACCESS_LOGGER_NAME)
 
 
 def prepare_logger():
-    logging.basicConfig(
-        level=settings.LOG_LEVEL,
-        format='%(asctime)s %(name)s %(levelname)s: %(message)s'
-    )
+    log.setup_logging()
+
+
+async def _finish_profile(
+        request: Request,
+        status_code: int,
+        profile: profiling.RequestProfile,
+        profiler: 'profiling.Profiler | None',
+        elapsed: float,
+):
+    """
+    Checks the statement budget and saves detailed profiles,
+    called once the response body is sent
+    """
+    if profile.statements_count > settings.PROFILING_STATEMENT_BUDGET:
+        logger.warning(
+            'Request %s %s executed %d SQL statements, budget is %d',
+            request.method,
+            request.url.path,
+            profile.statements_count,
+            settings.PROFILING_STATEMENT_BUDGET,
+        )
+
+    if profile.detailed:
+        await asyncio.to_thread(
+            profiling.save_profile,
+            profile,
+            {
+                'method': request.method,
+                'url': str(request.url),
+                'status_code': status_code,
+                'duration': elapsed,
+            },
+            profiler,
+        )
 
 
 def init_middleware(app: FastAPI):
     @app.middleware('http')
     async def log_request(request: Request, call_next):
         start = time.monotonic()
+        status_code = 500
         try:
-            logger.info('Request has started')
-            return await call_next(request)
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
         finally:
-            logger.info(f'Request has ended. Elapsed time: {time.monotonic() - start}')
+            duration = time.monotonic() - start
+            if log.should_log_access(status_code, duration):
+                access_logger.info(
+                    '%s %s %d %.3fs',
+                    request.method,
+                    request.url.path,
+                    status_code,
+                    duration,
+                    extra={
+                        'method': request.method,
+                        'path': request.url.path,
+                        'status_code': status_code,
+                        'duration': duration,
+                    },
+                )
+
+    @app.middleware('http')
+    async def profile_request(request: Request, call_next):
+        profile_mode = (
+            request.headers.get(profiling.PROFILE_HEADER)
+            or request.query_params.get(profiling.PROFILE_QUERY_PARAM)
+        )
+        detailed = bool(profile_mode) and profiling.is_profiling_allowed(
+            request.client.host if request.client else None
+        )
+
+        profiler = None
+        if detailed and profile_mode == 'flamegraph':
+            profiler = profiling.start_sampling_profiler()
+
+        start = time.perf_counter()
+        try:
+            with profiling.request_profile(detailed) as profile:
+                response = await call_next(request)
+        except BaseException:
+            if profiler is not None:
+                profiler.stop()
+            raise
+
+        if detailed:
+            # Up to the headers: a streamed body can't be covered by them
+            response.headers['Server-Timing'] = profile.server_timing(
+                time.perf_counter() - start
+            )
+            response.headers[profiling.PROFILE_ID_HEADER] = profile.id
+
+        body_iterator = response.body_iterator
+
+        async def profiled_body():
+            # The endpoint keeps executing statements while a streaming body
+            # is sent (e.g. /translations/text), the profile is complete only here
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+                await _finish_profile(
+                    request, response.status_code, profile, profiler,
+                    time.perf_counter() - start,
+                )
+
+        response.body_iterator = profiled_body()
+        return response
+
+
+def init_exception_handlers(app: FastAPI):
+    @app.exception_handler(OverloadedError)
+    async def overloaded(request: Request, exc: OverloadedError):
+        return JSONResponse(
+            status_code=503,
+            content={'detail': str(exc)},
+            headers={'Retry-After': str(exc.retry_after)},
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from gtservice.db import database
+    from gtservice.logic.access_stats import access_tracker
+    from gtservice.logic.autocomplete import autocomplete_index
+    from gtservice.logic.upstream_archive import upstream_archive
+    from gtservice.logic.write_behind import write_behind
+    from gtservice.node_cache import node_cache
+    from gtservice.translation_loader.loader import close_translation_loader
+
+    await database.connect()
+    if settings.NODE_CACHE_ENABLED:
+        try:
+            node_cache.open()
+        except Exception:
+            logger.exception('Failed to open the node cache, running without it')
+    if settings.AUTOCOMPLETE_ENABLED:
+        autocomplete_index.start(settings.AUTOCOMPLETE_REFRESH_INTERVAL)
+    if settings.WRITE_BEHIND_ENABLED:
+        write_behind.start()
+    if settings.ACCESS_STATS_ENABLED:
+        access_tracker.start()
+    if settings.UPSTREAM_ARCHIVE_ENABLED:
+        upstream_archive.start()
+    try:
+        yield
+    finally:
+        await access_tracker.stop()
+        await upstream_archive.stop()
+        await write_behind.stop(settings.WRITE_BEHIND_FLUSH_TIMEOUT)
+        await autocomplete_index.stop()
+        await close_translation_loader()
+        await database.disconnect()
+        node_cache.close()
+        log.shutdown_logging()
 
 
 def init_routers(app: FastAPI):
+    from gtservice.api.autocomplete import router as autocomplete_router
+    from gtservice.api.profiling import router as profiling_router
+    from gtservice.api.text_translations import router as text_router
     from gtservice.api.translations import router as words_router
     app.include_router(router=words_router)
+    app.include_router(router=text_router)
+    app.include_router(router=autocomplete_router)
+    app.include_router(router=profiling_router)
 
 
 def create_application():
     prepare_logger()
+    profiling.install_sql_hooks()
 
-    app = FastAPI(title="Google Translate Service")
+    app = FastAPI(title="Google Translate Service", lifespan=lifespan)
 
     init_middleware(app)
+    init_exception_handlers(app)
     init_routers(app)
 
     return app
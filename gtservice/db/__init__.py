@@ -1,43 +1,217 @@
+import asyncio
+import logging
+import os
 from contextlib import asynccontextmanager
+from uuid import uuid4
 
-from sqlalchemy import MetaData
+from sqlalchemy import URL, MetaData, event, make_url, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, \
-    async_sessionmaker
+    async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from gtservice.db.common import Base
+from gtservice.db.routing import ReplicaSet, RoutingSession
 
 from gtservice import settings
 
-engine = create_async_engine(
-    settings.DB_CONNECTION_STRING,
-    future=True,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-)
+logger = logging.getLogger(__name__)
 
 
-class Database:
+def _asyncpg_connect_args() -> dict:
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        # pgbouncer may hand every transaction a different server connection,
+        # so statements prepared on one of them can't be reused by name
+        return {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid4()}__',
+        }
+
+    return {
+        'prepared_statement_cache_size': settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # Readers don't block the writer and each other, commits are appends
+        cursor.execute('PRAGMA journal_mode=WAL')
+        # Durable at checkpoints only, a power cut may lose the last commits
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        # Negative is KiB, the cache is per connection and pooled connections keep it
+        cursor.execute(f'PRAGMA cache_size=-{settings.DB_SQLITE_CACHE_SIZE_KB}')
+        cursor.execute(f'PRAGMA mmap_size={settings.DB_SQLITE_MMAP_SIZE}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA foreign_keys=ON')
+    finally:
+        cursor.close()
+
+
+def _create_sqlite_engine(url: URL) -> AsyncEngine:
+    pool_args = {}
+    if url.database not in (None, '', ':memory:'):
+        # aiosqlite opens a connection (and a thread) per checkout by default,
+        # dropping the page cache with it
+        pool_args = {
+            'poolclass': AsyncAdaptedQueuePool,
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+            'pool_timeout': settings.DB_POOL_TIMEOUT,
+        }
+
+    engine = create_async_engine(
+        url,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        # Seconds to wait for the write lock held by another worker
+        connect_args={'timeout': settings.DB_SQLITE_BUSY_TIMEOUT},
+        **pool_args,
+    )
+    event.listen(engine.sync_engine, 'connect', _set_sqlite_pragmas)
+    return engine
+
+
+def _create_engine(connection_string: str) -> AsyncEngine:
+    url = make_url(connection_string)
+    if url.get_backend_name() == 'sqlite':
+        return _create_sqlite_engine(url)
+
+    connect_args = (
+        _asyncpg_connect_args() if url.get_driver_name() == 'asyncpg' else {}
+    )
+
+    return create_async_engine(
+        url,
+        future=True,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=connect_args,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+async def _prewarm(eng: AsyncEngine, connections_count: int):
+    """
+    Opens connections up front and validates each of them with a ping,
+    so the first requests of a fresh worker don't pay for connecting
+    """
+    connections = await asyncio.gather(
+        *(eng.connect().start() for _ in range(connections_count))
+    )
+    try:
+        await asyncio.gather(
+            *(conn.execute(text('SELECT 1')) for conn in connections)
+        )
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
 
-    def __init__(self, eng: AsyncEngine):
-        self._engine = eng
+
+class Database:
+    """
+    Owns the engines and the session factory.
+    Engines are created by `connect` inside the running worker
+    (see the application lifespan), never at import time,
+    so pools are not shared with the preloading gunicorn master.
+    """
+
+    def __init__(self):
+        self._engine: AsyncEngine | None = None
         self._metadata = Base.metadata
-        self._session_factory = async_sessionmaker(eng)
+        self._replicas = ReplicaSet([], settings.DB_REPLICA_HEALTH_CHECK_TIMEOUT)
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._health_check_task: asyncio.Task | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            raise RuntimeError('Database is not connected')
+
+        return self._engine
 
     def metadata(self) -> MetaData:
         return self._metadata
 
-    def async_session_generator(self):
+    def async_session_generator(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            raise RuntimeError('Database is not connected')
+
         return self._session_factory
 
+    async def connect(self):
+        if self._engine is not None:
+            return
+
+        self._engine = _create_engine(settings.DB_CONNECTION_STRING)
+        self._replicas = ReplicaSet(
+            [_create_engine(item) for item in settings.DB_REPLICA_CONNECTION_STRINGS],
+            health_check_timeout=settings.DB_REPLICA_HEALTH_CHECK_TIMEOUT,
+        )
+        self._session_factory = async_sessionmaker(
+            self._engine,
+            sync_session_class=RoutingSession,
+            primary=self._engine,
+            replicas=self._replicas,
+        )
+
+        if self._replicas.engines:
+            # Replicas that are down at startup must not get the first requests
+            await self._replicas.check_health()
+
+        if settings.DB_POOL_PREWARM > 0:
+            await asyncio.gather(*(
+                _prewarm(eng, settings.DB_POOL_PREWARM)
+                for eng in [self._engine, *self._replicas.healthy]
+            ))
+            logger.info('Pre-warmed %d connections per pool', settings.DB_POOL_PREWARM)
+
+        if self._replicas.engines:
+            self._health_check_task = asyncio.create_task(
+                self._replicas.run_health_checks(
+                    settings.DB_REPLICA_HEALTH_CHECK_INTERVAL
+                )
+            )
+
+    async def disconnect(self):
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+            try:
+                await self._health_check_task
+            except asyncio.CancelledError:
+                pass
+            self._health_check_task = None
+
+        for eng in self._replicas.engines:
+            await eng.dispose()
+        if self._engine is not None:
+            await self._engine.dispose()
+
+        self._engine = None
+        self._session_factory = None
+        self._replicas = ReplicaSet([], settings.DB_REPLICA_HEALTH_CHECK_TIMEOUT)
+
+    def dispose_after_fork(self):
+        """
+        Drops pooled connections inherited from the parent process
+        without closing them, the parent still owns the sockets.
+        """
+        for eng in [self._engine, *self._replicas.engines]:
+            if eng is not None:
+                eng.sync_engine.dispose(close=False)
+
     async def create_all(self):
-        async with engine.begin() as conn:
+        async with self.engine.begin() as conn:
             await conn.run_sync(self._metadata.create_all)
 
     async def drop_all(self):
-        async with engine.begin() as conn:
+        async with self.engine.begin() as conn:
             await conn.run_sync(self._metadata.drop_all)
 
 
-database: Database = Database(engine)
+database: Database = Database()
+
+os.register_at_fork(after_in_child=database.dispose_after_fork)
 
 
 @asynccontextmanager
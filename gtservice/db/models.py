@@ -1,153 +1,638 @@
+import hashlib
+from collections.abc import AsyncIterator, Iterable, Mapping
+from datetime import date, datetime, timezone
+
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
+    Date,
+    DateTime,
     ForeignKey,
     String,
     Table,
+    Text,
     UniqueConstraint,
     Integer,
+    LargeBinary,
+    Row,
+    DDL,
+    ForeignKeyConstraint,
+    PrimaryKeyConstraint,
+    and_,
+    bindparam,
+    delete,
+    event,
+    false,
+    func,
+    or_,
     select,
-    or_
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import relationship, Mapped, selectinload
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, Mapped, selectinload, validates
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy_utils import generic_repr
 
 from gtservice.db.common import DbActuality, Actuality, Base
-from gtservice.translation_loader.schemas import WordSchema
-
-_word_translations = Table(
-    'word_translations',
-    Base.metadata,
-    Column(
-        'from_word_id',
-        Integer,
-        ForeignKey('words.id'),
-        primary_key=True,
-    ),
-    Column(
-        'to_word_id',
-        Integer,
-        ForeignKey('words.id'),
-        primary_key=True,
-    ),
-)
+from gtservice.translation_loader.schemas import WordSchema, normalize_word
 
-_word_synonyms = Table(
-    'word_synonyms',
-    Base.metadata,
-    Column(
-        'from_word_id',
-        Integer,
-        ForeignKey('words.id'),
-        primary_key=True
-    ),
-    Column(
-        'to_word_id',
-        Integer,
-        ForeignKey('words.id'),
-        primary_key=True,
-    ),
-)
+# Table.info key of the column SQLite numbers as the rowid, see `_rowid_on_sqlite`
+_SQLITE_ROWID = 'sqlite_rowid'
+
+
+def _rowid_on_sqlite(table: Table, column: str) -> Table:
+    """
+    SQLite only generates values for a single column INTEGER PRIMARY KEY,
+    so there the column becomes the key (an alias of the rowid) and the
+    composite primary key is created as a unique constraint, which is
+    enough for foreign keys. Other databases get the table as declared.
+    """
+    table.info[_SQLITE_ROWID] = column
+    return table
+
+
+@compiles(CreateColumn, 'sqlite')
+def _compile_sqlite_column(element: CreateColumn, compiler, **kw) -> str:
+    column = element.element
+    if column.table is not None and column.table.info.get(_SQLITE_ROWID) == column.name:
+        # AUTOINCREMENT: ids of deleted rows are not reused, they are in ETags
+        return f'{compiler.preparer.format_column(column)} INTEGER NOT NULL ' \
+               f'PRIMARY KEY AUTOINCREMENT'
+
+    return compiler.visit_create_column(element, **kw)
+
+
+@compiles(PrimaryKeyConstraint, 'sqlite')
+def _compile_sqlite_primary_key(constraint: PrimaryKeyConstraint, compiler, **kw) -> str:
+    if constraint.table is not None and _SQLITE_ROWID in constraint.table.info:
+        columns = ', '.join(
+            compiler.preparer.quote(column.name) for column in constraint.columns
+        )
+        return f'UNIQUE ({columns})'
+
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+def _partitioned_by_language(table: Table) -> Table:
+    """
+    Gives a table LIST partitioned by language (see `postgresql_partition_by`)
+    a default partition on create, so it accepts rows of any language.
+    Busy languages get their own partitions in migrations.
+    """
+    event.listen(
+        table,
+        'after_create',
+        DDL(
+            f'CREATE TABLE {table.name}_default PARTITION OF {table.name} DEFAULT'
+        ).execute_if(dialect='postgresql'),
+    )
+    return table
+
+
+def _word_link_table(name: str, from_word: str, to_word: str) -> Table:
+    """
+    Word to word link partitioned by the source word language,
+    so loading links of a word scans only its language partition
+    """
+    return _partitioned_by_language(Table(
+        name,
+        Base.metadata,
+        Column(f'{from_word}_id', Integer, primary_key=True),
+        Column(f'{from_word}_language', String(2), primary_key=True),
+        Column(f'{to_word}_id', Integer, primary_key=True),
+        Column(f'{to_word}_language', String(2), nullable=False),
+        ForeignKeyConstraint(
+            [f'{from_word}_id', f'{from_word}_language'],
+            ['words.id', 'words.language'],
+        ),
+        ForeignKeyConstraint(
+            [f'{to_word}_id', f'{to_word}_language'],
+            ['words.id', 'words.language'],
+        ),
+        postgresql_partition_by=f'LIST ({from_word}_language)',
+    ))
+
+
+def _word_text_table(name: str) -> Table:
+    """
+    Word to shared text link partitioned by the word language.
+    Texts themselves are shared between languages and stay unpartitioned.
+    """
+    return _partitioned_by_language(Table(
+        name,
+        Base.metadata,
+        Column('word_id', Integer, primary_key=True),
+        Column('word_language', String(2), primary_key=True),
+        Column('text_id', Integer, ForeignKey('texts.id'), primary_key=True),
+        ForeignKeyConstraint(
+            ['word_id', 'word_language'],
+            ['words.id', 'words.language'],
+        ),
+        postgresql_partition_by='LIST (word_language)',
+    ))
+
+
+_word_translations = _word_link_table('word_translations', 'from_word', 'to_word')
+_word_synonyms = _word_link_table('word_synonyms', 'from_word', 'to_word')
+_word_definitions = _word_text_table('word_definitions')
+_word_examples = _word_text_table('word_examples')
 
 
 @generic_repr
 class WordModel(Base):
     __tablename__ = 'words'
-    __table_args__ = (UniqueConstraint('word', 'language'),)
-
-    id: Mapped[int] = Column(
-        Integer, primary_key=True, index=True, autoincrement=True
+    # Partitioned by language on Postgres: keys have to include the language,
+    # and (word, language) lookups only touch the language partition
+    __table_args__ = (
+        UniqueConstraint('normalized', 'language'),
+        {'postgresql_partition_by': 'LIST (language)'},
     )
-    word: Mapped[str] = Column(String(255), nullable=False, index=True)
-    language: Mapped[str] = Column(String(2), nullable=False, index=True)
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+    language: Mapped[str] = Column(String(2), primary_key=True)
+    # As received, for display
+    word: Mapped[str] = Column(String(255), nullable=False)
+    # normalize_word(word), set together with the word; lookups go by it
+    normalized: Mapped[str] = Column(String(255), nullable=False)
     actuality: Mapped[DbActuality] = Column(
         DbActuality, nullable=False, default=Actuality.OUTDATED
     )
     deleted: Mapped[bool] = Column(
-        Boolean, default=False, server_default='FALSE'
+        Boolean, default=False, server_default=false()
+    )
+    # Bumped on every change of the word or its relations, drives ETags
+    version: Mapped[int] = Column(
+        Integer, nullable=False, default=1, server_default='1'
+    )
+    updated_at: Mapped[datetime] = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
     )
 
-    definitions: Mapped[list['DefinitionModel']] = relationship(
-        'DefinitionModel',
-        back_populates='word',
-        cascade="all, delete"
+    definitions: Mapped[list['TextModel']] = relationship(
+        'TextModel',
+        secondary=_word_definitions,
+        primaryjoin='and_('
+                    'WordModel.id == word_definitions.c.word_id, '
+                    'WordModel.language == word_definitions.c.word_language)',
     )
-    examples: Mapped[list['ExampleModel']] = relationship(
-        'ExampleModel',
-        back_populates='word',
-        cascade="all, delete"
+    examples: Mapped[list['TextModel']] = relationship(
+        'TextModel',
+        secondary=_word_examples,
+        primaryjoin='and_('
+                    'WordModel.id == word_examples.c.word_id, '
+                    'WordModel.language == word_examples.c.word_language)',
     )
 
     translations: Mapped[list['WordModel']] = relationship(
         'WordModel',
         secondary=_word_translations,
-        primaryjoin='WordModel.id == word_translations.c.from_word_id',
-        secondaryjoin='WordModel.id == word_translations.c.to_word_id',
+        primaryjoin='and_('
+                    'WordModel.id == word_translations.c.from_word_id, '
+                    'WordModel.language == word_translations.c.from_word_language)',
+        secondaryjoin='and_('
+                      'WordModel.id == word_translations.c.to_word_id, '
+                      'WordModel.language == word_translations.c.to_word_language)',
         back_populates='translations'
     )
 
     synonyms: Mapped[list['WordModel']] = relationship(
         'WordModel',
         secondary=_word_synonyms,
-        primaryjoin='WordModel.id == word_synonyms.c.from_word_id',
-        secondaryjoin='WordModel.id == word_synonyms.c.to_word_id',
+        primaryjoin='and_('
+                    'WordModel.id == word_synonyms.c.from_word_id, '
+                    'WordModel.language == word_synonyms.c.from_word_language)',
+        secondaryjoin='and_('
+                      'WordModel.id == word_synonyms.c.to_word_id, '
+                      'WordModel.language == word_synonyms.c.to_word_language)',
         back_populates='synonyms'
     )
 
+    @validates('word')
+    def _normalize_word(self, key: str, word: str) -> str:
+        self.normalized = normalize_word(word)
+        return word
+
     @staticmethod
     async def get_full_word(
             db_session: AsyncSession, word: str, language: str
     ) -> 'WordModel | None':
-        query = (
-            select(WordModel)
-            .options(selectinload(WordModel.translations))
-            .options(selectinload(WordModel.synonyms))
-            .options(selectinload(WordModel.examples))
-            .options(selectinload(WordModel.definitions))
-            .filter(
-                WordModel.word == word,
-                WordModel.language == language
-            )
+        return (await db_session.execute(
+            _FULL_WORD_QUERY, {'word': normalize_word(word), 'language': language}
+        )).scalar_one_or_none()
+
+    @staticmethod
+    async def get_full_words(
+            db_session: AsyncSession, words: Iterable[str], language: str
+    ) -> list['WordModel']:
+        result = await db_session.execute(
+            _FULL_WORDS_QUERY,
+            {'words': [normalize_word(word) for word in words], 'language': language},
         )
-        return (await db_session.execute(query)).scalar_one_or_none()
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_word_version(
+            db_session: AsyncSession, word: str, language: str
+    ) -> Row | None:
+        """
+        Loads only what is needed to validate a cached copy of the word
+        :return: (id, version, updated_at, actuality) row, if the word exists
+        """
+        return (await db_session.execute(
+            _WORD_VERSION_QUERY, {'word': normalize_word(word), 'language': language}
+        )).one_or_none()
 
     @staticmethod
     async def get_words_by_list(
             db_session: AsyncSession,
             words: list[WordSchema],
     ) -> list['WordModel']:
+        if not words:
+            return []
 
-        filters = [
-            WordModel.word == word.word and WordModel.language == word.language
-            for word in words
-        ]
-        query = select(WordModel).filter(or_(*filters))
+        by_language: dict[str, set[str]] = {}
+        for word in words:
+            by_language.setdefault(word.language, set()).add(normalize_word(word.word))
+
+        # One IN list per language rather than a row value IN: SQLite scans
+        # the table for the latter, both databases use the unique index here
+        query = select(WordModel).filter(or_(*(
+            and_(
+                WordModel.language == language,
+                WordModel.normalized.in_(sorted(normalized)),
+            )
+            for language, normalized in sorted(by_language.items())
+        )))
         result = await db_session.execute(query)
         return list(result.scalars().all())
 
+    @staticmethod
+    async def stream_words(
+            db_session: AsyncSession
+    ) -> AsyncIterator[tuple[str, str]]:
+        """
+        Streams (language, normalized word) of all not deleted words
+        without loading them at once
+        """
+        result = await db_session.stream(_STREAM_WORDS_QUERY)
+        async for language, word in result:
+            yield language, word
+
     def as_tuple(self) -> tuple[str, str]:
         return self.word, self.language
 
+    def touch(self):
+        self.version = (self.version or 0) + 1
+        self.updated_at = datetime.now(timezone.utc)
+
+
+@generic_repr
+class TextModel(Base):
+    """
+    Definition or example text shared between all words referencing it.
+    Rows are addressed by the hash of their content, so the same sentence
+    is stored only once and deduplication never compares full texts.
+    """
+    __tablename__ = 'texts'
+
+    id: Mapped[int] = Column(Integer, primary_key=True, autoincrement=True)
+
+    hash: Mapped[str] = Column(String(64), nullable=False, unique=True)
+    text: Mapped[str] = Column(String, nullable=False)
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    async def get_texts_by_hashes(
+            db_session: AsyncSession,
+            hashes: Iterable[str],
+    ) -> list['TextModel']:
+        hashes = set(hashes)
+        if not hashes:
+            return []
+
+        query = select(TextModel).filter(TextModel.hash.in_(hashes))
+        result = await db_session.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def insert_missing(db_session: AsyncSession, texts: Mapping[str, str]):
+        """
+        Inserts texts, skipping the ones already stored. Concurrent
+        transactions inserting the same text don't fail, the later one waits
+        for the earlier and skips the row.
+        :param db_session: async session, should be pinned to the primary
+        :param texts: text hash -> text
+        """
+        if not texts:
+            return
+
+        insert = _UPSERT_INSERTS[db_session.get_bind().dialect.name]
+        statement = insert(TextModel.__table__).on_conflict_do_nothing(
+            index_elements=[TextModel.hash]
+        )
+        await db_session.execute(statement, [
+            # Same lock order in every transaction
+            {'hash': text_hash, 'text': texts[text_hash]} for text_hash in sorted(texts)
+        ])
+
+
+_rowid_on_sqlite(_partitioned_by_language(WordModel.__table__), 'id')
+
 
 @generic_repr
-class DefinitionModel(Base):
-    __tablename__ = 'definitions'
+class WordCounterModel(Base):
+    """
+    Per-language number of rows in `words` (and how many of them are deleted),
+    changed in the same transactions as the words themselves
+    """
+    __tablename__ = 'word_counters'
 
-    id: Mapped[int] = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    language: Mapped[str] = Column(String(2), primary_key=True)
+    words: Mapped[int] = Column(
+        BigInteger, nullable=False, default=0, server_default='0'
+    )
+    deleted: Mapped[int] = Column(
+        BigInteger, nullable=False, default=0, server_default='0'
+    )
 
-    text: Mapped[str] = Column(String, nullable=False, index=True)
-    word_id: Mapped[int] = Column(Integer, ForeignKey('words.id'))
+    @staticmethod
+    async def increment(
+            db_session: AsyncSession,
+            words: Mapping[str, int],
+            deleted: Mapping[str, int],
+    ):
+        """
+        Adds deltas to the counters, creating missing ones
+        :param db_session: async session, should be pinned to the primary
+        :param words: language -> number of created words
+        :param deleted: language -> change of the deleted words number
+        """
+        rows = [
+            {
+                'language': language,
+                'words': words.get(language, 0),
+                'deleted': deleted.get(language, 0),
+            }
+            # Same lock order in every transaction
+            for language in sorted(set(words) | set(deleted))
+            if words.get(language, 0) or deleted.get(language, 0)
+        ]
+        if not rows:
+            return
 
-    word: Mapped[WordModel] = relationship(WordModel, back_populates='definitions')
+        insert = _UPSERT_INSERTS[db_session.get_bind().dialect.name]
+        statement = insert(WordCounterModel.__table__).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[WordCounterModel.language],
+            set_={
+                'words': WordCounterModel.words + statement.excluded.words,
+                'deleted': WordCounterModel.deleted + statement.excluded.deleted,
+            },
+        )
+        await db_session.execute(statement)
 
+    @staticmethod
+    async def get_total(db_session: AsyncSession, language: str | None) -> int:
+        """
+        :return: number of rows in `words` in the language, or in all languages
+        """
+        if language is None:
+            return (await db_session.execute(_TOTAL_WORDS_QUERY)).scalar_one()
+
+        return (await db_session.execute(
+            _LANGUAGE_WORDS_QUERY, {'language': language}
+        )).scalar_one()
+
+
+class WordAccessStatsModel(Base):
+    """
+    Requests per word and day, summed up from all workers by additive upserts.
+    Words are in the canonical form and may be missing from `words`.
+    """
+    __tablename__ = 'word_access_stats'
 
-class ExampleModel(Base):
-    __tablename__ = 'examples'
+    language: Mapped[str] = Column(String(2), primary_key=True)
+    word: Mapped[str] = Column(String(255), primary_key=True)
+    day: Mapped[date] = Column(Date, primary_key=True, index=True)
+    hits: Mapped[int] = Column(BigInteger, nullable=False, default=0, server_default='0')
 
-    id: Mapped[int] = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    @staticmethod
+    async def add_hits(
+            db_session: AsyncSession, hits: Mapping[tuple[str, str], int], day: date
+    ):
+        """
+        Adds hits to the day's counters, creating missing ones
+        :param db_session: async session, should be pinned to the primary
+        :param hits: (word, language) -> number of requests
+        :param day: day the requests belong to
+        """
+        rows = [
+            {'language': language, 'word': word, 'day': day, 'hits': count}
+            # Same lock order in every transaction
+            for (word, language), count in sorted(
+                hits.items(), key=lambda item: (item[0][1], item[0][0])
+            )
+            if count
+        ]
+        if not rows:
+            return
 
-    text: Mapped[str] = Column(String, nullable=False, index=True)
-    word_id: Mapped[int] = Column(Integer, ForeignKey('words.id'))
+        insert = _UPSERT_INSERTS[db_session.get_bind().dialect.name]
+        statement = insert(WordAccessStatsModel.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                WordAccessStatsModel.language,
+                WordAccessStatsModel.word,
+                WordAccessStatsModel.day,
+            ],
+            set_={'hits': WordAccessStatsModel.hits + statement.excluded.hits},
+        )
+        await db_session.execute(statement, rows)
+
+    @staticmethod
+    async def get_hot_words(
+            db_session: AsyncSession,
+            since: date,
+            language: str | None = None,
+            limit: int = 100,
+    ) -> list[Row]:
+        """
+        Most requested words, for refresh, cache sizing and prewarming decisions
+        :param db_session: async session
+        :param since: first day to count
+        :param language: words of this language only, all languages if None
+        :param limit: max number of words
+        :return: (language, word, hits) rows, the most requested first
+        """
+        query = _HOT_WORDS_QUERY
+        if language is not None:
+            query = query.filter(WordAccessStatsModel.language == language)
+
+        return list((await db_session.execute(
+            query.limit(limit), {'since': since}
+        )).all())
+
+    @staticmethod
+    async def delete_before(db_session: AsyncSession, day: date):
+        await db_session.execute(
+            delete(WordAccessStatsModel).filter(WordAccessStatsModel.day < day)
+        )
+
+
+class UpstreamResponseModel(Base):
+    """
+    The latest raw upstream body of every fetched word, compressed,
+    with the request parameters it was fetched with. Lets stored words be
+    rebuilt with a fixed or extended parser without asking upstream again.
+    """
+    __tablename__ = 'upstream_responses'
+
+    # Body format, picks the parser on reparse
+    source: Mapped[str] = Column(String(32), primary_key=True)
+    source_language: Mapped[str] = Column(String(2), primary_key=True)
+    translation_language: Mapped[str] = Column(String(2), primary_key=True)
+    # As sent upstream, i.e. in the canonical form
+    word: Mapped[str] = Column(String(255), primary_key=True)
+
+    params: Mapped[str] = Column(Text, nullable=False)
+    encoding: Mapped[str] = Column(String(8), nullable=False)
+    body: Mapped[bytes] = Column(LargeBinary, nullable=False)
+    fetched_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+
+    @staticmethod
+    async def save(db_session: AsyncSession, rows: list[dict]):
+        """
+        Inserts responses, replacing the stored ones of the same words
+        :param db_session: async session, should be pinned to the primary
+        :param rows: column values of the responses
+        """
+        if not rows:
+            return
 
-    word: Mapped[WordModel] = relationship(WordModel, back_populates='examples')
+        insert = _UPSERT_INSERTS[db_session.get_bind().dialect.name]
+        statement = insert(UpstreamResponseModel.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                UpstreamResponseModel.source,
+                UpstreamResponseModel.source_language,
+                UpstreamResponseModel.translation_language,
+                UpstreamResponseModel.word,
+            ],
+            set_={
+                column: statement.excluded[column]
+                for column in ('params', 'encoding', 'body', 'fetched_at')
+            },
+        )
+        await db_session.execute(statement, rows)
+
+    @staticmethod
+    async def stream_responses(
+            db_session: AsyncSession,
+            source: str,
+            source_language: str | None = None,
+            chunk_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """
+        Streams stored responses without loading them at once. Rows are plain
+        tuples, so the session doesn't keep every response it has seen.
+        :param db_session: async session, its connection is busy until the end
+        :param source: body format
+        :param source_language: responses of this language only, all if None
+        :param chunk_size: rows fetched from the server at a time
+        :return: (source_language, translation_language, word, encoding, body) rows
+        """
+        query = select(
+            UpstreamResponseModel.source_language,
+            UpstreamResponseModel.translation_language,
+            UpstreamResponseModel.word,
+            UpstreamResponseModel.encoding,
+            UpstreamResponseModel.body,
+        ).filter(UpstreamResponseModel.source == source)
+        if source_language is not None:
+            query = query.filter(UpstreamResponseModel.source_language == source_language)
+
+        result = await db_session.stream(query.execution_options(yield_per=chunk_size))
+        async for row in result:
+            yield row
+
+
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+# Hot statements are built once at import time and only receive parameters
+# per call: requests don't rebuild the select() graph with its loader options,
+# and the cache key memoized on the statement hits the compiled cache directly
+FULL_WORD_LOAD_OPTIONS = (
+    selectinload(WordModel.translations),
+    selectinload(WordModel.synonyms),
+    selectinload(WordModel.examples),
+    selectinload(WordModel.definitions),
+)
+
+_FULL_WORD_QUERY = (
+    select(WordModel)
+    .options(*FULL_WORD_LOAD_OPTIONS)
+    .filter(
+        WordModel.normalized == bindparam('word'),
+        WordModel.language == bindparam('language'),
+    )
+)
+
+_FULL_WORDS_QUERY = (
+    select(WordModel)
+    .options(*FULL_WORD_LOAD_OPTIONS)
+    .filter(
+        WordModel.normalized.in_(bindparam('words', expanding=True)),
+        WordModel.language == bindparam('language'),
+    )
+)
+
+_WORD_VERSION_QUERY = (
+    select(
+        WordModel.id,
+        WordModel.version,
+        WordModel.updated_at,
+        WordModel.actuality,
+    )
+    .filter(
+        WordModel.normalized == bindparam('word'),
+        WordModel.language == bindparam('language'),
+    )
+)
+
+_STREAM_WORDS_QUERY = (
+    select(WordModel.language, WordModel.normalized)
+    .filter(WordModel.deleted.is_not(True))
+    .execution_options(yield_per=10000)
+)
+
+_TOTAL_WORDS_QUERY = select(func.coalesce(func.sum(WordCounterModel.words), 0))
+
+_LANGUAGE_WORDS_QUERY = _TOTAL_WORDS_QUERY.filter(
+    WordCounterModel.language == bindparam('language')
+)
+
+_HOT_WORDS_QUERY = (
+    select(
+        WordAccessStatsModel.language,
+        WordAccessStatsModel.word,
+        func.sum(WordAccessStatsModel.hits).label('hits'),
+    )
+    .filter(WordAccessStatsModel.day >= bindparam('since'))
+    .group_by(WordAccessStatsModel.language, WordAccessStatsModel.word)
+    .order_by(
+        func.sum(WordAccessStatsModel.hits).desc(),
+        WordAccessStatsModel.language,
+        WordAccessStatsModel.word,
+    )
+)
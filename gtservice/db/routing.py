@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import Delete, Insert, Update, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+USE_PRIMARY_KEY = 'use_primary'
+REPLICA_KEY = 'replica'
+
+
+class ReplicaSet:
+    """
+    Round-robin rotation over read replicas.
+    Replicas failing a health check are removed from rotation
+    until they pass the next one.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], health_check_timeout: float):
+        self._engines = engines
+        self._healthy = list(engines)
+        self._counter = itertools.count()
+        self._health_check_timeout = health_check_timeout
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return self._engines
+
+    @property
+    def healthy(self) -> list[AsyncEngine]:
+        return self._healthy
+
+    def choose(self) -> AsyncEngine | None:
+        healthy = self._healthy
+        if not healthy:
+            return None
+
+        return healthy[next(self._counter) % len(healthy)]
+
+    @staticmethod
+    async def _select_one(engine: AsyncEngine):
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    async def _ping(self, engine: AsyncEngine) -> bool:
+        try:
+            await asyncio.wait_for(self._select_one(engine), self._health_check_timeout)
+        except Exception:
+            logger.warning(
+                'Replica %s failed health check',
+                engine.url.render_as_string(hide_password=True),
+                exc_info=True,
+            )
+            return False
+
+        return True
+
+    async def check_health(self):
+        results = await asyncio.gather(*(self._ping(eng) for eng in self._engines))
+        healthy = [eng for eng, ok in zip(self._engines, results) if ok]
+
+        if len(healthy) != len(self._healthy):
+            logger.info(
+                'Replicas in rotation: %d of %d', len(healthy), len(self._engines)
+            )
+
+        self._healthy = healthy
+
+    async def run_health_checks(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to a healthy replica and everything else to the primary.
+    The replica is chosen once per session, so all reads of a request
+    see the same replication lag and hold a connection on one replica only.
+    Once the session has written (or was pinned with `use_primary`)
+    all the following statements go to the primary, so a request
+    always reads its own writes.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: ReplicaSet, **kwargs):
+        super().__init__(**kwargs)
+        self._primary = primary
+        self._replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.info.get(USE_PRIMARY_KEY)
+            or self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, '_for_update_arg', None) is not None
+        ):
+            self.info[USE_PRIMARY_KEY] = True
+            return self._primary.sync_engine
+
+        replica = self.info.get(REPLICA_KEY)
+        if replica is None:
+            replica = self._replicas.choose()
+            if replica is None:
+                return self._primary.sync_engine
+            self.info[REPLICA_KEY] = replica
+
+        return replica.sync_engine
+
+
+def use_primary(db_session: AsyncSession):
+    """
+    Pins the session to the primary, e.g. before a read-modify-write
+    :param db_session: async session
+    """
+    db_session.info[USE_PRIMARY_KEY] = True
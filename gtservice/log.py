@@ -0,0 +1,154 @@
+import copy
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from gtservice import settings
+
+ACCESS_LOGGER_NAME = 'gtservice.access'
+
+# Attributes every LogRecord has, anything else came in through `extra`
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', None, None).__dict__
+) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line with the standard fields
+    and everything passed through `extra`
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _LoopQueueHandler(QueueHandler):
+    """
+    Enqueues records for the listener thread. Only the message is rendered
+    on the calling thread, formatting and I/O happen in the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+
+class LoggingPipeline:
+    """
+    Root logger -> queue -> listener thread -> stream handler.
+    The event loop only pays for putting a record into the queue.
+    """
+
+    def __init__(self, handler: logging.Handler):
+        self._handler = handler
+        self._queue_handler = _LoopQueueHandler(queue.SimpleQueue())
+        self._listener: QueueListener | None = None
+
+    @property
+    def queue_handler(self) -> logging.Handler:
+        return self._queue_handler
+
+    def start(self):
+        if self._listener is None:
+            self._listener = QueueListener(
+                self._queue_handler.queue, self._handler, respect_handler_level=True
+            )
+            self._listener.start()
+
+    def stop(self):
+        """
+        Flushes the queued records and stops the listener thread
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def restart_after_fork(self):
+        # The listener thread doesn't survive fork() and the queue may have been
+        # locked by it at that moment, so the child starts over with fresh ones
+        if self._listener is not None:
+            self._queue_handler.queue = queue.SimpleQueue()
+            self._listener = None
+            self.start()
+
+
+_pipeline: LoggingPipeline | None = None
+
+
+def setup_logging() -> LoggingPipeline:
+    global _pipeline
+
+    if _pipeline is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(
+            JsonFormatter() if settings.LOG_FORMAT == 'json'
+            else logging.Formatter(TEXT_FORMAT)
+        )
+
+        _pipeline = LoggingPipeline(handler)
+        os.register_at_fork(after_in_child=_pipeline.restart_after_fork)
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL)
+        root.addHandler(_pipeline.queue_handler)
+
+    _pipeline.start()
+    return _pipeline
+
+
+def shutdown_logging():
+    """
+    Detaches the pipeline from the root logger and flushes it.
+    Records logged afterwards go to the last resort handler,
+    not to a queue that nothing drains anymore.
+    """
+    global _pipeline
+
+    if _pipeline is not None:
+        logging.getLogger().removeHandler(_pipeline.queue_handler)
+        _pipeline.stop()
+        _pipeline = None
+
+
+def should_log_access(status_code: int, duration: float) -> bool:
+    """
+    Failed and slow requests are always logged, the rest are sampled
+    :param status_code: response status code
+    :param duration: request duration in seconds
+    """
+    return (
+        status_code >= 500
+        or duration >= settings.LOG_SLOW_REQUEST_THRESHOLD
+        or random.random() < settings.LOG_ACCESS_SAMPLE_RATE
+    )
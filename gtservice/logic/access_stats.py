@@ -0,0 +1,62 @@
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, timezone
+
+from gtservice import settings
+from gtservice.db import database_session_context
+from gtservice.db.models import WordAccessStatsModel
+from gtservice.db.routing import use_primary
+from gtservice.logic.flushing import BufferedFlusher
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class AccessTracker(BufferedFlusher[tuple[str, str], int]):
+    """
+    Counts word requests in memory and adds them to `word_access_stats`
+    from a background task every `flush_interval` seconds, or sooner when
+    `max_words` distinct words are waiting. Recording is a dict update,
+    requests never wait for the database.
+    Counts that failed to flush are kept for the next attempt.
+    """
+
+    label = 'access stats'
+
+    def __init__(self, flush_interval: float, max_words: int, retention_days: int):
+        super().__init__(flush_interval, max_words)
+        self._retention_days = retention_days
+        self._pruned_on: date | None = None
+
+    def record(self, word: str, language: str):
+        """
+        :param word: word in the canonical form
+        :param language: word language
+        """
+        self._add((word, language), 1)
+
+    def record_many(self, words: Iterable[tuple[str, str]]):
+        for word, language in words:
+            self.record(word, language)
+
+    def _combine(self, older: int, newer: int) -> int:
+        return older + newer
+
+    async def _write(self, items: dict[tuple[str, str], int]):
+        day = _today()
+        async with database_session_context() as db_session:
+            use_primary(db_session)
+            await WordAccessStatsModel.add_hits(db_session, items, day)
+            if self._pruned_on != day:
+                await WordAccessStatsModel.delete_before(
+                    db_session, day - timedelta(days=self._retention_days)
+                )
+            await db_session.commit()
+        self._pruned_on = day
+
+
+access_tracker = AccessTracker(
+    flush_interval=settings.ACCESS_STATS_FLUSH_INTERVAL,
+    max_words=settings.ACCESS_STATS_MAX_WORDS,
+    retention_days=settings.ACCESS_STATS_RETENTION_DAYS,
+)
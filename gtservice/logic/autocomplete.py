@@ -0,0 +1,398 @@
+import asyncio
+import heapq
+import logging
+import operator
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from bisect import bisect_left
+from collections.abc import Awaitable, Iterable, Iterator, Sequence
+from itertools import islice
+
+from gtservice import settings
+from gtservice.db import database_session_context
+from gtservice.db.models import WordAccessStatsModel, WordModel
+from gtservice.translation_loader.schemas import WordSchema, normalize_word
+
+logger = logging.getLogger(__name__)
+
+_LOAD_RETRY_DELAY = 30
+
+
+class PackedWords(Sequence):
+    """
+    Immutable sorted list of UTF-8 encoded words kept in a single buffer.
+    Costs the word bytes plus 4 bytes of offset per word, instead of
+    a Python object per word.
+    """
+
+    def __init__(self, words: Iterable[bytes] = ()):
+        words = list(words)
+        if not all(map(operator.lt, words, islice(words, 1, None))):
+            words = sorted(set(words))
+
+        buffer = bytearray()
+        offsets = array('I', [0])
+        for word in words:
+            buffer += word
+            offsets.append(len(buffer))
+
+        self._buffer = bytes(buffer)
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[bytes]:
+        buffer, offsets = self._buffer, self._offsets
+        for index in range(len(offsets) - 1):
+            yield buffer[offsets[index]:offsets[index + 1]]
+
+    def __contains__(self, word: bytes) -> bool:
+        index = bisect_left(self, word)
+        return index < len(self) and self[index] == word
+
+    def iter_from(self, word: bytes) -> Iterator[bytes]:
+        """
+        Iterates words starting from the first one not less than `word`
+        """
+        buffer, offsets = self._buffer, self._offsets
+        for index in range(bisect_left(self, word), len(offsets) - 1):
+            yield buffer[offsets[index]:offsets[index + 1]]
+
+    def memory_usage(self) -> int:
+        return sys.getsizeof(self._buffer) + sys.getsizeof(self._offsets)
+
+
+class PrefixIndex:
+    """
+    Prefix lookup over the words of one language.
+    Words live in a packed sorted base, changes since the last rebuild
+    are kept in a small sorted overlay of added words and a set of removed ones.
+    """
+
+    def __init__(self, base: PackedWords | None = None):
+        self.base = base if base is not None else PackedWords()
+        self.added: list[bytes] = []
+        self.removed: set[bytes] = set()
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.added) - len(self.removed)
+
+    @property
+    def overlay_size(self) -> int:
+        return len(self.added) + len(self.removed)
+
+    def __contains__(self, word: str) -> bool:
+        encoded = word.encode()
+        if encoded in self.removed:
+            return False
+
+        index = bisect_left(self.added, encoded)
+        return (
+            index < len(self.added) and self.added[index] == encoded
+            or encoded in self.base
+        )
+
+    def add(self, word: str):
+        encoded = word.encode()
+        if encoded in self.base:
+            self.removed.discard(encoded)
+            return
+
+        index = bisect_left(self.added, encoded)
+        if index == len(self.added) or self.added[index] != encoded:
+            self.added.insert(index, encoded)
+
+    def remove(self, word: str):
+        encoded = word.encode()
+        index = bisect_left(self.added, encoded)
+        if index < len(self.added) and self.added[index] == encoded:
+            del self.added[index]
+        elif encoded in self.base:
+            self.removed.add(encoded)
+
+    def _iter_from(self, word: bytes) -> Iterator[bytes]:
+        merged = heapq.merge(
+            self.base.iter_from(word),
+            islice(self.added, bisect_left(self.added, word), None),
+        )
+        return (item for item in merged if item not in self.removed)
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        """
+        :return: up to `limit` words starting with `prefix`, in lexicographic order
+        """
+        encoded = prefix.encode()
+        result = []
+        for word in self._iter_from(encoded):
+            if len(result) == limit or not word.startswith(encoded):
+                break
+            result.append(word.decode())
+
+        return result
+
+    def snapshot(self) -> tuple[PackedWords, list[bytes], set[bytes]]:
+        return self.base, list(self.added), set(self.removed)
+
+    @staticmethod
+    def merge(
+            base: PackedWords, added: list[bytes], removed: set[bytes]
+    ) -> PackedWords:
+        """
+        Folds an overlay snapshot into a new packed base, safe to run in a thread
+        """
+        return PackedWords(
+            word for word in heapq.merge(base, added) if word not in removed
+        )
+
+    def memory_usage(self) -> int:
+        return (
+            self.base.memory_usage()
+            + sys.getsizeof(self.added) + sum(map(sys.getsizeof, self.added))
+            + sys.getsizeof(self.removed) + sum(map(sys.getsizeof, self.removed))
+        )
+
+
+class RankedWords:
+    """
+    Request counts of the most requested words of one language,
+    sorted by word for prefix lookups
+    """
+
+    def __init__(self, hits: dict[str, int]):
+        self._hits = hits
+        self._words = sorted(hits)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def complete(self, prefix: str) -> list[str]:
+        """
+        :return: words starting with `prefix`, the most requested first
+        """
+        matches = []
+        for word in islice(self._words, bisect_left(self._words, prefix), None):
+            if not word.startswith(prefix):
+                break
+            matches.append(word)
+
+        hits = self._hits
+        return sorted(matches, key=lambda word: (-hits[word], word))
+
+
+class AutocompleteIndex:
+    """
+    Per-language prefix indexes over the stored words.
+
+    The index is loaded from the database in the background and then kept
+    up to date by the code paths that write words. Overlays larger than
+    `overlay_limit` are folded into the packed base in a worker thread.
+    Changes made while the base is being rebuilt are journaled
+    and replayed on top of the new base.
+    Suggestions are ranked by recent requests: the most requested words
+    of every language come first, then the rest in lexicographic order.
+    A disabled index ignores changes and stays empty.
+    """
+
+    def __init__(
+            self,
+            overlay_limit: int,
+            enabled: bool = True,
+            ranked_words: int = 0,
+            ranking_days: int = 7,
+    ):
+        self._overlay_limit = overlay_limit
+        self._enabled = enabled
+        self._ranked_words = ranked_words
+        self._ranking_days = ranking_days
+        self._indexes: dict[str, PrefixIndex] = {}
+        self._ranked: dict[str, RankedWords] = {}
+        self._journal: list[tuple[bool, str, str]] | None = None
+        self._ready = False
+        self._task: asyncio.Task | None = None
+        self._compaction: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._journal is not None
+
+    def start(self, refresh_interval: float):
+        if self._enabled and self._task is None:
+            self._task = asyncio.create_task(self._load_forever(refresh_interval))
+
+    async def stop(self):
+        for task in (self._task, self._compaction):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        self._task = None
+        self._compaction = None
+
+    def add_words(self, words: Iterable[WordSchema]):
+        if not self._enabled:
+            return
+
+        for word in words:
+            self._apply(True, normalize_word(word.word), word.language)
+
+    def remove_words(self, words: Iterable[WordSchema]):
+        if not self._enabled:
+            return
+
+        for word in words:
+            self._apply(False, normalize_word(word.word), word.language)
+
+    def complete(self, prefix: str, language: str, limit: int) -> list[str]:
+        """
+        :return: up to `limit` stored words starting with `prefix`,
+            the most requested first
+        """
+        index = self._indexes.get(language)
+        if index is None:
+            return []
+
+        result = []
+        ranked = self._ranked.get(language)
+        if ranked is not None:
+            # Requested words may have been deleted since or never stored
+            result = [word for word in ranked.complete(prefix) if word in index][:limit]
+        if len(result) < limit:
+            seen = set(result)
+            rest = (
+                word for word in index.complete(prefix, limit + len(result))
+                if word not in seen
+            )
+            result.extend(islice(rest, limit - len(result)))
+
+        return result
+
+    def indexes(self) -> dict[str, PrefixIndex]:
+        return dict(self._indexes)
+
+    def _apply(self, is_added: bool, word: str, language: str):
+        if not self._enabled:
+            return
+
+        index = self._indexes.get(language)
+        if index is None:
+            index = self._indexes[language] = PrefixIndex()
+
+        if is_added:
+            index.add(word)
+        else:
+            index.remove(word)
+
+        if self._journal is not None:
+            self._journal.append((is_added, word, language))
+        elif index.overlay_size > self._overlay_limit and self._compaction is None:
+            self._compaction = asyncio.create_task(self._compact())
+
+    async def _rebuild(self, build: Awaitable[dict[str, PackedWords]]):
+        self._journal = []
+        try:
+            bases = await build
+        finally:
+            journal, self._journal = self._journal, None
+
+        self._indexes = {
+            language: PrefixIndex(base) for language, base in bases.items()
+        }
+        for is_added, word, language in journal:
+            self._apply(is_added, word, language)
+
+    async def _compact(self):
+        snapshots = {
+            language: index.snapshot() for language, index in self._indexes.items()
+        }
+
+        def merge_all() -> dict[str, PackedWords]:
+            return {
+                language: PrefixIndex.merge(*snapshot)
+                for language, snapshot in snapshots.items()
+            }
+
+        try:
+            await self._rebuild(asyncio.to_thread(merge_all))
+        except Exception:
+            logger.exception('Failed to compact the autocomplete index')
+        finally:
+            self._compaction = None
+
+    async def _load_words(self) -> dict[str, PackedWords]:
+        words: dict[str, list[bytes]] = {}
+        async with database_session_context() as db_session:
+            async for language, word in WordModel.stream_words(db_session):
+                words.setdefault(language, []).append(word.encode())
+
+        def pack_all() -> dict[str, PackedWords]:
+            return {
+                language: PackedWords(sorted(items))
+                for language, items in words.items()
+            }
+
+        return await asyncio.to_thread(pack_all)
+
+    async def _load_ranking(self, languages: Iterable[str]) -> dict[str, RankedWords]:
+        if self._ranked_words <= 0:
+            return {}
+
+        # Access stats are kept per UTC day
+        since = datetime.now(timezone.utc).date() - timedelta(days=self._ranking_days)
+        ranked = {}
+        async with database_session_context() as db_session:
+            for language in languages:
+                rows = await WordAccessStatsModel.get_hot_words(
+                    db_session, since, language, self._ranked_words
+                )
+                ranked[language] = RankedWords({word: int(hits) for _, word, hits in rows})
+
+        return ranked
+
+    async def load(self):
+        while self._compaction is not None:
+            await asyncio.wait([self._compaction])
+
+        await self._rebuild(self._load_words())
+        self._ranked = await self._load_ranking(list(self._indexes))
+        self._ready = True
+        logger.info(
+            'Autocomplete index loaded: %d words',
+            sum(len(index) for index in self._indexes.values())
+        )
+
+    async def _load_forever(self, refresh_interval: float):
+        while True:
+            try:
+                await self.load()
+            except Exception:
+                logger.exception('Failed to load the autocomplete index')
+                await asyncio.sleep(_LOAD_RETRY_DELAY)
+                continue
+
+            if refresh_interval <= 0:
+                return
+            await asyncio.sleep(refresh_interval)
+
+
+autocomplete_index = AutocompleteIndex(
+    overlay_limit=settings.AUTOCOMPLETE_OVERLAY_LIMIT,
+    enabled=settings.AUTOCOMPLETE_ENABLED,
+    ranked_words=settings.AUTOCOMPLETE_RANKED_WORDS,
+    ranking_days=settings.AUTOCOMPLETE_RANKING_DAYS,
+)
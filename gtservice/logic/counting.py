@@ -0,0 +1,89 @@
+import enum
+import json
+import time
+from collections.abc import Hashable
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice import settings
+
+
+class CountMode(str, enum.Enum):
+    # COUNT(*) over the filtered query
+    EXACT = 'exact'
+    # Exact count, reused for the same filters for a while
+    CACHED = 'cached'
+    # Planner estimate, Postgres only, exact elsewhere
+    ESTIMATED = 'estimated'
+    # No totals at all
+    NONE = 'none'
+
+    def __str__(self):
+        return str(self.value)
+
+
+class CountCache:
+    """
+    Counts by filters with a time to live.
+    The oldest entry is evicted once `max_size` is reached.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._counts: dict[Hashable, tuple[float, int]] = {}
+
+    def get(self, key: Hashable) -> int | None:
+        entry = self._counts.get(key)
+        if entry is None:
+            return None
+
+        expires_at, count = entry
+        if expires_at < time.monotonic():
+            del self._counts[key]
+            return None
+
+        return count
+
+    def set(self, key: Hashable, count: int):
+        self._counts.pop(key, None)
+        if len(self._counts) >= self._max_size:
+            del self._counts[next(iter(self._counts))]
+
+        self._counts[key] = (time.monotonic() + self._ttl, count)
+
+    def clear(self):
+        self._counts.clear()
+
+
+count_cache = CountCache(
+    ttl=settings.LIST_COUNT_CACHE_TTL,
+    max_size=settings.LIST_COUNT_CACHE_SIZE,
+)
+
+
+async def estimate_count(
+        db_session: AsyncSession, query: Select, params: dict
+) -> int | None:
+    """
+    Asks the Postgres planner how many rows the query returns.
+    Costs a plan, not an execution, but is only as good as the table statistics.
+    :return: estimated number of rows, None if the database can't estimate
+    """
+    dialect = db_session.get_bind().dialect
+    if dialect.name != 'postgresql':
+        return None
+
+    # The statement as the driver gets it, with positional placeholders
+    compiled = query.compile(dialect=dialect)
+    connection = await db_session.connection()
+    plan = (await connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}',
+        tuple(params[name] for name in compiled.positiontup),
+    )).scalar_one()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Generic, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class BufferedFlusher(ABC, Generic[K, V]):
+    """
+    Keeps values in memory by key and writes them from a background task
+    every `flush_interval` seconds, or sooner when `max_items` keys are
+    waiting. Adding is a dict update, callers never wait for the database.
+    Values that failed to be written are kept for the next attempt.
+
+    Subclasses write a batch in `_write` and decide in `_combine`
+    what happens to a key added again before it is written.
+    """
+
+    # What the values are, for log messages
+    label = 'items'
+
+    def __init__(self, flush_interval: float, max_items: int):
+        self._flush_interval = flush_interval
+        self._max_items = max_items
+
+        self._pending: dict[K, V] = {}
+        self._dropped = 0
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+        self._flushing: asyncio.Future | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None
+
+    def start(self):
+        if self._flusher is None:
+            self._full = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_forever())
+
+    async def stop(self):
+        """
+        Stops the background task and flushes what is left
+        """
+        if self._flusher is None:
+            return
+
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+        await self.flush()
+
+    @abstractmethod
+    def _combine(self, older: V, newer: V) -> V:
+        """
+        :return: value kept for a key added again before it was written
+        """
+
+    @abstractmethod
+    async def _write(self, items: dict[K, V]):
+        """
+        Writes a batch, raises if nothing was written
+        """
+
+    def _add(self, key: K, value: V):
+        if self._flusher is None:
+            return
+
+        if key in self._pending:
+            self._pending[key] = self._combine(self._pending[key], value)
+            return
+        if len(self._pending) >= self._max_items:
+            self._dropped += 1
+            self._full.set()
+            return
+
+        self._pending[key] = value
+        if len(self._pending) >= self._max_items:
+            self._full.set()
+
+    async def flush(self):
+        items, self._pending = self._pending, {}
+        dropped, self._dropped = self._dropped, 0
+        self._full.clear()
+        if dropped:
+            logger.warning('%s buffer was full, %d dropped', self.label, dropped)
+        if not items:
+            return
+
+        try:
+            await self._write(items)
+        except Exception:
+            logger.exception('Failed to flush %d %s', len(items), self.label)
+            # Put back under the limit, the next flush retries them
+            for key, value in items.items():
+                if key in self._pending:
+                    self._pending[key] = self._combine(value, self._pending[key])
+                elif len(self._pending) < self._max_items:
+                    self._pending[key] = value
+
+    async def _flush_forever(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            # Values taken out for a flush are lost if it is cancelled halfway
+            self._flushing = asyncio.ensure_future(self.flush())
+            await asyncio.shield(self._flushing)
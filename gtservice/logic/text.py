@@ -0,0 +1,32 @@
+import re
+from dataclasses import dataclass, field
+
+from gtservice.translation_loader.schemas import normalize_word
+
+# Letters, optionally joined by hyphens or apostrophes: "don't", "well-known"
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+
+
+@dataclass
+class TextToken:
+    word: str
+    positions: list[int] = field(default_factory=list)
+
+
+def tokenize(text: str, max_word_length: int) -> list[TextToken]:
+    """
+    Splits a text into normalized unique words, in order of first appearance
+    :param text: text to split
+    :param max_word_length: longer tokens are skipped
+    :return: unique tokens with their positions in the text (word indexes)
+    """
+    tokens: dict[str, TextToken] = {}
+
+    for position, match in enumerate(TOKEN_PATTERN.finditer(text)):
+        word = normalize_word(match.group().replace('’', "'"))
+        if len(word) > max_word_length:
+            continue
+
+        tokens.setdefault(word, TextToken(word)).positions.append(position)
+
+    return list(tokens.values())
@@ -1,102 +1,183 @@
 import logging
+from collections import Counter
+from collections.abc import Iterable
 from dataclasses import asdict
+from itertools import chain
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from gtservice.db.common import Actuality
-from gtservice.db.models import WordModel, ExampleModel, DefinitionModel
-from gtservice.translation_loader.schemas import TranslatedWordSchema
+from gtservice.db.models import WordModel, TextModel, WordCounterModel
+from gtservice.db.routing import use_primary
+from gtservice.logic.autocomplete import autocomplete_index
+from gtservice.node_cache import node_cache, word_key
+from gtservice.translation_loader.schemas import (
+    TranslatedWordSchema, TextSchema, WordSchema, normalize_word
+)
 
 logger = logging.getLogger(__name__)
 
 
-async def insert_or_update_translation(
+def linked_words(headword: WordSchema, words: Iterable[WordSchema]) -> list[WordSchema]:
+    """
+    Words the way `merge_translation` links them: one per canonical form,
+    the first spelling wins, and never the headword itself
+    :param headword: word the others are linked to
+    :param words: fetched translations or synonyms
+    """
+    seen = {(normalize_word(headword.word), headword.language)}
+    result = []
+    for item in words:
+        key = (normalize_word(item.word), item.language)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+
+    return result
+
+
+async def _get_or_create_texts(
         db_session: AsyncSession,
-        updated_word_info: TranslatedWordSchema
-) -> WordModel:
+        texts: Iterable[TextSchema],
+) -> dict[str, TextModel]:
     """
-    Persists an updated word schema with all dependencies to the database.
-    Merges if needed.
+    Resolves texts to shared text models by their content hash.
+    Only texts missing from the database are inserted, concurrent
+    writers of the same text end up with the same row.
     :param db_session: async session
+    :param texts: definitions and examples to resolve
+    :return: text models by content hash
+    """
+    new_texts = {TextModel.hash_text(item.text): item.text for item in texts}
+    texts_by_hash = {
+        mdl.hash: mdl
+        for mdl in await TextModel.get_texts_by_hashes(db_session, new_texts)
+    }
+
+    missing_texts = {
+        text_hash: text
+        for text_hash, text in new_texts.items()
+        if text_hash not in texts_by_hash
+    }
+    if missing_texts:
+        await TextModel.insert_missing(db_session, missing_texts)
+        texts_by_hash.update(
+            (mdl.hash, mdl)
+            for mdl in await TextModel.get_texts_by_hashes(db_session, missing_texts)
+        )
+
+    return texts_by_hash
+
+
+def _link_texts(
+        linked_texts: list[TextModel],
+        new_texts: list[TextSchema],
+        texts_by_hash: dict[str, TextModel],
+):
+    present_hashes = {item.hash for item in linked_texts}
+    for new_text in new_texts:
+        text_hash = TextModel.hash_text(new_text.text)
+        if text_hash not in present_hashes:
+            present_hashes.add(text_hash)
+            linked_texts.append(texts_by_hash[text_hash])
+
+
+async def merge_translation(
+        db_session: AsyncSession,
+        updated_word_info: TranslatedWordSchema
+):
+    """
+    Merges an updated word schema with all dependencies into the session
+    without committing, so several words can share one transaction.
+    :param db_session: async session, should be pinned to the primary
     :param updated_word_info: new or updated word information
-    :return: created/updated word model
     """
     word_model = await WordModel.get_full_word(
         db_session, updated_word_info.word.word, updated_word_info.word.language
     )
 
     if word_model is None:
-        logger.debug(
-            f"Creating a new word: {updated_word_info.word} "
-        )
+        logger.debug("Creating a new word: %s", updated_word_info.word)
 
         word_model = WordModel(**asdict(updated_word_info.word))
         new_word_created = True
     else:
-        logger.debug(
-            f"Updating an old word: {updated_word_info.word}"
-        )
+        logger.debug("Updating an old word: %s", updated_word_info.word)
         new_word_created = False
 
+    # Counter deltas, new words have no id until they are flushed
+    created = Counter([word_model.language] if new_word_created else [])
+    undeleted = {word_model.language: -1} if word_model.deleted else {}
+
     word_model.actuality = Actuality.ACTUAL
     word_model.deleted = False
+    word_model.touch()
 
     all_persisted_words = await WordModel.get_words_by_list(
         db_session, updated_word_info.get_all_words()
     )
 
+    # Keyed by the canonical form, new stubs are added as they are created
+    # so a word listed twice or in both lists gets a single row
     all_persisted_words_dict = {
-        (w.word, w.language): w for w in all_persisted_words
+        (w.normalized, w.language): w for w in all_persisted_words
     }
-
-    t_trans = set()
     word_model.translations.clear()
-    for new_translation in updated_word_info.translations:
-        present_word = all_persisted_words_dict.get(
-            (new_translation.word, new_translation.language)
-        )
+    for new_translation in linked_words(
+            updated_word_info.word, updated_word_info.translations
+    ):
+        key = (normalize_word(new_translation.word), new_translation.language)
+        present_word = all_persisted_words_dict.get(key)
         if present_word is None:
             present_word = WordModel(**asdict(new_translation))
+            all_persisted_words_dict[key] = present_word
+            created[present_word.language] += 1
 
-        if present_word is not None and new_translation.word not in t_trans:
-            t_trans.add(present_word.word)
-            word_model.translations.append(present_word)
+        word_model.translations.append(present_word)
 
-    t_syn = set()
     word_model.synonyms.clear()
-    for new_synonym in updated_word_info.synonyms:
-        present_word = all_persisted_words_dict.get(
-            (new_synonym.word, new_synonym.language)
-        )
+    for new_synonym in linked_words(updated_word_info.word, updated_word_info.synonyms):
+        key = (normalize_word(new_synonym.word), new_synonym.language)
+        present_word = all_persisted_words_dict.get(key)
         if present_word is None:
             present_word = WordModel(**asdict(new_synonym))
+            all_persisted_words_dict[key] = present_word
+            created[present_word.language] += 1
 
-        if present_word is not None and new_synonym.word not in t_syn:
-            word_model.synonyms.append(present_word)
-            t_syn.add(present_word.word)
-
-    other_present_examples = {
-        item.text for item in word_model.examples
-    }
-    word_model.examples.extend([
-        ExampleModel(**asdict(nex))
-        for nex in updated_word_info.examples
-        if nex.text not in other_present_examples
-    ])
+        word_model.synonyms.append(present_word)
 
-    other_present_definitions = {
-        item.text for item in word_model.definitions
-    }
-    word_model.definitions.extend([
-        DefinitionModel(**asdict(ndef))
-        for ndef in updated_word_info.definitions
-        if ndef.text not in other_present_definitions
-    ])
+    texts_by_hash = await _get_or_create_texts(
+        db_session,
+        chain(updated_word_info.examples, updated_word_info.definitions)
+    )
+    _link_texts(word_model.examples, updated_word_info.examples, texts_by_hash)
+    _link_texts(word_model.definitions, updated_word_info.definitions, texts_by_hash)
 
     if new_word_created:
         db_session.add(word_model)
 
+    await WordCounterModel.increment(db_session, words=created, deleted=undeleted)
+
+
+async def insert_or_update_translation(
+        db_session: AsyncSession,
+        updated_word_info: TranslatedWordSchema
+) -> WordModel:
+    """
+    Persists an updated word schema with all dependencies to the database.
+    Merges if needed.
+    :param db_session: async session
+    :param updated_word_info: new or updated word information
+    :return: created/updated word model
+    """
+    use_primary(db_session)
+
+    await merge_translation(db_session, updated_word_info)
     await db_session.commit()
+    autocomplete_index.add_words(updated_word_info.get_all_words())
+    await node_cache.delete([
+        word_key(updated_word_info.word.word, updated_word_info.word.language)
+    ])
 
     world_model_full = await WordModel.get_full_word(
         db_session,
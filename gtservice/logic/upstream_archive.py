@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from gtservice import settings
+from gtservice.db import database_session_context
+from gtservice.db.models import UpstreamResponseModel
+from gtservice.db.routing import use_primary
+from gtservice.logic.flushing import BufferedFlusher
+
+GZIP_ENCODING = 'gzip'
+
+# (source, source language, translation language, word)
+_ResponseKey = tuple[str, str, str, str]
+# (request parameters, raw body, fetch time)
+_Response = tuple[dict[str, Any], bytes, datetime]
+
+
+def compress_body(body: bytes, level: int) -> tuple[str, bytes]:
+    """
+    :return: encoding name and the compressed body
+    """
+    return GZIP_ENCODING, gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def decompress_body(encoding: str, body: bytes) -> bytes:
+    if encoding != GZIP_ENCODING:
+        raise ValueError(f'Unsupported body encoding: {encoding}')
+
+    return gzip.decompress(body)
+
+
+class UpstreamArchive(BufferedFlusher[_ResponseKey, _Response]):
+    """
+    Keeps raw upstream bodies in memory and saves them to `upstream_responses`
+    from a background task every `flush_interval` seconds, or sooner when
+    `max_pending` bodies are waiting. Compression runs in a thread during the
+    flush, fetches only pay for a dict update.
+    A word fetched again before the flush is stored once, with the latest body.
+    """
+
+    label = 'upstream responses'
+
+    def __init__(self, flush_interval: float, max_pending: int, compression_level: int):
+        super().__init__(flush_interval, max_pending)
+        self._compression_level = compression_level
+
+    def record(
+            self,
+            source: str,
+            source_language: str,
+            translation_language: str,
+            word: str,
+            params: dict[str, Any],
+            body: bytes,
+    ):
+        """
+        :param source: body format, e.g. "google"
+        :param source_language: source language code
+        :param translation_language: destination language code
+        :param word: word as sent upstream
+        :param params: request parameters
+        :param body: response body as received
+        """
+        self._add(
+            (source, source_language, translation_language, word),
+            (params, body, datetime.now(timezone.utc)),
+        )
+
+    def _combine(self, older: _Response, newer: _Response) -> _Response:
+        return newer
+
+    def _build_rows(self, items: dict[_ResponseKey, _Response]) -> list[dict[str, Any]]:
+        rows = []
+        # Same lock order in every transaction
+        for key in sorted(items):
+            source, source_language, translation_language, word = key
+            params, body, fetched_at = items[key]
+            encoding, compressed = compress_body(body, self._compression_level)
+            rows.append({
+                'source': source,
+                'source_language': source_language,
+                'translation_language': translation_language,
+                'word': word,
+                'params': json.dumps(params, ensure_ascii=False),
+                'encoding': encoding,
+                'body': compressed,
+                'fetched_at': fetched_at,
+            })
+
+        return rows
+
+    async def _write(self, items: dict[_ResponseKey, _Response]):
+        rows = await asyncio.to_thread(self._build_rows, items)
+        async with database_session_context() as db_session:
+            use_primary(db_session)
+            await UpstreamResponseModel.save(db_session, rows)
+            await db_session.commit()
+
+
+upstream_archive = UpstreamArchive(
+    flush_interval=settings.UPSTREAM_ARCHIVE_FLUSH_INTERVAL,
+    max_pending=settings.UPSTREAM_ARCHIVE_MAX_PENDING,
+    compression_level=settings.UPSTREAM_ARCHIVE_COMPRESSION_LEVEL,
+)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+
+from gtservice import settings
+from gtservice.db import database_session_context
+from gtservice.db.routing import use_primary
+from gtservice.logic.autocomplete import autocomplete_index
+from gtservice.logic.translation import merge_translation
+from gtservice.node_cache import node_cache, word_key
+from gtservice.translation_loader.schemas import TranslatedWordSchema, normalize_word
+
+logger = logging.getLogger(__name__)
+
+
+def _word_key(info: TranslatedWordSchema) -> tuple[str, str]:
+    return normalize_word(info.word.word), info.word.language
+
+
+class WriteBehindQueue:
+    """
+    Persists fetched words in the background. A single writer task
+    takes up to `batch_size` queued words (waiting at most `batch_delay`
+    for the batch to fill up) and merges them in one transaction.
+    A full queue makes `submit` wait, which slows callers down
+    instead of growing memory.
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            batch_size: int,
+            batch_delay: float,
+            max_retries: int,
+            retry_delay: float,
+    ):
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._batch_delay = batch_delay
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+
+        self._queue: asyncio.Queue[TranslatedWordSchema] | None = None
+        self._writer: asyncio.Task | None = None
+        # Queued, not yet persisted words, so they can be served meanwhile
+        self._pending: dict[tuple[str, str], TranslatedWordSchema] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None
+
+    def start(self):
+        if self._writer is None:
+            self._queue = asyncio.Queue(self._max_size)
+            self._writer = asyncio.create_task(self._write_forever())
+
+    async def stop(self, timeout: float):
+        """
+        Flushes the queued words (waiting at most `timeout`) and stops the writer
+        """
+        if self._writer is None or self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                'Write-behind flush timed out, %d words are lost', self._queue.qsize()
+            )
+
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+
+        self._writer = None
+        self._queue = None
+        self._pending.clear()
+
+    def pending(self, word: str, language: str) -> TranslatedWordSchema | None:
+        return self._pending.get((normalize_word(word), language))
+
+    async def submit(self, info: TranslatedWordSchema):
+        if self._queue is None:
+            raise RuntimeError('Write-behind queue is not started')
+
+        # Recorded once queued: a put cancelled by the caller's deadline
+        # must not leave a word that is served but never written
+        await self._queue.put(info)
+        self._pending[_word_key(info)] = info
+
+    async def _next_batch(self, queue: asyncio.Queue) -> list[TranslatedWordSchema]:
+        batch = [await queue.get()]
+
+        loop = asyncio.get_running_loop()
+        batch_deadline = loop.time() + self._batch_delay
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(await asyncio.wait_for(
+                    queue.get(), max(batch_deadline - loop.time(), 0)
+                ))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _persist(self, batch: list[TranslatedWordSchema]) -> bool:
+        for attempt in range(self._max_retries + 1):
+            try:
+                async with database_session_context() as db_session:
+                    use_primary(db_session)
+                    for info in batch:
+                        await merge_translation(db_session, info)
+                    await db_session.commit()
+                for info in batch:
+                    autocomplete_index.add_words(info.get_all_words())
+                await node_cache.delete(word_key(*_word_key(info)) for info in batch)
+                return True
+            except Exception:
+                logger.exception(
+                    'Failed to persist %d words, attempt %d', len(batch), attempt + 1
+                )
+                await asyncio.sleep(self._retry_delay * 2 ** attempt)
+
+        return False
+
+    async def _write_batch(self, batch: list[TranslatedWordSchema]):
+        # The latest fetch of a word wins
+        unique_batch = list({_word_key(info): info for info in batch}.values())
+
+        if not await self._persist(unique_batch) and len(unique_batch) > 1:
+            # Don't let one bad word take the whole batch down with it
+            for info in unique_batch:
+                if not await self._persist([info]):
+                    logger.error('Dropping word %s', info.word)
+
+        for info in unique_batch:
+            key = _word_key(info)
+            if self._pending.get(key) is info:
+                del self._pending[key]
+
+    async def _write_forever(self):
+        queue = self._queue
+        assert queue is not None
+
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+
+write_behind = WriteBehindQueue(
+    max_size=settings.WRITE_BEHIND_QUEUE_SIZE,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    batch_delay=settings.WRITE_BEHIND_BATCH_DELAY,
+    max_retries=settings.WRITE_BEHIND_MAX_RETRIES,
+    retry_delay=settings.WRITE_BEHIND_RETRY_DELAY,
+)
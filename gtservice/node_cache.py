@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from gtservice import settings
+from gtservice.translation_loader.schemas import normalize_word
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+# Share of entries dropped at once when the cache is over its size
+_EVICTION_FRACTION = 0.1
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    headers: dict[str, str]
+
+
+def _connect(path: str, busy_timeout: float) -> sqlite3.Connection:
+    connection = sqlite3.connect(
+        path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+    )
+    # Readers don't block the writer and each other, losing the file
+    # on a power cut is fine for a cache
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=OFF')
+    return connection
+
+
+class NodeCache:
+    """
+    Rendered responses shared by all worker processes of one host
+    through an SQLite file, preferably on a memory backed filesystem.
+    The file outlives worker restarts.
+
+    Lookups run on the event loop: they are a single primary key read
+    that never waits for writers in WAL mode. Writes may wait for another
+    process holding the write lock, so they run in a dedicated thread.
+    Errors are logged and treated as misses, the cache never fails a request.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float, busy_timeout: float):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._busy_timeout = busy_timeout
+
+        self._reader: sqlite3.Connection | None = None
+        self._writer: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._reader is not None
+
+    def open(self):
+        if self._reader is not None:
+            return
+
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._writer = _connect(self._path, self._busy_timeout)
+        self._writer.executescript(_SCHEMA)
+        self._reader = _connect(self._path, self._busy_timeout)
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='node-cache')
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for connection in (self._reader, self._writer):
+            if connection is not None:
+                connection.close()
+
+        self._reader = None
+        self._writer = None
+        self._executor = None
+
+    def get(self, key: str) -> CachedResponse | None:
+        if self._reader is None:
+            return None
+
+        try:
+            row = self._reader.execute(
+                'SELECT headers, body FROM entries WHERE key = ? AND expires_at > ?',
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            logger.exception('Node cache lookup failed')
+            return None
+
+        if row is None:
+            return None
+
+        headers, body = row
+        return CachedResponse(body=body, headers=json.loads(headers))
+
+    async def set(self, key: str, response: CachedResponse):
+        await self._write(self._set, key, response)
+
+    async def delete(self, keys: Iterable[str]):
+        await self._write(self._delete, list(keys))
+
+    async def _write(self, func, *args):
+        if self._executor is None:
+            return
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        except sqlite3.Error:
+            logger.exception('Node cache write failed')
+
+    def _set(self, key: str, response: CachedResponse):
+        assert self._writer is not None
+        self._writer.execute(
+            'INSERT OR REPLACE INTO entries (key, headers, body, expires_at) '
+            'VALUES (?, ?, ?, ?)',
+            (key, json.dumps(response.headers), response.body, time.time() + self._ttl),
+        )
+        if self._used_bytes() > self._max_bytes:
+            self._evict()
+
+    def _delete(self, keys: list[str]):
+        assert self._writer is not None
+        self._writer.executemany(
+            'DELETE FROM entries WHERE key = ?', [(key,) for key in keys]
+        )
+
+    def _used_bytes(self) -> int:
+        assert self._writer is not None
+        page_size, = self._writer.execute('PRAGMA page_size').fetchone()
+        page_count, = self._writer.execute('PRAGMA page_count').fetchone()
+        free_pages, = self._writer.execute('PRAGMA freelist_count').fetchone()
+        return (page_count - free_pages) * page_size
+
+    def _evict(self):
+        """
+        Drops expired entries, then the ones closest to expiration
+        """
+        assert self._writer is not None
+        self._writer.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),))
+        if self._used_bytes() <= self._max_bytes:
+            return
+
+        count, = self._writer.execute('SELECT count(*) FROM entries').fetchone()
+        self._writer.execute(
+            'DELETE FROM entries WHERE key IN '
+            '(SELECT key FROM entries ORDER BY expires_at LIMIT ?)',
+            (max(int(count * _EVICTION_FRACTION), 1),),
+        )
+
+
+def word_key(word: str, language: str) -> str:
+    return f'word:{language}:{normalize_word(word)}'
+
+
+node_cache = NodeCache(
+    path=settings.NODE_CACHE_PATH,
+    max_bytes=settings.NODE_CACHE_MAX_BYTES,
+    ttl=settings.NODE_CACHE_TTL,
+    busy_timeout=settings.NODE_CACHE_BUSY_TIMEOUT,
+)
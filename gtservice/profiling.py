@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from gtservice import settings
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional "profiling" extra
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+# Header (or query parameter) enabling profiling, "flamegraph" also samples
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAM = 'profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+@dataclass
+class StatementRecord:
+    statement: str
+    duration: float
+    rows: int
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    duration: float
+
+
+@dataclass
+class RequestProfile:
+    """
+    Timings collected while serving one request.
+    Statements are always counted (to catch N+1 regressions),
+    but only detailed profiles keep the statements themselves.
+    """
+    detailed: bool = False
+    id: str = field(default_factory=lambda: uuid4().hex)
+    statements_count: int = 0
+    db_time: float = 0.0
+    statements: list[StatementRecord] = field(default_factory=list)
+    spans: list[SpanRecord] = field(default_factory=list)
+
+    def add_statement(self, statement: str, duration: float, rows: int):
+        self.statements_count += 1
+        self.db_time += duration
+        if self.detailed:
+            self.statements.append(StatementRecord(statement, duration, rows))
+
+    def add_span(self, name: str, duration: float):
+        if self.detailed:
+            self.spans.append(SpanRecord(name, duration))
+
+    def server_timing(self, total: float) -> str:
+        metrics = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements_count} statements"'
+        ]
+
+        span_totals: dict[str, float] = {}
+        for span in self.spans:
+            span_totals[span.name] = span_totals.get(span.name, 0.0) + span.duration
+
+        metrics.extend(
+            f'{name};dur={duration * 1000:.2f}'
+            for name, duration in span_totals.items()
+        )
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    'current_profile', default=None
+)
+
+
+@contextmanager
+def request_profile(detailed: bool) -> Iterator[RequestProfile]:
+    """
+    Makes a new profile current for the wrapped block
+    :param detailed: keep statements and spans, not only the totals
+    """
+    profile = RequestProfile(detailed=detailed)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def current_profile() -> RequestProfile | None:
+    return _current_profile.get()
+
+
+@contextmanager
+def track_span(name: str):
+    """
+    Records the duration of the wrapped block in the current request profile
+    :param name: span name, becomes a Server-Timing metric
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.add_span(name, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's own context: a failing statement never gets
+    # the "after" event and must not leave a start time behind
+    context.profiling_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        duration = time.perf_counter() - context.profiling_start
+        profile.add_statement(statement, duration, cursor.rowcount)
+
+
+def install_sql_hooks():
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def is_profiling_allowed(client_host: str | None) -> bool:
+    """
+    Detailed profiles expose SQL and code, only trusted hosts get them
+    and only while profiling is enabled
+    """
+    return (
+        settings.PROFILING_ENABLED
+        and client_host is not None
+        and client_host in settings.PROFILING_ALLOWED_HOSTS
+    )
+
+
+def start_sampling_profiler() -> 'Profiler | None':
+    if Profiler is None:
+        logger.warning('Flamegraph requested, but pyinstrument is not installed')
+        return None
+
+    # Samples the whole event loop thread: concurrent requests show up too
+    profiler = Profiler(async_mode='disabled')
+    profiler.start()
+    return profiler
+
+
+def profile_path(profile_id: str, extension: str) -> str:
+    return os.path.join(settings.PROFILING_OUTPUT_DIR, f'{profile_id}.{extension}')
+
+
+def save_profile(
+        profile: RequestProfile, request_info: dict, profiler: 'Profiler | None'
+):
+    """
+    Writes the profile (and the flamegraph, if sampled) to the output dir,
+    shared by all the workers on the node. Blocking, run it in a thread.
+    """
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+
+    with open(profile_path(profile.id, 'json'), 'w') as file:
+        json.dump({**request_info, **profile.as_dict()}, file)
+
+    if profiler is not None:
+        with open(profile_path(profile.id, 'html'), 'w') as file:
+            file.write(profiler.output_html())
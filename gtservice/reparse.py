@@ -0,0 +1,186 @@
+"""
+Rebuilds stored words from the archived upstream responses.
+
+Streams `upstream_responses` through the current parser and merges every
+parsed word the way a fresh fetch is merged. Batches are written by parallel
+workers, each batch in its own transaction. A failed batch is retried,
+then written word by word so one bad word doesn't hold back the others.
+Nothing is requested upstream.
+
+Usage:
+    python -m gtservice.reparse [--language LANG] [--batch-size N] [--concurrency N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy.exc import IntegrityError
+
+from gtservice import log, settings
+from gtservice.db import database, database_session_context
+from gtservice.db.models import UpstreamResponseModel
+from gtservice.db.routing import use_primary
+from gtservice.logic.translation import merge_translation
+from gtservice.logic.upstream_archive import decompress_body
+from gtservice.node_cache import node_cache, word_key
+from gtservice.translation_loader.google import GOOGLE_BODY_SOURCE, _parse_from_body
+from gtservice.translation_loader.schemas import TranslatedWordSchema
+
+logger = logging.getLogger(__name__)
+
+# Archived body source -> parser taking (body, word, source, translation language)
+PARSERS: dict[str, Callable[..., TranslatedWordSchema]] = {
+    GOOGLE_BODY_SOURCE: _parse_from_body,
+}
+
+# Parallel batches race to create new words they share (translations,
+# synonyms). The loser succeeds on a retry: the winner has committed by then
+BATCH_ATTEMPTS = 3
+
+
+@dataclass
+class ReparseStats:
+    read: int = 0
+    parse_failed: int = 0
+    merged: int = 0
+    merge_failed: int = 0
+
+
+def _parse(source: str, row) -> TranslatedWordSchema:
+    source_language, translation_language, word, encoding, body = row
+    return PARSERS[source](
+        json.loads(decompress_body(encoding, body)),
+        word, source_language, translation_language,
+    )
+
+
+async def _merge(batch: list[TranslatedWordSchema]) -> bool:
+    try:
+        async with database_session_context() as db_session:
+            use_primary(db_session)
+            for info in batch:
+                await merge_translation(db_session, info)
+            await db_session.commit()
+    except IntegrityError as exc:
+        logger.info('Merging %d reparsed words conflicted: %s', len(batch), exc.orig)
+        return False
+    except Exception:
+        logger.exception('Failed to merge %d reparsed words', len(batch))
+        return False
+
+    await node_cache.delete(
+        word_key(info.word.word, info.word.language) for info in batch
+    )
+    return True
+
+
+async def _write_batch(source: str, rows: list, stats: ReparseStats):
+    batch = []
+    for row in rows:
+        try:
+            batch.append(_parse(source, row))
+        except Exception as exc:
+            stats.parse_failed += 1
+            logger.warning('Failed to parse %s (%s -> %s): %r', row[2], row[0], row[1], exc)
+
+    for _ in range(BATCH_ATTEMPTS):
+        if await _merge(batch):
+            stats.merged += len(batch)
+            return
+
+    for info in batch:
+        if await _merge([info]):
+            stats.merged += 1
+        else:
+            stats.merge_failed += 1
+
+
+async def reparse(
+        source: str = GOOGLE_BODY_SOURCE,
+        source_language: str | None = None,
+        batch_size: int = 100,
+        concurrency: int = 4,
+) -> ReparseStats:
+    """
+    Reads the archive on one connection and hands batches to `concurrency`
+    writers, so merging overlaps reading and parsing
+    :param source: archived body source
+    :param source_language: words of this language only, all if None
+    :param batch_size: words merged in one transaction
+    :param concurrency: batches written at once
+    :return: counters of the run
+    """
+    if source not in PARSERS:
+        raise ValueError(f'No parser for {source} bodies')
+
+    stats = ReparseStats()
+    batches: asyncio.Queue[list | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def write_forever():
+        while (rows := await batches.get()) is not None:
+            await _write_batch(source, rows, stats)
+
+    writers = [asyncio.create_task(write_forever()) for _ in range(concurrency)]
+    try:
+        async with database_session_context() as db_session:
+            rows = []
+            async for row in UpstreamResponseModel.stream_responses(
+                    db_session, source, source_language, chunk_size=batch_size * concurrency
+            ):
+                rows.append(row)
+                stats.read += 1
+                if len(rows) >= batch_size:
+                    await batches.put(rows)
+                    rows = []
+            if rows:
+                await batches.put(rows)
+
+        for _ in writers:
+            await batches.put(None)
+        await asyncio.gather(*writers)
+    finally:
+        for writer in writers:
+            writer.cancel()
+
+    return stats
+
+
+async def run(source: str, source_language: str | None, batch_size: int, concurrency: int):
+    await database.connect()
+    if settings.NODE_CACHE_ENABLED:
+        try:
+            node_cache.open()
+        except Exception:
+            logger.exception('Failed to open the node cache, cached words may be stale')
+    try:
+        stats = await reparse(source, source_language, batch_size, concurrency)
+    finally:
+        await database.disconnect()
+        node_cache.close()
+
+    logger.info(
+        'Reparsed %d archived responses: %d merged, %d failed to parse, %d failed to merge',
+        stats.read, stats.merged, stats.parse_failed, stats.merge_failed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--source', default=GOOGLE_BODY_SOURCE, choices=sorted(PARSERS))
+    parser.add_argument('--language', default=None, help='source language of the words')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    log.setup_logging()
+    try:
+        asyncio.run(run(args.source, args.language, args.batch_size, args.concurrency))
+    finally:
+        log.shutdown_logging()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,167 @@
 import logging
 import os
+import tempfile
 
-DB_CONNECTION_STRING = os.environ.get("DB_CONNECTION_STRING")
-DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
-DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
 
-LOG_LEVEL = int(os.environ.get("LOG_LEVEL", logging.INFO))
+def _env(name: str, default: str | None = None) -> str | None:
+    """
+    Empty values count as unset: docker-compose passes "${VAR}"
+    of a variable unset on the host as an empty string
+    """
+    return os.environ.get(name) or default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = _env(name)
+    return int(value) if value is not None else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _env(name)
+    return float(value) if value is not None else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = _env(name)
+    return value.lower() == "true" if value is not None else default
+
+
+def _env_list(name: str, default: str = "") -> list[str]:
+    """
+    Comma-separated items, blanks are skipped
+    """
+    return [item.strip() for item in _env(name, default).split(",") if item.strip()]
+
+
+DB_CONNECTION_STRING = _env("DB_CONNECTION_STRING")
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+# Seconds to wait for a pooled connection before giving up
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 30)
+# Seconds after which a pooled connection is replaced, -1 disables recycling
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+# Connections opened and validated per pool when a worker starts
+DB_POOL_PREWARM = _env_int("DB_POOL_PREWARM", 0)
+
+# Size of the SQLAlchemy compiled statement cache per engine
+DB_QUERY_CACHE_SIZE = _env_int("DB_QUERY_CACHE_SIZE", 500)
+# Size of the asyncpg prepared statement cache per connection, 0 disables it
+DB_PREPARED_STATEMENT_CACHE_SIZE = _env_int("DB_PREPARED_STATEMENT_CACHE_SIZE", 100)
+# Set when connecting through pgbouncer in transaction pooling mode:
+# prepared statements are unnamed-per-use and never cached on a connection
+DB_PGBOUNCER_TRANSACTION_MODE = _env_bool("DB_PGBOUNCER_TRANSACTION_MODE", False)
+
+# SQLite (sqlite+aiosqlite:///path) tuning, per connection
+DB_SQLITE_CACHE_SIZE_KB = _env_int("DB_SQLITE_CACHE_SIZE_KB", 64 * 1024)
+DB_SQLITE_MMAP_SIZE = _env_int("DB_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+DB_SQLITE_BUSY_TIMEOUT = _env_float("DB_SQLITE_BUSY_TIMEOUT", 5)
+
+# Comma-separated connection strings of read replicas, each gets its own pool
+DB_REPLICA_CONNECTION_STRINGS = _env_list("DB_REPLICA_CONNECTION_STRINGS")
+DB_REPLICA_HEALTH_CHECK_INTERVAL = _env_float("DB_REPLICA_HEALTH_CHECK_INTERVAL", 5)
+DB_REPLICA_HEALTH_CHECK_TIMEOUT = _env_float("DB_REPLICA_HEALTH_CHECK_TIMEOUT", 2)
+
+# Time budget of a request, including pool acquires and upstream calls
+REQUEST_DEADLINE = _env_float("REQUEST_DEADLINE", 10)
+# Upstream-bound requests (misses) a worker runs at once and keeps waiting
+ADMISSION_MAX_IN_FLIGHT_MISSES = _env_int(
+    "ADMISSION_MAX_IN_FLIGHT_MISSES", max(DB_POOL_SIZE // 2, 1)
+)
+ADMISSION_MAX_QUEUED_MISSES = _env_int("ADMISSION_MAX_QUEUED_MISSES", 50)
+# Retry-After (seconds) sent with 503 responses when overloaded
+ADMISSION_RETRY_AFTER = _env_int("ADMISSION_RETRY_AFTER", 1)
+
+# Comma-separated "kind[:argument]" providers in order of preference, see
+# gtservice.translation_loader.loader.build_providers
+TRANSLATION_PROVIDERS = _env_list("TRANSLATION_PROVIDERS", "google")
+TRANSLATION_REQUEST_TIMEOUT = _env_float("TRANSLATION_REQUEST_TIMEOUT", 10)
+# Seconds to wait before hedging while a provider has too few latency samples
+TRANSLATION_HEDGE_DELAY = _env_float("TRANSLATION_HEDGE_DELAY", 1)
+TRANSLATION_HEDGE_MIN_DELAY = _env_float("TRANSLATION_HEDGE_MIN_DELAY", 0.05)
+TRANSLATION_LATENCY_WINDOW = _env_int("TRANSLATION_LATENCY_WINDOW", 500)
+TRANSLATION_LATENCY_MIN_SAMPLES = _env_int("TRANSLATION_LATENCY_MIN_SAMPLES", 20)
+
+# Respond to misses right after the upstream call and persist in the background
+WRITE_BEHIND_ENABLED = _env_bool("WRITE_BEHIND_ENABLED", False)
+WRITE_BEHIND_QUEUE_SIZE = _env_int("WRITE_BEHIND_QUEUE_SIZE", 1000)
+WRITE_BEHIND_BATCH_SIZE = _env_int("WRITE_BEHIND_BATCH_SIZE", 50)
+WRITE_BEHIND_BATCH_DELAY = _env_float("WRITE_BEHIND_BATCH_DELAY", 0.05)
+WRITE_BEHIND_MAX_RETRIES = _env_int("WRITE_BEHIND_MAX_RETRIES", 3)
+WRITE_BEHIND_RETRY_DELAY = _env_float("WRITE_BEHIND_RETRY_DELAY", 0.5)
+WRITE_BEHIND_FLUSH_TIMEOUT = _env_float("WRITE_BEHIND_FLUSH_TIMEOUT", 10)
+
+# How the list endpoint computes totals unless asked: exact, cached, estimated or none
+LIST_COUNT_DEFAULT_MODE = _env("LIST_COUNT_DEFAULT_MODE", "exact")
+LIST_COUNT_CACHE_TTL = _env_float("LIST_COUNT_CACHE_TTL", 60)
+LIST_COUNT_CACHE_SIZE = _env_int("LIST_COUNT_CACHE_SIZE", 1024)
+
+# In-memory prefix index behind the autocomplete endpoint. Every worker reads
+# the whole words table when it starts, including restarts after --max-requests
+AUTOCOMPLETE_ENABLED = _env_bool("AUTOCOMPLETE_ENABLED", False)
+AUTOCOMPLETE_MAX_RESULTS = _env_int("AUTOCOMPLETE_MAX_RESULTS", 50)
+# Pending changes per language before they are folded into the packed index
+AUTOCOMPLETE_OVERLAY_LIMIT = _env_int("AUTOCOMPLETE_OVERLAY_LIMIT", 10000)
+# Full reload period in seconds, picks up words written by other workers and nodes
+# and the latest request counts; 0 disables
+AUTOCOMPLETE_REFRESH_INTERVAL = _env_float("AUTOCOMPLETE_REFRESH_INTERVAL", 300)
+# Suggestions are ranked by requests over the last days (see word_access_stats),
+# counts are kept for the most requested words of every language only
+AUTOCOMPLETE_RANKING_DAYS = _env_int("AUTOCOMPLETE_RANKING_DAYS", 7)
+AUTOCOMPLETE_RANKED_WORDS = _env_int("AUTOCOMPLETE_RANKED_WORDS", 10000)
+
+# Rendered word responses shared by the workers of one host, lives in memory
+# when the path is on tmpfs and survives worker restarts
+NODE_CACHE_ENABLED = _env_bool("NODE_CACHE_ENABLED", False)
+NODE_CACHE_PATH = _env(
+    "NODE_CACHE_PATH",
+    os.path.join(
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+        "gtservice",
+        "node-cache.sqlite3",
+    )
+)
+NODE_CACHE_MAX_BYTES = _env_int("NODE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+NODE_CACHE_TTL = _env_float("NODE_CACHE_TTL", 3600)
+NODE_CACHE_BUSY_TIMEOUT = _env_float("NODE_CACHE_BUSY_TIMEOUT", 1)
+
+# Per-word request counters, kept by every worker and added up in word_access_stats
+ACCESS_STATS_ENABLED = _env_bool("ACCESS_STATS_ENABLED", True)
+ACCESS_STATS_FLUSH_INTERVAL = _env_float("ACCESS_STATS_FLUSH_INTERVAL", 30)
+# Distinct words counted between flushes, more are dropped until the next flush
+ACCESS_STATS_MAX_WORDS = _env_int("ACCESS_STATS_MAX_WORDS", 100000)
+ACCESS_STATS_RETENTION_DAYS = _env_int("ACCESS_STATS_RETENTION_DAYS", 30)
+
+# Raw upstream bodies kept in upstream_responses, for reparsing stored words
+UPSTREAM_ARCHIVE_ENABLED = _env_bool("UPSTREAM_ARCHIVE_ENABLED", True)
+UPSTREAM_ARCHIVE_FLUSH_INTERVAL = _env_float("UPSTREAM_ARCHIVE_FLUSH_INTERVAL", 10)
+# Bodies waiting for a flush, more are not archived until the next flush
+UPSTREAM_ARCHIVE_MAX_PENDING = _env_int("UPSTREAM_ARCHIVE_MAX_PENDING", 5000)
+UPSTREAM_ARCHIVE_COMPRESSION_LEVEL = _env_int("UPSTREAM_ARCHIVE_COMPRESSION_LEVEL", 6)
+
+# Limits of the text translation endpoint
+TEXT_MAX_LENGTH = _env_int("TEXT_MAX_LENGTH", 20000)
+TEXT_MAX_UNIQUE_TOKENS = _env_int("TEXT_MAX_UNIQUE_TOKENS", 1000)
+# Upstream requests running at once for the missing words of one text
+TEXT_FETCH_CONCURRENCY = _env_int("TEXT_FETCH_CONCURRENCY", 8)
+
+# max-age of cacheable word responses, lets CDNs and clients reuse them
+HTTP_CACHE_MAX_AGE = _env_int("HTTP_CACHE_MAX_AGE", 60)
+
+LOG_LEVEL = _env_int("LOG_LEVEL", logging.INFO)
+# "json" or "text"
+LOG_FORMAT = _env("LOG_FORMAT", "json")
+# Share of successful requests written to the access log, from 0 to 1
+LOG_ACCESS_SAMPLE_RATE = _env_float("LOG_ACCESS_SAMPLE_RATE", 0.01)
+# Requests slower than this (seconds) are always written to the access log
+LOG_SLOW_REQUEST_THRESHOLD = _env_float("LOG_SLOW_REQUEST_THRESHOLD", 1)
+
+# Detailed profiles (statement texts, flamegraphs) on request, for debugging only
+PROFILING_ENABLED = _env_bool("PROFILING_ENABLED", False)
+# Comma-separated client hosts allowed to request profiling, empty disables it
+PROFILING_ALLOWED_HOSTS = set(_env_list("PROFILING_ALLOWED_HOSTS"))
+PROFILING_OUTPUT_DIR = _env(
+    "PROFILING_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "gtservice-profiles")
+)
+# Requests executing more SQL statements than this are logged as warnings
+PROFILING_STATEMENT_BUDGET = _env_int("PROFILING_STATEMENT_BUDGET", 20)
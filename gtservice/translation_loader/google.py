@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import os
+
+import aiohttp
+from pydantic import validate_call
+
+from gtservice.logic.upstream_archive import UpstreamArchive
+from gtservice.translation_loader.providers import (
+    LatencyStats, TranslationNotFoundError, TranslationProvider
+)
+from gtservice.translation_loader.schemas import (
+    WordSchema, TextSchema, TranslatedWordSchema, Language
+)
+
+GOOGLE_TRANSLATE_URL = 'https://translate.googleapis.com/translate_a/single'
+# Source of archived Google bodies, see `UpstreamArchive`
+GOOGLE_BODY_SOURCE = 'google'
+
+COMMON_GOOGLE_TRANSLATE_PARAMS = {
+    'client': 'gtx',
+    'dj': 1,
+    'hl': "en",
+    'dt': ['t', 'bd', 'md', 'ss', 'ex'],
+}
+
+logger = logging.getLogger(__name__)
+
+
+def validate_has_blocks(source: dict, *field_names):
+    for name in field_names:
+        if name not in source:
+            raise ValueError(f'No "{name}" block found - response is wrong')
+
+
+def _deserialize_translations(
+        sentences: list[dict], translation_language: Language
+) -> list[WordSchema]:
+    return [
+        WordSchema(
+            word=item['trans'],
+            language=translation_language,
+        )
+        for item in sentences
+        if 'trans' in item
+    ]
+
+
+def _deserialize_synonyms(
+        synonyms: list[dict],
+        translation_language: Language,
+) -> list[WordSchema]:
+    return [
+        WordSchema(
+            word=synonym_text,
+            language=translation_language,
+        )
+        for item in synonyms
+        for entry_list in item.get('entry', [])
+        for synonym_text in entry_list.get('synonym', [])
+    ]
+
+
+def _deserialize_definitions(definitions: list[dict]) -> list[TextSchema]:
+    return [
+        TextSchema(definition['gloss'])
+        for item in definitions
+        for definition in item.get('entry', [])
+        if 'example' in definition
+    ]
+
+
+def _deserialize_examples(examples: dict) -> list[TextSchema]:
+    return [
+        TextSchema(example['text'])
+        for example in examples.get("example", [])
+        if 'text' in example
+    ]
+
+
+@validate_call
+def _parse_from_body(
+        body: dict, word: str, source_language: Language, translation_language: Language
+) -> TranslatedWordSchema:
+    validate_has_blocks(body, 'sentences')
+
+    word_schema = WordSchema(word=word, language=source_language)
+    definitions = _deserialize_definitions(body.get('definitions', []))
+    synonyms = _deserialize_synonyms(body.get('synsets', []), source_language)
+    translations = _deserialize_translations(body['sentences'], translation_language)
+    examples = _deserialize_examples(body.get('examples', []))
+
+    return TranslatedWordSchema(
+        word=word_schema,
+        translation_language=translation_language,
+        definitions=definitions,
+        synonyms=synonyms,
+        translations=translations,
+        examples=examples,
+    )
+
+
+class GoogleTranslateProvider(TranslationProvider):
+    """
+    Loads word information from the remote Google Translate API
+    WARNING: API is undocumented and could change anytime
+    """
+
+    def __init__(
+            self,
+            name: str,
+            stats: LatencyStats,
+            url: str = GOOGLE_TRANSLATE_URL,
+            timeout: float | None = None,
+            archive: UpstreamArchive | None = None,
+    ):
+        super().__init__(name, stats)
+        self._url = url
+        self._archive = archive
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily inside the running event loop and reused while it runs,
+        # so connections (and TLS sessions) are kept alive between requests.
+        # A session is bound to its loop, another loop gets its own
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            await self.close()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self._timeout)
+            self._session_loop = loop
+
+        return self._session
+
+    async def _fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        params = {
+            'q': word,
+            'sl': source_language,
+            'tl': translation_language,
+            **COMMON_GOOGLE_TRANSLATE_PARAMS
+        }
+
+        logger.debug(
+            "Fetching translation data for word: %s (%s -> %s) from %s",
+            word, source_language, translation_language, self.name
+        )
+
+        session = await self._get_session()
+        async with session.get(self._url, params=params) as response:
+            response.raise_for_status()
+            raw_body = await response.read()
+
+        # Archived before parsing, so bodies the parser rejects can be reparsed too
+        if self._archive is not None:
+            self._archive.record(
+                GOOGLE_BODY_SOURCE, source_language, translation_language, word,
+                params, raw_body,
+            )
+
+        body = json.loads(raw_body)
+        return _parse_from_body(body, word, source_language, translation_language)
+
+    async def close(self):
+        session, self._session, self._session_loop = self._session, None, None
+        if session is None:
+            return
+
+        try:
+            await session.close()
+        except RuntimeError:
+            # Sockets of a closed loop can't be shut down properly, they went with it
+            logger.debug('Closing a session of a finished event loop failed', exc_info=True)
+
+
+class GoogleReplayProvider(TranslationProvider):
+    """
+    Replays recorded Google Translate responses for offline use.
+    Bodies are read from `{directory}/{source}-{translation}-{word}.json`
+    """
+
+    def __init__(self, name: str, stats: LatencyStats, directory: str):
+        super().__init__(name, stats)
+        self._directory = directory
+
+    def _read_body(self, path: str) -> dict | None:
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    async def _fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        file_name = f'{source_language}-{translation_language}-{word}.json'
+        if os.path.basename(file_name) != file_name:
+            raise TranslationNotFoundError(f'Unsupported word for replay: {word}')
+
+        body = await asyncio.to_thread(
+            self._read_body, os.path.join(self._directory, file_name)
+        )
+        if body is None:
+            raise TranslationNotFoundError(f'No recorded response for {word} in {self.name}')
+
+        return _parse_from_body(body, word, source_language, translation_language)
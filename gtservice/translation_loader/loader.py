@@ -1,95 +1,145 @@
+import asyncio
 import logging
+from collections import Counter
+from functools import cache
 
-import aiohttp
 from pydantic import validate_call
 
-from gtservice.translation_loader.schemas import (
-    WordSchema, TextSchema, TranslatedWordSchema, Language
+from gtservice import settings
+from gtservice.logic.upstream_archive import upstream_archive
+from gtservice.translation_loader.google import GoogleReplayProvider, GoogleTranslateProvider
+from gtservice.translation_loader.providers import (
+    LatencyStats, LocalDictionaryProvider, TranslationProvider
 )
-
-GOOGLE_TRANSLATE_URL = 'https://translate.googleapis.com/translate_a/single'
-
-COMMON_GOOGLE_TRANSLATE_PARAMS = {
-    'client': 'gtx',
-    'dj': 1,
-    'hl': "en",
-    'dt': ['t', 'bd', 'md', 'ss', 'ex'],
-}
+from gtservice.translation_loader.schemas import TranslatedWordSchema, Language
 
 logger = logging.getLogger(__name__)
 
+HEDGE_PERCENTILE = 0.95
 
-def validate_has_blocks(source: dict, *field_names):
-    for name in field_names:
-        if name not in source:
-            raise ValueError(f'No "{name}" block found - response is wrong')
 
+def build_provider(name: str, kind: str, argument: str | None) -> TranslationProvider:
+    stats = LatencyStats(
+        settings.TRANSLATION_LATENCY_WINDOW, settings.TRANSLATION_LATENCY_MIN_SAMPLES
+    )
 
-def _deserialize_translations(
-        sentences: list[dict], translation_language: Language
-) -> list[WordSchema]:
-    return [
-        WordSchema(
-            word=item['trans'],
-            language=translation_language,
-        )
-        for item in sentences
-        if 'trans' in item
-    ]
-
-
-def _deserialize_synonyms(
-        synonyms: list[dict],
-        translation_language: Language,
-) -> list[WordSchema]:
-    return [
-        WordSchema(
-            word=synonym_text,
-            language=translation_language,
+    if kind == 'google':
+        return GoogleTranslateProvider(
+            name, stats, timeout=settings.TRANSLATION_REQUEST_TIMEOUT,
+            archive=upstream_archive if settings.UPSTREAM_ARCHIVE_ENABLED else None,
+            **({'url': argument} if argument else {}),
         )
-        for item in synonyms
-        for entry_list in item.get('entry', [])
-        for synonym_text in entry_list.get('synonym', [])
-    ]
+    if kind == 'dictionary' and argument:
+        return LocalDictionaryProvider(name, stats, argument)
+    if kind == 'replay' and argument:
+        return GoogleReplayProvider(name, stats, argument)
 
+    raise ValueError(f'Unsupported translation provider: {kind}:{argument}')
 
-def _deserialize_definitions(definitions: list[dict]) -> list[TextSchema]:
-    return [
-        TextSchema(definition['gloss'])
-        for item in definitions
-        for definition in item.get('entry', [])
-        if 'example' in definition
-    ]
 
+def build_providers(specs: list[str]) -> list[TranslationProvider]:
+    """
+    :param specs: "kind[:argument]" items, e.g. "google",
+        "google:https://alternate/translate_a/single",
+        "dictionary:/data/dictionary.json", "replay:/data/recorded"
+    :return: providers in the order of preference
+    """
+    kinds: Counter[str] = Counter()
+    providers = []
 
-def _deserialize_examples(examples: dict) -> list[TextSchema]:
-    return [
-        TextSchema(example['text'])
-        for example in examples.get("example", [])
-        if 'text' in example
-    ]
+    for spec in specs:
+        kind, _, argument = spec.partition(':')
+        kinds[kind] += 1
+        name = kind if kinds[kind] == 1 else f'{kind}{kinds[kind]}'
+        providers.append(build_provider(name, kind, argument or None))
 
+    return providers
 
-@validate_call
-def _parse_from_body(
-        body: dict, word: str, source_language: Language, translation_language: Language
-) -> TranslatedWordSchema:
-    validate_has_blocks(body, 'sentences')
-
-    word_schema = WordSchema(word=word, language=source_language)
-    definitions = _deserialize_definitions(body.get('definitions', []))
-    synonyms = _deserialize_synonyms(body.get('synsets', []), source_language)
-    translations = _deserialize_translations(body['sentences'], translation_language)
-    examples = _deserialize_examples(body.get('examples', []))
-
-    return TranslatedWordSchema(
-        word=word_schema,
-        translation_language=translation_language,
-        definitions=definitions,
-        synonyms=synonyms,
-        translations=translations,
-        examples=examples,
-    )
+
+class HedgedTranslationLoader:
+    """
+    Asks the providers in order of preference. If the current one hasn't
+    answered within its p95 latency (or has failed), the next one is asked
+    as well and the first successful answer wins.
+    """
+
+    def __init__(self, providers: list[TranslationProvider]):
+        if not providers:
+            raise ValueError('At least one translation provider is required')
+
+        self._providers = providers
+
+    @property
+    def providers(self) -> list[TranslationProvider]:
+        return self._providers
+
+    def hedge_delay(self, provider: TranslationProvider) -> float:
+        p95 = provider.stats.percentile(HEDGE_PERCENTILE)
+        if p95 is None:
+            return settings.TRANSLATION_HEDGE_DELAY
+
+        return max(p95, settings.TRANSLATION_HEDGE_MIN_DELAY)
+
+    async def fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        waiting = iter(self._providers)
+        pending: set[asyncio.Task] = set()
+        last_error: BaseException | None = None
+
+        def ask_next() -> TranslationProvider | None:
+            provider = next(waiting, None)
+            if provider is not None:
+                pending.add(asyncio.create_task(
+                    provider.fetch(word, source_language, translation_language),
+                    name=provider.name,
+                ))
+
+            return provider
+
+        current = ask_next()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay(current) if current is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+
+                    last_error = task.exception()
+                    logger.warning(
+                        'Provider %s failed for %s: %r', task.get_name(), word, last_error
+                    )
+
+                if not done:
+                    logger.debug('Hedging %s after %s stalled', word, current and current.name)
+
+                current = ask_next()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        assert last_error is not None
+        raise last_error
+
+    def stats(self) -> dict[str, dict]:
+        return {provider.name: provider.stats.as_dict() for provider in self._providers}
+
+    async def close(self):
+        await asyncio.gather(*(provider.close() for provider in self._providers))
+
+
+@cache
+def get_translation_loader() -> HedgedTranslationLoader:
+    return HedgedTranslationLoader(build_providers(settings.TRANSLATION_PROVIDERS))
 
 
 @validate_call
@@ -99,28 +149,21 @@ async def fetch_translation(
         translation_language: Language
 ) -> TranslatedWordSchema:
     """
-    Loads word information from the remote Google Translate API
-    WARNING: API is undocumented and could change anytime
+    Loads word information from the configured translation providers
     :param word: word for parsing
     :param source_language: source language code
     :param translation_language: destination language code
     :return: fetched word information
     """
-    params = {
-        'q': word,
-        'sl': source_language,
-        'tl': translation_language,
-        **COMMON_GOOGLE_TRANSLATE_PARAMS
-    }
-
-    logger.debug(
-        f"Fetching translation data for word: {word} "
-        f"({source_language} -> {translation_language})"
+    return await get_translation_loader().fetch(
+        word, source_language, translation_language
     )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(GOOGLE_TRANSLATE_URL, params=params) as response:
-            response.raise_for_status()
-            body = await response.json()
 
-    return _parse_from_body(body, word, source_language, translation_language)
+async def close_translation_loader():
+    """
+    Closes the providers' sessions, the next lifespan builds new providers
+    """
+    if get_translation_loader.cache_info().currsize:
+        await get_translation_loader().close()
+        get_translation_loader.cache_clear()
@@ -0,0 +1,131 @@
+import json
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from gtservice.profiling import track_span
+from gtservice.translation_loader.schemas import (
+    WordSchema, TextSchema, TranslatedWordSchema, Language
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationNotFoundError(Exception):
+    pass
+
+
+class LatencyStats:
+    """
+    Latencies of the last `window` requests, failed and cancelled ones included
+    """
+
+    def __init__(self, window: int, min_samples: int):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """
+        :param fraction: percentile as a fraction, e.g. 0.95
+        :return: None until enough samples are collected
+        """
+        if len(self._samples) < self._min_samples:
+            return None
+
+        ordered = sorted(self._samples)
+        return ordered[min(math.ceil(fraction * len(ordered)), len(ordered)) - 1]
+
+    def as_dict(self) -> dict:
+        return {
+            'samples': len(self._samples),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+        }
+
+
+class TranslationProvider(ABC):
+    """
+    Source of word translations mapped into TranslatedWordSchema
+    """
+
+    def __init__(self, name: str, stats: LatencyStats):
+        self.name = name
+        self.stats = stats
+
+    async def fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        start = time.monotonic()
+        try:
+            with track_span(f'upstream-{self.name}'):
+                return await self._fetch(word, source_language, translation_language)
+        finally:
+            # A request that lost to a hedge is cancelled, its time so far is
+            # a lower bound. Leaving it out would pull the percentiles down
+            self.stats.record(time.monotonic() - start)
+
+    @abstractmethod
+    async def _fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class LocalDictionaryProvider(TranslationProvider):
+    """
+    Serves words from a local JSON dictionary:
+    {source language: {translation language: {word: {
+        "translations": [...], "synonyms": [...],
+        "definitions": [...], "examples": [...]
+    }}}}
+    """
+
+    def __init__(self, name: str, stats: LatencyStats, path: str):
+        super().__init__(name, stats)
+
+        with open(path, 'r') as file:
+            self._dictionary: dict = json.load(file)
+
+    async def _fetch(
+            self,
+            word: str,
+            source_language: Language,
+            translation_language: Language,
+    ) -> TranslatedWordSchema:
+        entry = (
+            self._dictionary
+            .get(source_language, {})
+            .get(translation_language, {})
+            .get(word)
+        )
+        if entry is None:
+            raise TranslationNotFoundError(f'{word} is not in dictionary {self.name}')
+
+        return TranslatedWordSchema(
+            word=WordSchema(word, source_language),
+            translation_language=translation_language,
+            translations=[
+                WordSchema(item, translation_language)
+                for item in entry.get('translations', [])
+            ],
+            synonyms=[
+                WordSchema(item, source_language)
+                for item in entry.get('synonyms', [])
+            ],
+            definitions=[TextSchema(item) for item in entry.get('definitions', [])],
+            examples=[TextSchema(item) for item in entry.get('examples', [])],
+        )
@@ -1,3 +1,4 @@
+import unicodedata
 from itertools import chain
 from typing import Annotated
 
@@ -15,6 +16,14 @@ def language_validator(lang: str) -> str:
 Language = Annotated[str, AfterValidator(language_validator)]
 
 
+def normalize_word(word: str) -> str:
+    """
+    Canonical form of a word, used for lookups and as the unique key:
+    whitespace trimmed and collapsed, case folded, Unicode NFC
+    """
+    return unicodedata.normalize('NFC', ' '.join(word.split()).casefold())
+
+
 @dataclass(config=dict(frozen=True))
 class WordSchema:
     word: str
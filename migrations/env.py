@@ -1,14 +1,16 @@
 import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import pool
+from sqlalchemy import inspect, pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
+from gtservice import settings
 from gtservice.db.common import Base
 import gtservice.db
+import gtservice.db.models
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -19,6 +21,12 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the database the service connects to
+if settings.DB_CONNECTION_STRING:
+    config.set_main_option(
+        "sqlalchemy.url", settings.DB_CONNECTION_STRING.replace("%", "%%")
+    )
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -55,11 +63,28 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _is_empty_sqlite(connection: Connection) -> bool:
+    return connection.dialect.name == "sqlite" and not inspect(connection).get_table_names()
+
+
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite alters tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
 
     with context.begin_transaction():
-        context.run_migrations()
+        if _is_empty_sqlite(connection):
+            # The history up to now is Postgres specific (partitions, sequences),
+            # a new SQLite database starts from the current models instead
+            target_metadata.create_all(connection)
+            context.get_context().stamp(context.script, "heads")
+            # Nothing commits outside of migration scripts with non-transactional DDL
+            connection.commit()
+        else:
+            context.run_migrations()
 
 
 async def run_async_migrations() -> None:
@@ -0,0 +1,108 @@
+"""shared texts
+
+Revision ID: 5b1f7e3c2a91
+Revises: 07ac19cd9877
+Create Date: 2026-10-19 10:00:12.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f7e3c2a91'
+down_revision = '07ac19cd9877'
+branch_labels = None
+depends_on = None
+
+# Must produce the same digest as TextModel.hash_text
+TEXT_HASH_SQL = "encode(sha256(convert_to({column}, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    op.create_table('texts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('hash')
+    )
+    op.create_table('word_definitions',
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.Column('text_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['text_id'], ['texts.id'], ),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('word_id', 'text_id')
+    )
+    op.create_table('word_examples',
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.Column('text_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['text_id'], ['texts.id'], ),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('word_id', 'text_id')
+    )
+
+    op.execute(f"""
+        INSERT INTO texts (hash, text)
+        SELECT {TEXT_HASH_SQL.format(column='all_texts.text')}, all_texts.text
+        FROM (
+            SELECT text FROM definitions
+            UNION
+            SELECT text FROM examples
+        ) AS all_texts
+    """)
+    for old_table, link_table in [
+        ('definitions', 'word_definitions'),
+        ('examples', 'word_examples'),
+    ]:
+        op.execute(f"""
+            INSERT INTO {link_table} (word_id, text_id)
+            SELECT DISTINCT old.word_id, texts.id
+            FROM {old_table} AS old
+            JOIN texts ON texts.hash = {TEXT_HASH_SQL.format(column='old.text')}
+            WHERE old.word_id IS NOT NULL
+        """)
+
+    op.drop_index('ix_examples_text', table_name='examples')
+    op.drop_index('ix_examples_id', table_name='examples')
+    op.drop_table('examples')
+    op.drop_index('ix_definitions_text', table_name='definitions')
+    op.drop_index('ix_definitions_id', table_name='definitions')
+    op.drop_table('definitions')
+
+
+def downgrade() -> None:
+    op.create_table('definitions',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('word_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_definitions_id', 'definitions', ['id'], unique=False)
+    op.create_index('ix_definitions_text', 'definitions', ['text'], unique=False)
+    op.create_table('examples',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('word_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_examples_id', 'examples', ['id'], unique=False)
+    op.create_index('ix_examples_text', 'examples', ['text'], unique=False)
+
+    for old_table, link_table in [
+        ('definitions', 'word_definitions'),
+        ('examples', 'word_examples'),
+    ]:
+        op.execute(f"""
+            INSERT INTO {old_table} (word_id, text)
+            SELECT link.word_id, texts.text
+            FROM {link_table} AS link
+            JOIN texts ON texts.id = link.text_id
+        """)
+
+    op.drop_table('word_examples')
+    op.drop_table('word_definitions')
+    op.drop_table('texts')
@@ -0,0 +1,27 @@
+"""word versions
+
+Revision ID: 9d4e2b7a6c13
+Revises: 5b1f7e3c2a91
+Create Date: 2026-10-19 11:00:41.903516
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e2b7a6c13'
+down_revision = '5b1f7e3c2a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('words', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('words', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('words', 'updated_at')
+    op.drop_column('words', 'version')
@@ -0,0 +1,39 @@
+"""word counters
+
+Revision ID: 3c8a5d1e7f42
+Revises: 9d4e2b7a6c13
+Create Date: 2026-10-19 12:00:12.480215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8a5d1e7f42'
+down_revision = '9d4e2b7a6c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'word_counters',
+        sa.Column('language', sa.String(length=2), nullable=False),
+        sa.Column('words', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('deleted', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('language')
+    )
+    op.execute(
+        """
+        INSERT INTO word_counters (language, words, deleted)
+        SELECT language, count(*), count(*) FILTER (WHERE deleted)
+        FROM words
+        GROUP BY language
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('word_counters')
@@ -0,0 +1,204 @@
+"""language partitions
+
+Revision ID: e2a9c4b61d58
+Revises: 3c8a5d1e7f42
+Create Date: 2026-10-19 13:00:27.615094
+
+Rebuilds words and the tables linking to them as LIST partitioned by language,
+with a partition per language already present and a default one for the rest.
+Rows are copied inside the migration transaction, so run it in a maintenance
+window on big databases.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c4b61d58'
+down_revision = '3c8a5d1e7f42'
+branch_labels = None
+depends_on = None
+
+# Partitioned table -> its partition key
+PARTITION_KEYS = {
+    'words': 'language',
+    'word_translations': 'from_word_language',
+    'word_synonyms': 'from_word_language',
+    'word_definitions': 'word_language',
+    'word_examples': 'word_language',
+}
+LINK_TABLES = ['word_translations', 'word_synonyms', 'word_definitions', 'word_examples']
+
+# Languages end up in table names
+LANGUAGE_PATTERN = re.compile('^[a-z]{2}$')
+
+
+def _actuality():
+    return postgresql.ENUM('actual', 'outdated', name='actuality', create_type=False)
+
+
+def _create_partitions(table: str, languages: list[str]):
+    for language in languages:
+        op.execute(
+            f"CREATE TABLE {table}_{language} PARTITION OF {table} "
+            f"FOR VALUES IN ('{language}')"
+        )
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def _create_word_link_table(name: str):
+    op.create_table(name,
+    sa.Column('from_word_id', sa.Integer(), nullable=False),
+    sa.Column('from_word_language', sa.String(length=2), nullable=False),
+    sa.Column('to_word_id', sa.Integer(), nullable=False),
+    sa.Column('to_word_language', sa.String(length=2), nullable=False),
+    sa.ForeignKeyConstraint(['from_word_id', 'from_word_language'], ['words.id', 'words.language'], ),
+    sa.ForeignKeyConstraint(['to_word_id', 'to_word_language'], ['words.id', 'words.language'], ),
+    sa.PrimaryKeyConstraint('from_word_id', 'from_word_language', 'to_word_id'),
+    postgresql_partition_by='LIST (from_word_language)'
+    )
+
+
+def _create_word_text_table(name: str):
+    op.create_table(name,
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.Column('word_language', sa.String(length=2), nullable=False),
+    sa.Column('text_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['text_id'], ['texts.id'], ),
+    sa.ForeignKeyConstraint(['word_id', 'word_language'], ['words.id', 'words.language'], ),
+    sa.PrimaryKeyConstraint('word_id', 'word_language', 'text_id'),
+    postgresql_partition_by='LIST (word_language)'
+    )
+
+
+def upgrade() -> None:
+    languages = [
+        language
+        for language in op.get_bind().execute(
+            sa.text('SELECT DISTINCT language FROM words ORDER BY language')
+        ).scalars()
+        if LANGUAGE_PATTERN.match(language)
+    ]
+
+    # Make room for the partitioned tables, index names are schema wide
+    op.drop_index('ix_words_id', table_name='words')
+    op.drop_index('ix_words_language', table_name='words')
+    op.drop_index('ix_words_word', table_name='words')
+    for table in ['words', *LINK_TABLES]:
+        op.rename_table(table, f'{table}_old')
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey')
+    op.execute('ALTER INDEX words_word_language_key RENAME TO words_old_word_language_key')
+
+    op.create_table('words',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('words_id_seq')"), nullable=False),
+    sa.Column('language', sa.String(length=2), nullable=False),
+    sa.Column('word', sa.String(length=255), nullable=False),
+    sa.Column('actuality', _actuality(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), server_default='FALSE', nullable=True),
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'language'),
+    sa.UniqueConstraint('word', 'language'),
+    postgresql_partition_by='LIST (language)'
+    )
+    # The sequence would go away with the old table otherwise
+    op.execute('ALTER SEQUENCE words_id_seq OWNED BY words.id')
+
+    _create_word_link_table('word_translations')
+    _create_word_link_table('word_synonyms')
+    _create_word_text_table('word_definitions')
+    _create_word_text_table('word_examples')
+
+    for table, _ in PARTITION_KEYS.items():
+        _create_partitions(table, languages)
+
+    op.execute("""
+        INSERT INTO words (id, language, word, actuality, deleted, version, updated_at)
+        SELECT id, language, word, actuality, deleted, version, updated_at
+        FROM words_old
+    """)
+    for table in ['word_translations', 'word_synonyms']:
+        op.execute(f"""
+            INSERT INTO {table} (from_word_id, from_word_language, to_word_id, to_word_language)
+            SELECT link.from_word_id, from_word.language, link.to_word_id, to_word.language
+            FROM {table}_old AS link
+            JOIN words_old AS from_word ON from_word.id = link.from_word_id
+            JOIN words_old AS to_word ON to_word.id = link.to_word_id
+        """)
+    for table in ['word_definitions', 'word_examples']:
+        op.execute(f"""
+            INSERT INTO {table} (word_id, word_language, text_id)
+            SELECT link.word_id, word.language, link.text_id
+            FROM {table}_old AS link
+            JOIN words_old AS word ON word.id = link.word_id
+        """)
+
+    for table in [*LINK_TABLES, 'words']:
+        op.drop_table(f'{table}_old')
+
+    for table in PARTITION_KEYS:
+        op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    op.create_table('words_plain',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('words_id_seq')"), nullable=False),
+    sa.Column('word', sa.String(length=255), nullable=False),
+    sa.Column('language', sa.String(length=2), nullable=False),
+    sa.Column('actuality', _actuality(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), server_default='FALSE', nullable=True),
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='words_plain_pkey'),
+    sa.UniqueConstraint('word', 'language', name='words_plain_word_language_key')
+    )
+    for table in ['word_translations', 'word_synonyms']:
+        op.create_table(f'{table}_plain',
+        sa.Column('from_word_id', sa.Integer(), nullable=False),
+        sa.Column('to_word_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['from_word_id'], ['words_plain.id'], name=f'{table}_from_word_id_fkey'),
+        sa.ForeignKeyConstraint(['to_word_id'], ['words_plain.id'], name=f'{table}_to_word_id_fkey'),
+        sa.PrimaryKeyConstraint('from_word_id', 'to_word_id', name=f'{table}_plain_pkey')
+        )
+    for table in ['word_definitions', 'word_examples']:
+        op.create_table(f'{table}_plain',
+        sa.Column('word_id', sa.Integer(), nullable=False),
+        sa.Column('text_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['text_id'], ['texts.id'], name=f'{table}_text_id_fkey'),
+        sa.ForeignKeyConstraint(['word_id'], ['words_plain.id'], name=f'{table}_word_id_fkey'),
+        sa.PrimaryKeyConstraint('word_id', 'text_id', name=f'{table}_plain_pkey')
+        )
+
+    op.execute("""
+        INSERT INTO words_plain (id, word, language, actuality, deleted, version, updated_at)
+        SELECT id, word, language, actuality, deleted, version, updated_at
+        FROM words
+    """)
+    for table in ['word_translations', 'word_synonyms']:
+        op.execute(f"""
+            INSERT INTO {table}_plain (from_word_id, to_word_id)
+            SELECT from_word_id, to_word_id FROM {table}
+        """)
+    for table in ['word_definitions', 'word_examples']:
+        op.execute(f"""
+            INSERT INTO {table}_plain (word_id, text_id)
+            SELECT word_id, text_id FROM {table}
+        """)
+
+    op.execute('ALTER SEQUENCE words_id_seq OWNED BY words_plain.id')
+    for table in [*LINK_TABLES, 'words']:
+        # Partitions are dropped with their parent
+        op.drop_table(table)
+
+    for table in ['words', *LINK_TABLES]:
+        op.rename_table(f'{table}_plain', table)
+        op.execute(f'ALTER INDEX {table}_plain_pkey RENAME TO {table}_pkey')
+    op.execute('ALTER INDEX words_plain_word_language_key RENAME TO words_word_language_key')
+
+    op.create_index('ix_words_id', 'words', ['id'], unique=False)
+    op.create_index('ix_words_language', 'words', ['language'], unique=False)
+    op.create_index('ix_words_word', 'words', ['word'], unique=False)
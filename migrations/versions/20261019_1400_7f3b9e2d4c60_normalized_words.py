@@ -0,0 +1,173 @@
+"""normalized words
+
+Revision ID: 7f3b9e2d4c60
+Revises: e2a9c4b61d58
+Create Date: 2026-10-19 14:00:41.208376
+
+Adds the canonical form of a word (`normalize_word`) as a column and makes it
+the unique key instead of the word as received. Words that collapse to the same
+canonical form are merged: links of the duplicates move to the word that is kept
+(actual over outdated, then not deleted, then the newest version, then the oldest
+row), the duplicates are removed and the word counters are adjusted.
+Merging is not undone by the downgrade.
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3b9e2d4c60'
+down_revision = 'e2a9c4b61d58'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 10000
+
+# Link table -> (word id, word language) column pairs linking to words
+# and the other columns, copied as they are
+WORD_LINKS = {
+    'word_translations': (
+        [('from_word_id', 'from_word_language'), ('to_word_id', 'to_word_language')], [],
+    ),
+    'word_synonyms': (
+        [('from_word_id', 'from_word_language'), ('to_word_id', 'to_word_language')], [],
+    ),
+    'word_definitions': ([('word_id', 'word_language')], ['text_id']),
+    'word_examples': ([('word_id', 'word_language')], ['text_id']),
+}
+
+
+def _normalize_word(word: str) -> str:
+    # Frozen copy of `normalize_word`: replaying the revision must give the same
+    # result whatever the application's normalization turns into later
+    return unicodedata.normalize('NFC', ' '.join(word.split()).casefold())
+
+
+def _backfill_normalized():
+    """
+    Computed in Python, SQL has no exact equivalent of str.casefold
+    """
+    connection = op.get_bind()
+    update = sa.text(
+        'UPDATE words SET normalized = :normalized '
+        'WHERE id = :id AND language = :language'
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                'SELECT id, language, word FROM words WHERE id > :last_id '
+                'ORDER BY id LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        connection.execute(update, [
+            {'id': id_, 'language': language, 'normalized': _normalize_word(word)}
+            for id_, language, word in rows
+        ])
+        last_id = rows[-1].id
+
+
+def _repoint_links(table: str, columns: list[tuple[str, str]], kept_columns: list[str]):
+    all_columns = [column for pair in columns for column in pair] + kept_columns
+    joins = []
+    selected = []
+    merged = []
+    for index, (id_column, language_column) in enumerate(columns):
+        alias = f'merge_{index}'
+        joins.append(
+            f'LEFT JOIN word_merges AS {alias} '
+            f'ON {alias}.old_id = link.{id_column} '
+            f'AND {alias}.language = link.{language_column}'
+        )
+        selected += [f'COALESCE({alias}.new_id, link.{id_column})', f'link.{language_column}']
+        merged.append(f'{alias}.old_id IS NOT NULL')
+    selected += [f'link.{column}' for column in kept_columns]
+
+    op.execute(f"""
+        INSERT INTO {table} ({', '.join(all_columns)})
+        SELECT {', '.join(selected)}
+        FROM {table} AS link
+        {' '.join(joins)}
+        WHERE {' OR '.join(merged)}
+        ON CONFLICT DO NOTHING
+    """)
+    for id_column, language_column in columns:
+        op.execute(f"""
+            DELETE FROM {table} AS link
+            USING word_merges AS merge
+            WHERE merge.old_id = link.{id_column}
+            AND merge.language = link.{language_column}
+        """)
+
+
+def upgrade() -> None:
+    op.add_column('words', sa.Column('normalized', sa.String(length=255), nullable=True))
+    _backfill_normalized()
+
+    op.execute("""
+        CREATE TEMPORARY TABLE word_merges AS
+        SELECT id AS old_id, language, new_id
+        FROM (
+            SELECT id, language, first_value(id) OVER (
+                PARTITION BY normalized, language
+                ORDER BY actuality = 'actual' DESC, deleted IS TRUE, version DESC, id
+            ) AS new_id
+            FROM words
+        ) AS ranked
+        WHERE id <> new_id
+    """)
+
+    for table, (columns, kept_columns) in WORD_LINKS.items():
+        _repoint_links(table, columns, kept_columns)
+    # Variants that were translations or synonyms of each other
+    for table in ['word_translations', 'word_synonyms']:
+        op.execute(f"""
+            DELETE FROM {table}
+            WHERE from_word_id = to_word_id AND from_word_language = to_word_language
+        """)
+
+    op.execute("""
+        UPDATE word_counters AS counter
+        SET words = counter.words - removed.words,
+            deleted = counter.deleted - removed.deleted
+        FROM (
+            SELECT word.language, count(*) AS words,
+                count(*) FILTER (WHERE word.deleted) AS deleted
+            FROM word_merges AS merge
+            JOIN words AS word ON word.id = merge.old_id AND word.language = merge.language
+            GROUP BY word.language
+        ) AS removed
+        WHERE counter.language = removed.language
+    """)
+    op.execute("""
+        DELETE FROM words AS word
+        USING word_merges AS merge
+        WHERE word.id = merge.old_id AND word.language = merge.language
+    """)
+    # Cached representations of the kept words are stale now
+    op.execute("""
+        UPDATE words
+        SET version = version + 1, updated_at = now()
+        WHERE (id, language) IN (SELECT new_id, language FROM word_merges)
+    """)
+    op.execute('DROP TABLE word_merges')
+
+    op.alter_column('words', 'normalized', nullable=False)
+    op.drop_constraint('words_word_language_key', 'words', type_='unique')
+    op.create_unique_constraint(
+        'words_normalized_language_key', 'words', ['normalized', 'language']
+    )
+    op.execute('ANALYZE words')
+
+
+def downgrade() -> None:
+    op.drop_constraint('words_normalized_language_key', 'words', type_='unique')
+    op.create_unique_constraint('words_word_language_key', 'words', ['word', 'language'])
+    op.drop_column('words', 'normalized')
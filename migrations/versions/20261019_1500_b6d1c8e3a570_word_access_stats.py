@@ -0,0 +1,36 @@
+"""word access stats
+
+Revision ID: b6d1c8e3a570
+Revises: 7f3b9e2d4c60
+Create Date: 2026-10-19 15:00:08.931742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d1c8e3a570'
+down_revision = '7f3b9e2d4c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'word_access_stats',
+        sa.Column('language', sa.String(length=2), nullable=False),
+        sa.Column('word', sa.String(length=255), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hits', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('language', 'word', 'day')
+    )
+    op.create_index(
+        op.f('ix_word_access_stats_day'), 'word_access_stats', ['day'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_word_access_stats_day'), table_name='word_access_stats')
+    op.drop_table('word_access_stats')
@@ -0,0 +1,36 @@
+"""upstream responses
+
+Revision ID: c93e4f7a1b28
+Revises: b6d1c8e3a570
+Create Date: 2026-10-19 16:00:27.514093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import gtservice.db
+
+
+# revision identifiers, used by Alembic.
+revision = 'c93e4f7a1b28'
+down_revision = 'b6d1c8e3a570'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'upstream_responses',
+        sa.Column('source', sa.String(length=32), nullable=False),
+        sa.Column('source_language', sa.String(length=2), nullable=False),
+        sa.Column('translation_language', sa.String(length=2), nullable=False),
+        sa.Column('word', sa.String(length=255), nullable=False),
+        sa.Column('params', sa.Text(), nullable=False),
+        sa.Column('encoding', sa.String(length=8), nullable=False),
+        sa.Column('body', sa.LargeBinary(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('source', 'source_language', 'translation_language', 'word')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('upstream_responses')
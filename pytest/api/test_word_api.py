@@ -1,7 +1,15 @@
+import json
+from math import ceil
+
+import msgpack
 import pytest
 from httpx import AsyncClient
+from pytest_mock import MockerFixture
 
+from gtservice import settings
 from gtservice.api.translations import TranslatedWordResponse
+from gtservice.db.models import WordCounterModel
+from gtservice.node_cache import CachedResponse, NodeCache, word_key
 
 
 @pytest.mark.usefixtures("testing_words", "mock_google_translation_api")
@@ -21,6 +29,15 @@ async def test_get_present_word(client: AsyncClient):
     assert len(translated_word.examples) > 0
 
 
+@pytest.mark.usefixtures("testing_words", "mock_google_translation_api")
+@pytest.mark.asyncio
+async def test_get_present_word_case_variant(client: AsyncClient):
+    rv = await client.get('/translations/%20Interesting?source_language=en&translation_language=ru')
+    rv.raise_for_status()
+
+    assert rv.json()['word'] == 'interesting'
+
+
 @pytest.mark.usefixtures("testing_words", "mock_google_translation_api")
 @pytest.mark.asyncio
 async def test_unknown_word_merge(client: AsyncClient):
@@ -120,3 +137,191 @@ async def test_get_word_list(client: AsyncClient, params: str, expected_result:
         'total_pages': data['total_pages'],
         'results': len(data['results'])
     } == expected_result
+
+
+@pytest.mark.parametrize(
+    'count_mode, count',
+    [
+        pytest.param('exact', 58, id='exact'),
+        pytest.param('cached', 1000, id='cached'),
+        pytest.param('estimated', 1000, id='estimated'),
+    ]
+)
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_only_exact_count_ignores_word_counters(
+        client: AsyncClient, mocker: MockerFixture, count_mode: str, count: int
+):
+    # Counters that drifted from the table
+    mocker.patch.object(WordCounterModel, 'get_total', return_value=1000)
+
+    rv = await client.get(f'/translations/?language=en&count_mode={count_mode}')
+    rv.raise_for_status()
+
+    assert rv.json()['count'] == count
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_get_word_list_estimated(client: AsyncClient):
+    rv = await client.get('/translations/?word_part=ing&count_mode=estimated')
+    rv.raise_for_status()
+    data = rv.json()
+
+    # The planner's guess on Postgres, exact elsewhere
+    assert isinstance(data['count'], int)
+    assert data['total_pages'] == ceil(data['count'] / 10)
+    assert data['count_mode'] == 'estimated'
+    assert data['has_next'] is True
+    assert len(data['results']) == 10
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_get_word_list_estimated_falls_back_to_exact(
+        client: AsyncClient, mocker: MockerFixture
+):
+    estimate_count = mocker.patch(
+        'gtservice.api.translations.estimate_count', return_value=None
+    )
+
+    rv = await client.get('/translations/?word_part=ing&count_mode=estimated')
+    rv.raise_for_status()
+    data = rv.json()
+
+    estimate_count.assert_awaited_once()
+    assert (data['count'], data['total_pages']) == (37, 4)
+
+
+@pytest.mark.parametrize(
+    'page, has_next, results',
+    [
+        pytest.param(1, True, 10, id='first_page'),
+        pytest.param(4, False, 7, id='last_page'),
+        pytest.param(5, False, 0, id='past_the_end'),
+    ]
+)
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_get_word_list_without_count(
+        client: AsyncClient, page: int, has_next: bool, results: int
+):
+    rv = await client.get(f'/translations/?word_part=ing&page={page}&count_mode=none')
+    rv.raise_for_status()
+    data = rv.json()
+
+    assert (data['count'], data['total_pages']) == (None, None)
+    assert data['count_mode'] == 'none'
+    assert data['has_next'] is has_next
+    assert len(data['results']) == results
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_get_word_not_modified(client: AsyncClient):
+    url = '/translations/interesting?source_language=en&translation_language=ru'
+    rv = await client.get(url)
+    rv.raise_for_status()
+    assert rv.headers['ETag']
+    assert rv.headers['Last-Modified']
+
+    rv = await client.get(url, headers={'If-None-Match': rv.headers['ETag']})
+    assert rv.status_code == 304
+    assert not rv.content
+
+    rv = await client.get(url, headers={'If-None-Match': 'W/"0-0"'})
+    assert rv.status_code == 200
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+@pytest.mark.parametrize('url', [
+    '/translations/interesting?source_language=en&translation_language=ru',
+    '/translations/?language=en&page_size=50',
+])
+async def test_msgpack_matches_json(client: AsyncClient, url: str):
+    rv = await client.get(url)
+    rv.raise_for_status()
+    assert rv.headers['Content-Type'] == 'application/json'
+
+    packed = await client.get(url, headers={'Accept': 'application/msgpack'})
+    packed.raise_for_status()
+    assert packed.headers['Content-Type'] == 'application/msgpack'
+    assert msgpack.unpackb(packed.content) == rv.json()
+    assert rv.headers['Vary'] == packed.headers['Vary'] == 'Accept'
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_node_cached_responses_vary_on_accept(
+        client: AsyncClient, mocker: MockerFixture, tmp_path
+):
+    cache = NodeCache(
+        path=str(tmp_path / 'node-cache.sqlite3'), max_bytes=1024 * 1024, ttl=60, busy_timeout=1
+    )
+    cache.open()
+    mocker.patch('gtservice.api.translations.node_cache', cache)
+    url = '/translations/interesting?source_language=en&translation_language=ru'
+    try:
+        rv = await client.get(url)
+        rv.raise_for_status()
+        # An entry stored without the header
+        cached = cache.get(word_key('interesting', 'en'))
+        await cache.set(word_key('interesting', 'en'), CachedResponse(
+            body=cached.body,
+            headers={key: value for key, value in cached.headers.items() if key != 'Vary'},
+        ))
+
+        responses = [
+            await client.get(url),
+            await client.get(url, headers={'Accept': 'application/msgpack'}),
+            await client.get(url, headers={'If-None-Match': rv.headers['ETag']}),
+        ]
+    finally:
+        cache.close()
+
+    assert [item.status_code for item in responses] == [200, 200, 304]
+    assert all(item.headers['Vary'] == 'Accept' for item in responses)
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+@pytest.mark.parametrize('enabled', [False, True])
+async def test_profile_needs_profiling_enabled(
+        client: AsyncClient, mocker: MockerFixture, tmp_path, enabled: bool
+):
+    mocker.patch.object(settings, 'PROFILING_ENABLED', enabled)
+    mocker.patch.object(settings, 'PROFILING_ALLOWED_HOSTS', {'127.0.0.1'})
+    mocker.patch.object(settings, 'PROFILING_OUTPUT_DIR', str(tmp_path))
+
+    rv = await client.get(
+        '/translations/interesting?source_language=en&translation_language=ru',
+        headers={'X-Profile': '1'},
+    )
+    rv.raise_for_status()
+
+    assert ('Server-Timing' in rv.headers) is enabled
+    assert ('X-Profile-Id' in rv.headers) is enabled
+
+
+@pytest.mark.usefixtures("testing_words")
+@pytest.mark.asyncio
+async def test_profile_covers_streamed_body(
+        client: AsyncClient, mocker: MockerFixture, tmp_path
+):
+    mocker.patch.object(settings, 'PROFILING_ENABLED', True)
+    mocker.patch.object(settings, 'PROFILING_ALLOWED_HOSTS', {'127.0.0.1'})
+    mocker.patch.object(settings, 'PROFILING_OUTPUT_DIR', str(tmp_path))
+
+    rv = await client.post(
+        '/translations/text',
+        json={'text': 'interesting', 'source_language': 'en', 'translation_language': 'ru'},
+        headers={'X-Profile': '1'},
+    )
+    rv.raise_for_status()
+
+    with open(tmp_path / f"{rv.headers['X-Profile-Id']}.json") as file:
+        saved = json.load(file)
+    # Words are looked up while the body streams
+    assert saved['statements_count'] > 0
+    assert len(saved['statements']) == saved['statements_count']
@@ -11,17 +11,22 @@ from gtservice.logic.translation import insert_or_update_translation
 
 @pytest_asyncio.fixture
 async def db_session() -> Generator[Session, None, None]:
+    await database.connect()
     await database.drop_all()
     await database.create_all()
 
     async with database_session_context() as session:
         yield session
+        # An open transaction would keep the tables locked for DROP
+        await session.rollback()
         await database.drop_all()
 
+    await database.disconnect()
+
 
 @pytest_asyncio.fixture
 async def testing_words(db_session: AsyncSession) -> Generator[None, None, None]:
-    from gtservice.translation_loader.loader import _parse_from_body
+    from gtservice.translation_loader.google import _parse_from_body
 
     for word, sl, tl, path in [
         ('interesting', 'en', 'ru', './pytest/files/testing_data_gt.json'),
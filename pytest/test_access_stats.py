@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.db.models import WordAccessStatsModel
+from gtservice.logic.access_stats import AccessTracker, _today
+
+
+@pytest.mark.asyncio
+async def test_hits_are_added_up_across_flushes(db_session: AsyncSession):
+    tracker = AccessTracker(flush_interval=60, max_words=10, retention_days=7)
+    tracker.start()
+
+    tracker.record_many([('car', 'en'), ('car', 'en'), ('auto', 'de')])
+    await tracker.flush()
+    tracker.record('car', 'en')
+    tracker.record('book', 'en')
+    await tracker.stop()
+
+    hot_words = await WordAccessStatsModel.get_hot_words(
+        db_session, since=_today() - timedelta(days=1)
+    )
+    assert [tuple(row) for row in hot_words] == [
+        ('en', 'car', 3), ('de', 'auto', 1), ('en', 'book', 1),
+    ]
+
+    hot_words = await WordAccessStatsModel.get_hot_words(
+        db_session, since=_today(), language='de', limit=1
+    )
+    assert [tuple(row) for row in hot_words] == [('de', 'auto', 1)]
+
+
+@pytest.mark.asyncio
+async def test_old_days_are_pruned(db_session: AsyncSession):
+    await WordAccessStatsModel.add_hits(
+        db_session, {('car', 'en'): 5}, _today() - timedelta(days=30)
+    )
+    await db_session.commit()
+
+    tracker = AccessTracker(flush_interval=60, max_words=10, retention_days=7)
+    tracker.start()
+    tracker.record('car', 'en')
+    await tracker.stop()
+
+    days = (await db_session.execute(
+        select(WordAccessStatsModel.day, WordAccessStatsModel.hits)
+    )).all()
+    assert [tuple(row) for row in days] == [(_today(), 1)]
+
+
+@pytest.mark.asyncio
+async def test_words_over_the_limit_are_dropped(db_session: AsyncSession):
+    tracker = AccessTracker(flush_interval=60, max_words=2, retention_days=7)
+    tracker.start()
+
+    tracker.record_many([('one', 'en'), ('two', 'en'), ('three', 'en'), ('one', 'en')])
+    await tracker.stop()
+
+    hot_words = await WordAccessStatsModel.get_hot_words(db_session, since=_today())
+    assert [tuple(row) for row in hot_words] == [('en', 'one', 2), ('en', 'two', 1)]
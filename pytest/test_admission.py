@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from gtservice.admission import Deadline, DeadlineExceededError, MissAdmission, OverloadedError
+
+
+@pytest.mark.asyncio
+async def test_saturated_queue_is_rejected():
+    admission = MissAdmission(max_in_flight=1, max_queued=1)
+    release = asyncio.Event()
+
+    async def miss():
+        async with admission.admit(Deadline(5)):
+            await release.wait()
+
+    running = asyncio.create_task(miss())
+    await asyncio.sleep(0.01)
+    queued = asyncio.create_task(miss())
+    await asyncio.sleep(0.01)
+    assert admission.queued == 1
+
+    with pytest.raises(OverloadedError):
+        async with admission.admit(Deadline(5)):
+            pass
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert admission.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_miss_respects_deadline():
+    admission = MissAdmission(max_in_flight=1, max_queued=10)
+
+    async with admission.admit(Deadline(5)):
+        with pytest.raises(DeadlineExceededError):
+            async with admission.admit(Deadline(0.01)):
+                pass
+
+    async with admission.admit(Deadline(0.01)):
+        pass
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.db.models import WordAccessStatsModel
+from gtservice.logic.autocomplete import AutocompleteIndex, PackedWords, PrefixIndex
+from gtservice.logic.translation import insert_or_update_translation
+from gtservice.translation_loader.schemas import TranslatedWordSchema, WordSchema
+
+
+def test_packed_words_are_sorted_and_unique():
+    words = PackedWords([b'pear', b'apple', b'pear', b'\xd1\x8f\xd0\xb1'])
+
+    assert list(words) == [b'apple', b'pear', b'\xd1\x8f\xd0\xb1']
+    assert b'pear' in words
+    assert b'pea' not in words
+
+
+def test_packed_words_keep_the_empty_word():
+    words = PackedWords([b'b', b'', b'a', b'', b'b'])
+
+    assert list(words) == [b'', b'a', b'b']
+    assert list(PackedWords([b''])) == [b'']
+    assert list(PackedWords(iter([b'a', b'c', b'b']))) == [b'a', b'b', b'c']
+
+
+def test_prefix_index_merges_overlay():
+    index = PrefixIndex(PackedWords([b'interest', b'interesting', b'internal', b'into']))
+
+    index.add('interested')
+    index.add('interest')
+    index.remove('internal')
+    index.remove('missing')
+
+    assert index.complete('inter', limit=10) == ['interest', 'interested', 'interesting']
+    assert index.complete('inter', limit=2) == ['interest', 'interested']
+    assert index.complete('x', limit=10) == []
+    assert len(index) == 4
+
+    index.remove('interested')
+    index.add('internal')
+    assert index.overlay_size == 0
+
+
+def test_merge_folds_overlay_into_base():
+    index = PrefixIndex(PackedWords([b'a', b'c']))
+    index.add('b')
+    index.remove('c')
+
+    merged = PrefixIndex(PrefixIndex.merge(*index.snapshot()))
+
+    assert list(merged.base) == [b'a', b'b']
+    assert merged.overlay_size == 0
+
+
+@pytest.mark.asyncio
+async def test_large_overlay_is_compacted():
+    index = AutocompleteIndex(overlay_limit=2)
+
+    index.add_words(WordSchema(word, 'en') for word in ['слово', 'словарь', 'слон'])
+    await asyncio.sleep(0.1)
+
+    language_index = index.indexes()['en']
+    assert language_index.overlay_size == 0
+    assert len(language_index.base) == 3
+    assert index.complete('сло', 'en', limit=2) == ['словарь', 'слово']
+
+
+@pytest.mark.asyncio
+async def test_disabled_index_ignores_changes():
+    index = AutocompleteIndex(overlay_limit=1, enabled=False)
+
+    index.add_words(WordSchema(word, 'en') for word in ['car', 'cart', 'care'])
+    index.remove_words([WordSchema('car', 'en')])
+    index.start(refresh_interval=0)
+
+    assert index.indexes() == {}
+    assert index.complete('car', 'en', limit=10) == []
+    assert index._compaction is None and index._task is None
+
+
+@pytest.mark.asyncio
+async def test_suggestions_are_ranked_by_requests(db_session: AsyncSession):
+    await insert_or_update_translation(db_session, TranslatedWordSchema(
+        word=WordSchema('car', 'en'),
+        translation_language='ru',
+        translations=[WordSchema('машина', 'ru')],
+        synonyms=[WordSchema(word, 'en') for word in ['card', 'care', 'cart']],
+        examples=[],
+        definitions=[],
+    ))
+    # "cargo" was requested, but never stored
+    await WordAccessStatsModel.add_hits(
+        db_session,
+        {('cart', 'en'): 5, ('care', 'en'): 2, ('cargo', 'en'): 9},
+        datetime.now(timezone.utc).date(),
+    )
+    await db_session.commit()
+
+    index = AutocompleteIndex(overlay_limit=100, ranked_words=10)
+    await index.load()
+
+    assert index.complete('car', 'en', limit=3) == ['cart', 'care', 'car']
+    assert index.complete('car', 'en', limit=10) == ['cart', 'care', 'car', 'card']
+    assert index.complete('card', 'en', limit=10) == ['card']
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.db.models import WordCounterModel
+from gtservice.logic.counting import CountCache
+from gtservice.logic.translation import insert_or_update_translation
+from gtservice.translation_loader.schemas import TranslatedWordSchema, WordSchema
+
+
+def test_count_cache_expires_and_evicts(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr('gtservice.logic.counting.time.monotonic', lambda: now)
+    cache = CountCache(ttl=10, max_size=2)
+
+    cache.set(('ing', None), 37)
+    cache.set(('ing', 'en'), 30)
+    cache.set(('er', None), 5)
+    assert cache.get(('ing', None)) is None
+    assert cache.get(('ing', 'en')) == 30
+
+    now = 111.0
+    assert cache.get(('er', None)) is None
+
+
+@pytest.mark.asyncio
+async def test_word_counters_follow_upserts(db_session: AsyncSession):
+    word_info = TranslatedWordSchema(
+        word=WordSchema('render', 'en'),
+        translation_language='ru',
+        translations=[WordSchema('отображать', 'ru')],
+        synonyms=[WordSchema('provide', 'en')],
+        examples=[],
+        definitions=[],
+    )
+    await insert_or_update_translation(db_session, word_info)
+    await insert_or_update_translation(db_session, word_info)
+
+    counters = {
+        mdl.language: (mdl.words, mdl.deleted)
+        for mdl in (await db_session.execute(select(WordCounterModel))).scalars()
+    }
+    assert counters == {'en': (2, 0), 'ru': (1, 0)}
+    assert await WordCounterModel.get_total(db_session, None) == 3
@@ -0,0 +1,65 @@
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+from gtservice import settings
+from gtservice.db import Database
+from gtservice.db.models import WordModel
+from gtservice.db.routing import ReplicaSet, RoutingSession, USE_PRIMARY_KEY
+
+
+@pytest.fixture
+def engines() -> tuple[AsyncEngine, AsyncEngine]:
+    return (
+        create_async_engine(settings.DB_CONNECTION_STRING),
+        create_async_engine(settings.DB_CONNECTION_STRING),
+    )
+
+
+def test_reads_go_to_replica_until_write(engines: tuple[AsyncEngine, AsyncEngine]):
+    primary, replica = engines
+    session = RoutingSession(primary=primary, replicas=ReplicaSet([replica], 1))
+
+    assert session.get_bind(clause=select(WordModel)) is replica.sync_engine
+    assert session.get_bind(clause=update(WordModel)) is primary.sync_engine
+    assert session.info[USE_PRIMARY_KEY]
+    assert session.get_bind(clause=select(WordModel)) is primary.sync_engine
+
+
+def test_reads_fall_back_to_primary(engines: tuple[AsyncEngine, AsyncEngine]):
+    primary, _ = engines
+    session = RoutingSession(primary=primary, replicas=ReplicaSet([], 1))
+
+    assert session.get_bind(clause=select(WordModel)) is primary.sync_engine
+
+
+def test_session_sticks_to_one_replica(engines: tuple[AsyncEngine, AsyncEngine]):
+    primary = create_async_engine(settings.DB_CONNECTION_STRING)
+    replicas = ReplicaSet(list(engines), 1)
+    first = RoutingSession(primary=primary, replicas=replicas)
+    second = RoutingSession(primary=primary, replicas=replicas)
+
+    first_binds = {first.get_bind(clause=select(WordModel)) for _ in range(5)}
+    second_binds = {second.get_bind(clause=select(WordModel)) for _ in range(5)}
+
+    assert len(first_binds) == len(second_binds) == 1
+    assert first_binds | second_binds == {engine.sync_engine for engine in engines}
+
+
+@pytest.mark.asyncio
+async def test_replicas_are_checked_before_serving(mocker: MockerFixture):
+    mocker.patch.object(settings, 'DB_REPLICA_CONNECTION_STRINGS', [
+        'sqlite+aiosqlite:////nonexistent/replica.db',
+        settings.DB_CONNECTION_STRING,
+    ])
+    database = Database()
+    await database.connect()
+    try:
+        async with database.async_session_generator()() as session:
+            bind = session.sync_session.get_bind(clause=select(WordModel))
+        # The healthy replica, not the failed one or the primary fallback
+        assert bind is not database.engine.sync_engine
+        assert bind.url.render_as_string(hide_password=False) == settings.DB_CONNECTION_STRING
+    finally:
+        await database.disconnect()
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from gtservice.db import _create_engine
+from gtservice.db.common import Base
+from gtservice.db.models import WordModel, WordCounterModel
+from gtservice.logic.translation import merge_translation
+from gtservice.translation_loader.schemas import TranslatedWordSchema, WordSchema
+
+
+def test_words_id_is_the_rowid_on_sqlite():
+    ddl = str(CreateTable(WordModel.__table__).compile(dialect=sqlite.dialect()))
+
+    assert 'id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT' in ddl
+    assert 'UNIQUE (id, language)' in ddl
+
+
+@pytest.mark.asyncio
+async def test_words_are_stored_and_found_on_sqlite(tmp_path):
+    engine = _create_engine(f'sqlite+aiosqlite:///{tmp_path}/words.sqlite3')
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            journal_mode = (await connection.execute(text('PRAGMA journal_mode'))).scalar()
+        assert journal_mode == 'wal'
+
+        session_factory = async_sessionmaker(engine)
+        async with session_factory() as session:
+            await merge_translation(session, TranslatedWordSchema(
+                word=WordSchema('Car', 'en'),
+                translation_language='ru',
+                translations=[WordSchema('машина', 'ru')],
+                synonyms=[WordSchema('auto', 'en')],
+                examples=[],
+                definitions=[],
+            ))
+            await session.commit()
+
+        async with session_factory() as session:
+            word_model = await WordModel.get_full_word(session, 'car', 'en')
+            assert word_model is not None and word_model.deleted is False
+            assert [item.as_tuple() for item in word_model.translations] == [('машина', 'ru')]
+            assert await WordCounterModel.get_total(session, 'en') == 2
+    finally:
+        await engine.dispose()
@@ -0,0 +1,50 @@
+import pytest
+
+from gtservice.logic.flushing import BufferedFlusher
+
+
+class SummingFlusher(BufferedFlusher[str, int]):
+    def __init__(self, max_items: int):
+        super().__init__(flush_interval=60, max_items=max_items)
+        self.failing = False
+        self.written = []
+
+    def _combine(self, older: int, newer: int) -> int:
+        return older + newer
+
+    async def _write(self, items: dict[str, int]):
+        if self.failing:
+            raise RuntimeError('database is down')
+        self.written.append(items)
+
+
+@pytest.mark.asyncio
+async def test_values_are_combined_and_flushed_on_stop():
+    flusher = SummingFlusher(max_items=10)
+    flusher._add('ignored', 1)
+    flusher.start()
+
+    for key in ['a', 'b', 'a']:
+        flusher._add(key, 1)
+    await flusher.stop()
+
+    assert flusher.written == [{'a': 2, 'b': 1}]
+    assert not flusher.running
+
+
+@pytest.mark.asyncio
+async def test_failed_values_are_kept_under_the_limit():
+    flusher = SummingFlusher(max_items=2)
+    flusher.start()
+
+    flusher._add('a', 1)
+    flusher._add('b', 1)
+    flusher._add('c', 1)
+    flusher.failing = True
+    await flusher.flush()
+
+    flusher._add('a', 5)
+    flusher.failing = False
+    await flusher.stop()
+
+    assert flusher.written == [{'a': 6, 'b': 1}]
@@ -0,0 +1,49 @@
+import json
+import logging
+
+from pytest_mock import MockerFixture
+
+from gtservice import settings
+from gtservice.log import JsonFormatter, setup_logging, should_log_access, shutdown_logging
+
+
+def test_json_formatter_includes_extra():
+    record = logging.LogRecord(
+        'gtservice.access', logging.INFO, __file__, 1, 'GET %s', ('/translations/',), None
+    )
+    record.status_code = 200
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == 'GET /translations/'
+    assert entry['level'] == 'INFO'
+    assert entry['status_code'] == 200
+
+
+def test_failed_and_slow_requests_are_not_sampled(mocker: MockerFixture):
+    mocker.patch.object(settings, 'LOG_ACCESS_SAMPLE_RATE', 0)
+
+    assert should_log_access(500, 0.01)
+    assert should_log_access(200, settings.LOG_SLOW_REQUEST_THRESHOLD)
+    assert not should_log_access(200, 0.01)
+
+
+def test_shutdown_detaches_the_queue():
+    root = logging.getLogger()
+    level = root.level
+    try:
+        pipeline = setup_logging()
+        assert pipeline.queue_handler in root.handlers
+
+        shutdown_logging()
+        assert pipeline.queue_handler not in root.handlers
+
+        logging.getLogger('gtservice').warning('After shutdown')
+        assert pipeline.queue_handler.queue.empty()
+
+        # The next lifespan gets a working pipeline again
+        pipeline = setup_logging()
+        assert pipeline.queue_handler in root.handlers
+    finally:
+        shutdown_logging()
+        root.setLevel(level)
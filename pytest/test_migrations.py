@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from gtservice import settings
+
+pytestmark = pytest.mark.skipif(
+    make_url(settings.DB_CONNECTION_STRING).get_backend_name() != 'postgresql',
+    reason='the migration history is Postgres specific',
+)
+
+BEFORE_NORMALIZED_WORDS = 'e2a9c4b61d58'
+NORMALIZED_WORDS = '7f3b9e2d4c60'
+
+# "car" duplicates "CAR" and owns links of every kind, "машина" links to "car"
+CASE_DUPLICATES_SQL = [
+    """
+    INSERT INTO words (id, language, word, actuality, deleted, version) VALUES
+        (1, 'en', 'CAR', 'actual', false, 1),
+        (2, 'en', 'car', 'outdated', false, 3),
+        (3, 'ru', 'машина', 'actual', false, 1),
+        (4, 'en', 'auto', 'actual', false, 1)
+    """,
+    "INSERT INTO texts (id, hash, text) VALUES (1, 'a', 'a vehicle'), (2, 'b', 'my car')",
+    "INSERT INTO word_definitions (word_id, word_language, text_id) VALUES (2, 'en', 1)",
+    "INSERT INTO word_examples (word_id, word_language, text_id) VALUES (2, 'en', 2)",
+    """
+    INSERT INTO word_translations (from_word_id, from_word_language, to_word_id, to_word_language)
+    VALUES (2, 'en', 3, 'ru'), (3, 'ru', 2, 'en')
+    """,
+    """
+    INSERT INTO word_synonyms (from_word_id, from_word_language, to_word_id, to_word_language)
+    VALUES (2, 'en', 4, 'en'), (2, 'en', 1, 'en')
+    """,
+    "INSERT INTO word_counters (language, words, deleted) VALUES ('en', 3, 0), ('ru', 1, 0)",
+]
+
+
+def _alembic_config() -> Config:
+    # No ini file, so the test's logging setup is left alone
+    config = Config()
+    config.set_main_option('script_location', 'migrations')
+    return config
+
+
+async def _execute(statements: list[str]) -> list[list[tuple]]:
+    engine = create_async_engine(settings.DB_CONNECTION_STRING)
+    try:
+        async with engine.begin() as connection:
+            return [
+                [tuple(row) for row in result.all()] if result.returns_rows else []
+                for result in [await connection.execute(text(sql)) for sql in statements]
+            ]
+    finally:
+        await engine.dispose()
+
+
+def _reset_schema():
+    asyncio.run(_execute([
+        'DROP SCHEMA public CASCADE',
+        'CREATE SCHEMA public',
+    ]))
+
+
+@pytest.fixture
+def empty_schema():
+    _reset_schema()
+    yield
+    _reset_schema()
+
+
+@pytest.mark.usefixtures('empty_schema')
+def test_case_duplicates_are_merged():
+    config = _alembic_config()
+    command.upgrade(config, BEFORE_NORMALIZED_WORDS)
+    asyncio.run(_execute(CASE_DUPLICATES_SQL))
+
+    command.upgrade(config, NORMALIZED_WORDS)
+
+    words, definitions, examples, translations, synonyms, counters = asyncio.run(_execute([
+        'SELECT id, language, word, normalized, version FROM words ORDER BY id',
+        'SELECT word_id, word_language, text_id FROM word_definitions',
+        'SELECT word_id, word_language, text_id FROM word_examples',
+        """
+        SELECT from_word_id, from_word_language, to_word_id, to_word_language
+        FROM word_translations ORDER BY from_word_id
+        """,
+        """
+        SELECT from_word_id, from_word_language, to_word_id, to_word_language
+        FROM word_synonyms ORDER BY from_word_id
+        """,
+        'SELECT language, words, deleted FROM word_counters ORDER BY language',
+    ]))
+
+    # The actual word is kept and its cached representations are stale
+    assert words == [
+        (1, 'en', 'CAR', 'car', 2),
+        (3, 'ru', 'машина', 'машина', 1),
+        (4, 'en', 'auto', 'auto', 1),
+    ]
+    assert definitions == [(1, 'en', 1)]
+    assert examples == [(1, 'en', 2)]
+    assert translations == [(1, 'en', 3, 'ru'), (3, 'ru', 1, 'en')]
+    # The synonym "CAR" of "car" would link the word to itself
+    assert synonyms == [(1, 'en', 4, 'en')]
+    assert counters == [('en', 2, 0), ('ru', 1, 0)]
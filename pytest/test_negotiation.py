@@ -0,0 +1,27 @@
+import pytest
+from fastapi import Request
+
+from gtservice.api.negotiation import accepts_msgpack
+
+
+def _request(accept: str | None) -> Request:
+    headers = [] if accept is None else [(b'accept', accept.encode())]
+    return Request({'type': 'http', 'headers': headers})
+
+
+@pytest.mark.parametrize(
+    'accept, expected',
+    [
+        (None, False),
+        ('*/*', False),
+        ('application/json', False),
+        ('application/msgpack', True),
+        ('application/x-msgpack', True),
+        ('application/json;q=0.5, application/msgpack', True),
+        ('application/json, application/msgpack;q=0.5', False),
+        ('application/msgpack;q=0', False),
+        ('application/msgpack, */*', True),
+    ],
+)
+def test_accepts_msgpack(accept: str | None, expected: bool):
+    assert accepts_msgpack(_request(accept)) is expected
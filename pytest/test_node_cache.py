@@ -0,0 +1,53 @@
+import pytest
+
+from gtservice.node_cache import CachedResponse, NodeCache, word_key
+
+
+def _make_cache(path: str, **kwargs) -> NodeCache:
+    params = dict(path=path, max_bytes=1024 * 1024, ttl=60, busy_timeout=1)
+    params.update(kwargs)
+    cache = NodeCache(**params)
+    cache.open()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_entries_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'cache' / 'node-cache.sqlite3')
+    first, second = _make_cache(path), _make_cache(path)
+    key = word_key('interesting', 'en')
+    response = CachedResponse(body=b'{"word":"interesting"}', headers={'ETag': 'W/"1-1"'})
+
+    try:
+        await first.set(key, response)
+        assert second.get(key) == response
+
+        await second.delete([key])
+        assert first.get(key) is None
+    finally:
+        first.close()
+        second.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses(tmp_path):
+    cache = _make_cache(str(tmp_path / 'node-cache.sqlite3'), ttl=-1)
+    try:
+        await cache.set('key', CachedResponse(body=b'{}', headers={}))
+        assert cache.get('key') is None
+    finally:
+        cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_size_is_bounded(tmp_path):
+    cache = _make_cache(str(tmp_path / 'node-cache.sqlite3'), max_bytes=256 * 1024)
+    try:
+        for index in range(200):
+            await cache.set(str(index), CachedResponse(body=b'x' * 4096, headers={}))
+
+        assert cache._used_bytes() <= 256 * 1024 + 8192
+        assert cache.get('199') is not None
+        assert cache.get('0') is None
+    finally:
+        cache.close()
@@ -0,0 +1,80 @@
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from gtservice import settings
+from gtservice.profiling import (
+    RequestProfile,
+    current_profile,
+    install_sql_hooks,
+    is_profiling_allowed,
+    request_profile,
+    track_span,
+)
+
+
+def test_statements_counted_without_details():
+    profile = RequestProfile(detailed=False)
+    profile.add_statement('SELECT 1', 0.5, 1)
+    profile.add_statement('SELECT 2', 0.25, 1)
+
+    assert profile.statements_count == 2
+    assert profile.db_time == 0.75
+    assert profile.statements == []
+
+
+def test_server_timing_aggregates_spans():
+    with request_profile(detailed=True) as profile:
+        profile.add_statement('SELECT 1', 0.002, 1)
+        with track_span('upstream'):
+            pass
+        with track_span('upstream'):
+            pass
+
+    server_timing = profile.server_timing(0.01)
+
+    assert len(profile.spans) == 2
+    assert server_timing.startswith('db;dur=2.00;desc="1 statements", upstream;dur=')
+    assert server_timing.endswith('total;dur=10.00')
+
+
+def test_profile_is_current_only_inside_the_block():
+    with request_profile(detailed=False) as outer:
+        with request_profile(detailed=True) as inner:
+            assert current_profile() is inner
+        assert current_profile() is outer
+
+    assert current_profile() is None
+
+
+def test_profiling_is_disabled_by_default(mocker: MockerFixture):
+    mocker.patch.object(settings, 'PROFILING_ALLOWED_HOSTS', {'127.0.0.1'})
+
+    assert not settings.PROFILING_ENABLED
+    assert not is_profiling_allowed('127.0.0.1')
+
+    mocker.patch.object(settings, 'PROFILING_ENABLED', True)
+    assert is_profiling_allowed('127.0.0.1')
+    assert not is_profiling_allowed('10.0.0.1')
+    assert not is_profiling_allowed(None)
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_leaves_nothing_behind():
+    install_sql_hooks()
+    engine = create_async_engine(settings.DB_CONNECTION_STRING)
+    try:
+        async with engine.connect() as conn:
+            with request_profile(detailed=True) as profile:
+                with pytest.raises(DBAPIError):
+                    await conn.execute(text('SELECT * FROM missing_table'))
+                await conn.rollback()
+                await conn.execute(text('SELECT 1'))
+            info = dict(conn.sync_connection.info)
+    finally:
+        await engine.dispose()
+
+    assert [item.statement for item in profile.statements] == ['SELECT 1']
+    assert info == {}
@@ -0,0 +1,167 @@
+import asyncio
+import shutil
+
+import pytest
+from aiohttp import web
+from pytest_mock import MockerFixture
+
+from gtservice import settings
+from gtservice.translation_loader.google import GoogleReplayProvider, GoogleTranslateProvider
+from gtservice.translation_loader.loader import (
+    HedgedTranslationLoader, close_translation_loader, get_translation_loader
+)
+from gtservice.translation_loader.providers import (
+    LatencyStats, TranslationNotFoundError, TranslationProvider
+)
+from gtservice.translation_loader.schemas import TranslatedWordSchema, WordSchema, Language
+
+
+class FakeProvider(TranslationProvider):
+    def __init__(self, name: str, delay: float, fail: bool = False):
+        super().__init__(name, LatencyStats(window=10, min_samples=1))
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def _fetch(
+            self, word: str, source_language: Language, translation_language: Language
+    ) -> TranslatedWordSchema:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise TranslationNotFoundError(word)
+
+        return TranslatedWordSchema(
+            word=WordSchema(word, source_language),
+            translation_language=translation_language,
+            translations=[WordSchema(self.name, translation_language)],
+            synonyms=[],
+            definitions=[],
+            examples=[],
+        )
+
+
+@pytest.fixture
+def short_hedge_delay(mocker: MockerFixture):
+    mocker.patch.object(settings, 'TRANSLATION_HEDGE_DELAY', 0.01)
+
+
+@pytest.mark.usefixtures('short_hedge_delay')
+@pytest.mark.asyncio
+async def test_stalled_primary_is_hedged():
+    primary, backup = FakeProvider('primary', delay=10), FakeProvider('backup', delay=0)
+    loader = HedgedTranslationLoader([primary, backup])
+
+    result = await asyncio.wait_for(loader.fetch('car', 'en', 'ru'), 1)
+
+    assert result.translations[0].word == 'backup'
+    assert backup.stats.percentile(0.95) is not None
+
+
+@pytest.mark.usefixtures('short_hedge_delay')
+@pytest.mark.asyncio
+async def test_lost_and_failed_requests_are_timed():
+    stalled, failing = FakeProvider('stalled', delay=10), FakeProvider('failing', delay=0, fail=True)
+    backup = FakeProvider('backup', delay=0)
+
+    await HedgedTranslationLoader([stalled, backup]).fetch('car', 'en', 'ru')
+    await HedgedTranslationLoader([failing, backup]).fetch('car', 'en', 'ru')
+
+    # The cancelled request ran at least until the hedge was sent
+    assert stalled.stats.percentile(0.95) >= 0.01
+    assert failing.stats.percentile(0.95) is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_falls_back_without_waiting():
+    primary, backup = FakeProvider('primary', delay=0, fail=True), FakeProvider('backup', delay=0)
+    loader = HedgedTranslationLoader([primary, backup])
+
+    result = await asyncio.wait_for(loader.fetch('car', 'en', 'ru'), 0.5)
+
+    assert result.translations[0].word == 'backup'
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    primary, backup = FakeProvider('primary', delay=0), FakeProvider('backup', delay=0)
+    loader = HedgedTranslationLoader([primary, backup])
+
+    result = await loader.fetch('car', 'en', 'ru')
+
+    assert result.translations[0].word == 'primary'
+    assert backup.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failed():
+    loader = HedgedTranslationLoader([FakeProvider('primary', delay=0, fail=True)])
+
+    with pytest.raises(TranslationNotFoundError):
+        await loader.fetch('car', 'en', 'ru')
+
+
+def test_latency_percentile():
+    stats = LatencyStats(window=100, min_samples=10)
+    for value in range(1, 101):
+        stats.record(value)
+
+    assert stats.percentile(0.95) == 95
+    assert LatencyStats(window=100, min_samples=10).percentile(0.95) is None
+
+
+@pytest.mark.asyncio
+async def test_replay_provider(tmp_path):
+    shutil.copy('./pytest/files/testing_data_gt.json', tmp_path / 'en-ru-interesting.json')
+    provider = GoogleReplayProvider('replay', LatencyStats(window=10, min_samples=1), str(tmp_path))
+
+    result = await provider.fetch('interesting', 'en', 'ru')
+
+    assert result.word == WordSchema('interesting', 'en')
+    assert len(result.translations) > 0
+    with pytest.raises(TranslationNotFoundError):
+        await provider.fetch('unknown', 'en', 'ru')
+
+
+def test_google_session_follows_the_event_loop():
+    with open('./pytest/files/testing_data_gt.json', 'rb') as file:
+        raw_body = file.read()
+
+    async def translate(request: web.Request) -> web.Response:
+        return web.Response(body=raw_body, content_type='application/json')
+
+    async def fetch(provider: GoogleTranslateProvider) -> TranslatedWordSchema:
+        app = web.Application()
+        app.router.add_get('/translate_a/single', translate)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        provider._url = f'http://127.0.0.1:{port}/translate_a/single'
+        try:
+            return await provider.fetch('interesting', 'en', 'ru')
+        finally:
+            await runner.cleanup()
+
+    provider = GoogleTranslateProvider('google', LatencyStats(window=10, min_samples=1))
+    sessions = []
+    # Like test modules or lifespans running in separate loops
+    for _ in range(2):
+        assert asyncio.run(fetch(provider)).translations
+        sessions.append(provider._session)
+
+    asyncio.run(provider.close())
+
+    assert sessions[0] is not sessions[1]
+    assert all(session.closed for session in sessions)
+
+
+@pytest.mark.asyncio
+async def test_closed_loader_is_built_again():
+    loader = get_translation_loader()
+
+    await close_translation_loader()
+
+    assert get_translation_loader() is not loader
+    await close_translation_loader()
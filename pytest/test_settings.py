@@ -0,0 +1,48 @@
+import importlib
+import re
+
+import pytest
+
+from gtservice import settings
+
+
+@pytest.fixture
+def reload_settings(monkeypatch):
+    yield lambda: importlib.reload(settings)
+    monkeypatch.undo()
+    importlib.reload(settings)
+
+
+def test_empty_compose_variables_fall_back_to_defaults(monkeypatch, reload_settings):
+    with open('docker-compose.yml') as file:
+        names = re.findall(r'"\$\{([A-Z_]+)\}"', file.read())
+    assert 'DB_POOL_TIMEOUT' in names
+    for name in names:
+        monkeypatch.setenv(name, '')
+
+    reload_settings()
+
+    assert settings.DB_CONNECTION_STRING is None
+    assert settings.DB_POOL_SIZE == 10
+    assert settings.DB_POOL_TIMEOUT == 30
+    assert settings.DB_POOL_PRE_PING is False
+    assert settings.ADMISSION_MAX_IN_FLIGHT_MISSES == 5
+    assert settings.TRANSLATION_PROVIDERS == ['google']
+    assert settings.LIST_COUNT_DEFAULT_MODE == 'exact'
+    assert settings.LOG_FORMAT == 'json'
+    assert settings.DB_REPLICA_CONNECTION_STRINGS == []
+
+
+def test_values_are_parsed(monkeypatch, reload_settings):
+    monkeypatch.setenv('DB_POOL_SIZE', '4')
+    monkeypatch.setenv('REQUEST_DEADLINE', '2.5')
+    monkeypatch.setenv('WRITE_BEHIND_ENABLED', 'True')
+    monkeypatch.setenv('TRANSLATION_PROVIDERS', 'replay:/data, google,')
+
+    reload_settings()
+
+    assert settings.DB_POOL_SIZE == 4
+    assert settings.ADMISSION_MAX_IN_FLIGHT_MISSES == 2
+    assert settings.REQUEST_DEADLINE == 2.5
+    assert settings.WRITE_BEHIND_ENABLED is True
+    assert settings.TRANSLATION_PROVIDERS == ['replay:/data', 'google']
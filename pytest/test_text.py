@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.api.text_translations import _translate_tokens
+from gtservice.db import database
+from gtservice.logic.text import tokenize
+from gtservice.translation_loader.schemas import (
+    TranslatedWordSchema, WordSchema, normalize_word
+)
+
+
+def test_tokenize_dedupes_and_keeps_order():
+    tokens = tokenize("The car, the CAR! Don’t stop 42 well-known cars", 64)
+
+    assert [(token.word, token.positions) for token in tokens] == [
+        ('the', [0, 2]),
+        ('car', [1, 3]),
+        ("don't", [4]),
+        ('stop', [5]),
+        ('well-known', [6]),
+        ('cars', [7]),
+    ]
+
+
+def test_tokenize_skips_long_words():
+    assert [token.word for token in tokenize('a bbbbbb c', 3)] == ['a', 'c']
+
+
+def test_normalize_word():
+    assert normalize_word('  New   York ') == 'new york'
+    assert normalize_word('Straße') == 'strasse'
+    # Decomposed "é" is composed
+    assert normalize_word('Cafe\u0301') == 'caf\u00e9'
+
+
+@pytest.mark.asyncio
+async def test_missing_words_dont_hold_a_connection(
+        db_session: AsyncSession, mocker: MockerFixture
+):
+    async def fetch_word(word, source_language, translation_language, semaphore):
+        return TranslatedWordSchema(
+            word=WordSchema(word, source_language),
+            translation_language=translation_language,
+            translations=[WordSchema(f'{word}-ru', translation_language)],
+            synonyms=[],
+            examples=[],
+            definitions=[],
+        )
+
+    mocker.patch('gtservice.api.text_translations._fetch_word', side_effect=fetch_word)
+
+    lines = []
+    async for line in _translate_tokens(tokenize('red car', 64), 'en', 'ru'):
+        assert database.engine.pool.checkedout() == 0
+        lines.append(json.loads(line))
+
+    assert [line['word'] for line in lines] == ['red', 'car']
+    assert [line['result']['translations'] for line in lines] == [
+        [{'word': 'red-ru', 'language': 'ru'}], [{'word': 'car-ru', 'language': 'ru'}],
+    ]
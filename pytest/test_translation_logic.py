@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.db import database_session_context
+from gtservice.db.models import TextModel, WordModel
+from gtservice.db.routing import use_primary
+from gtservice.logic.translation import insert_or_update_translation, merge_translation
+from gtservice.translation_loader.schemas import TranslatedWordSchema, WordSchema, TextSchema
+
+
+def _make_word(word: str, examples: list[str]) -> TranslatedWordSchema:
+    return TranslatedWordSchema(
+        word=WordSchema(word, 'en'),
+        translation_language='ru',
+        translations=[],
+        synonyms=[],
+        examples=[TextSchema(text) for text in examples],
+        definitions=[TextSchema('shared definition')],
+    )
+
+
+@pytest.mark.asyncio
+async def test_texts_are_shared_between_words(db_session: AsyncSession):
+    await insert_or_update_translation(
+        db_session, _make_word('render', ['shared example', 'render example'])
+    )
+    word_model = await insert_or_update_translation(
+        db_session, _make_word('provide', ['shared example', 'shared example'])
+    )
+
+    assert [item.text for item in word_model.examples] == ['shared example']
+    assert [item.text for item in word_model.definitions] == ['shared definition']
+
+    texts_count = (await db_session.execute(
+        select(func.count()).select_from(TextModel)
+    )).scalar_one()
+    assert texts_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_share_new_texts(db_session: AsyncSession):
+    async with database_session_context() as first, database_session_context() as second:
+        use_primary(first)
+        use_primary(second)
+        await merge_translation(first, _make_word('render', ['shared example']))
+        await first.flush()
+
+        # Waits for the first transaction on the texts both of them insert
+        merging = asyncio.create_task(
+            merge_translation(second, _make_word('provide', ['shared example']))
+        )
+        await asyncio.sleep(0.1)
+        await first.commit()
+        await merging
+        await second.commit()
+
+    texts = (await db_session.execute(select(TextModel.text).order_by(TextModel.text))).scalars()
+    assert list(texts) == ['shared definition', 'shared example']
+
+    word_model = await WordModel.get_full_word(db_session, 'provide', 'en')
+    assert [item.text for item in word_model.examples] == ['shared example']
+
+
+@pytest.mark.asyncio
+async def test_words_by_list_match_language(db_session: AsyncSession):
+    await insert_or_update_translation(db_session, _make_word('render', []))
+    await insert_or_update_translation(db_session, TranslatedWordSchema(
+        word=WordSchema('render', 'de'),
+        translation_language='en',
+        translations=[],
+        synonyms=[],
+        examples=[],
+        definitions=[],
+    ))
+
+    words = await WordModel.get_words_by_list(
+        db_session, [WordSchema('render', 'de'), WordSchema('missing', 'en')]
+    )
+
+    assert [word.as_tuple() for word in words] == [('render', 'de')]
+
+
+@pytest.mark.asyncio
+async def test_case_variants_share_a_row(db_session: AsyncSession):
+    await insert_or_update_translation(db_session, _make_word('Car', []))
+    word_model = await insert_or_update_translation(db_session, TranslatedWordSchema(
+        word=WordSchema('car', 'en'),
+        translation_language='ru',
+        translations=[WordSchema('Машина', 'ru'), WordSchema('машина ', 'ru')],
+        synonyms=[WordSchema('CAR', 'en'), WordSchema('Auto', 'en')],
+        examples=[],
+        definitions=[],
+    ))
+
+    assert word_model.as_tuple() == ('Car', 'en')
+    assert [item.word for item in word_model.translations] == ['Машина']
+    assert [item.word for item in word_model.synonyms] == ['Auto']
+
+    found = await WordModel.get_full_word(db_session, ' CAR', 'en')
+    assert found is not None and found.id == word_model.id
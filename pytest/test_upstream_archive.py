@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from aiohttp import web
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.db.models import UpstreamResponseModel, WordModel
+from gtservice.logic.upstream_archive import UpstreamArchive, decompress_body
+from gtservice.reparse import reparse
+from gtservice.translation_loader.google import GOOGLE_BODY_SOURCE, GoogleTranslateProvider
+from gtservice.translation_loader.providers import LatencyStats
+
+
+def _read_body(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _archive() -> UpstreamArchive:
+    return UpstreamArchive(flush_interval=60, max_pending=10, compression_level=6)
+
+
+@pytest.mark.asyncio
+async def test_fetched_bodies_are_archived(db_session: AsyncSession):
+    raw_body = _read_body('./pytest/files/testing_data_gt.json')
+
+    async def translate(request: web.Request) -> web.Response:
+        return web.Response(body=raw_body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/translate_a/single', translate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    archive = _archive()
+    archive.start()
+    provider = GoogleTranslateProvider(
+        'google', LatencyStats(window=10, min_samples=1),
+        url=f'http://127.0.0.1:{port}/translate_a/single', archive=archive,
+    )
+    try:
+        info = await provider.fetch('interesting', 'en', 'ru')
+        await archive.stop()
+    finally:
+        await provider.close()
+        await runner.cleanup()
+
+    assert info.translations
+    response = (await db_session.execute(select(UpstreamResponseModel))).scalar_one()
+    assert (response.source, response.source_language, response.translation_language) == (
+        GOOGLE_BODY_SOURCE, 'en', 'ru'
+    )
+    assert response.word == 'interesting'
+    assert json.loads(response.params)['q'] == 'interesting'
+    assert decompress_body(response.encoding, response.body) == raw_body
+    assert len(response.body) < len(raw_body)
+
+
+@pytest.mark.asyncio
+async def test_latest_body_replaces_the_stored_one(db_session: AsyncSession):
+    archive = _archive()
+    archive.start()
+
+    archive.record(GOOGLE_BODY_SOURCE, 'en', 'ru', 'car', {'q': 'car'}, b'{"old": 1}')
+    await archive.flush()
+    archive.record(GOOGLE_BODY_SOURCE, 'en', 'ru', 'car', {'q': 'car'}, b'{"new": 1}')
+    await archive.stop()
+
+    response = (await db_session.execute(select(UpstreamResponseModel))).scalar_one()
+    assert decompress_body(response.encoding, response.body) == b'{"new": 1}'
+
+
+@pytest.mark.asyncio
+async def test_reparse_merges_archived_words(db_session: AsyncSession):
+    archive = _archive()
+    archive.start()
+    for word, path in [
+        ('interesting', './pytest/files/testing_data_gt.json'),
+        ('appealing', './pytest/files/testing_data_gt_2.json'),
+    ]:
+        archive.record(GOOGLE_BODY_SOURCE, 'en', 'ru', word, {'q': word}, _read_body(path))
+    archive.record(GOOGLE_BODY_SOURCE, 'en', 'ru', 'broken', {'q': 'broken'}, b'{}')
+    archive.record(GOOGLE_BODY_SOURCE, 'de', 'ru', 'auto', {'q': 'auto'}, b'{}')
+    await archive.stop()
+
+    stats = await reparse(source_language='en', batch_size=2, concurrency=2)
+
+    assert (stats.read, stats.merged, stats.parse_failed, stats.merge_failed) == (3, 2, 1, 0)
+    for word in ['interesting', 'appealing']:
+        word_model = await WordModel.get_full_word(db_session, word, 'en')
+        assert word_model is not None
+        assert word_model.translations and word_model.synonyms
+    assert await WordModel.get_full_word(db_session, 'broken', 'en') is None
+
+
+@pytest.mark.asyncio
+async def test_parallel_batches_share_new_words(db_session: AsyncSession):
+    archive = _archive()
+    archive.start()
+    words = [f'word{index}' for index in range(8)]
+    for word in words:
+        body = json.dumps({
+            'sentences': [{'trans': 'общее'}, {'trans': word}],
+            'synsets': [{'entry': [{'synonym': ['common']}]}],
+            'definitions': [{'entry': [{'gloss': 'shared', 'example': 'shared'}]}],
+            'examples': {'example': []},
+        })
+        archive.record(GOOGLE_BODY_SOURCE, 'en', 'ru', word, {'q': word}, body.encode())
+    await archive.stop()
+
+    stats = await reparse(source_language='en', batch_size=1, concurrency=8)
+
+    assert (stats.read, stats.merged, stats.merge_failed) == (8, 8, 0)
+    for word in words:
+        word_model = await WordModel.get_full_word(db_session, word, 'en')
+        assert sorted(item.word for item in word_model.translations) == [word, 'общее']
+        assert [item.word for item in word_model.synonyms] == ['common']
+        assert [item.text for item in word_model.definitions] == ['shared']
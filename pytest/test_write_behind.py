@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gtservice.api.translations import TranslatedWordResponse
+from gtservice.db.models import WordModel
+from gtservice.logic.write_behind import WriteBehindQueue
+from gtservice.translation_loader.schemas import TextSchema, TranslatedWordSchema, WordSchema
+
+
+class RecordingQueue(WriteBehindQueue):
+    def __init__(self, failing: set[str] = frozenset(), **kwargs):
+        super().__init__(**kwargs)
+        self.failing = failing
+        self.batches = []
+
+    async def _persist(self, batch):
+        if any(info.word.word in self.failing for info in batch):
+            return False
+        self.batches.append([info.word.word for info in batch])
+        return True
+
+
+def _make_word(word: str, translation: str = 'перевод') -> TranslatedWordSchema:
+    return TranslatedWordSchema(
+        word=WordSchema(word, 'en'),
+        translation_language='ru',
+        translations=[WordSchema(translation, 'ru')],
+        synonyms=[],
+        examples=[],
+        definitions=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_words_are_batched_and_flushed_on_stop():
+    queue = RecordingQueue(
+        max_size=10, batch_size=3, batch_delay=0.05, max_retries=0, retry_delay=0
+    )
+    queue.start()
+
+    for word in ['one', 'two', 'one', 'three']:
+        await queue.submit(_make_word(word, translation=word))
+    assert queue.pending('one', 'en').translations[0].word == 'one'
+
+    await queue.stop(timeout=1)
+
+    assert queue.batches == [['one', 'two'], ['three']]
+    assert queue.pending('one', 'en') is None
+    assert not queue.running
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_word_by_word():
+    queue = RecordingQueue(
+        failing={'broken'},
+        max_size=10, batch_size=3, batch_delay=0.05, max_retries=0, retry_delay=0,
+    )
+    queue.start()
+
+    for word in ['good', 'broken', 'fine']:
+        await queue.submit(_make_word(word))
+
+    await queue.stop(timeout=1)
+
+    assert queue.batches == [['good'], ['fine']]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_submit_leaves_nothing_pending():
+    release = asyncio.Event()
+
+    class BlockedQueue(RecordingQueue):
+        async def _persist(self, batch):
+            await release.wait()
+            return await super()._persist(batch)
+
+    queue = BlockedQueue(
+        max_size=1, batch_size=1, batch_delay=0, max_retries=0, retry_delay=0
+    )
+    queue.start()
+
+    # "one" is being written, "two" fills the queue
+    for word in ['one', 'two']:
+        await queue.submit(_make_word(word))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.submit(_make_word('three')), 0.01)
+    assert queue.pending('three', 'en') is None
+
+    release.set()
+    await queue.stop(timeout=1)
+
+    assert queue.batches == [['one'], ['two']]
+
+
+def _sorted_response(response: TranslatedWordResponse) -> TranslatedWordResponse:
+    # Links are loaded in no particular order
+    return TranslatedWordResponse(
+        word=response.word,
+        language=response.language,
+        translations=sorted(response.translations, key=lambda item: item.word),
+        synonyms=sorted(response.synonyms, key=lambda item: item.word),
+        definitions=sorted(response.definitions, key=lambda item: item.text),
+        examples=sorted(response.examples, key=lambda item: item.text),
+    )
+
+
+@pytest.mark.asyncio
+async def test_pending_response_matches_persisted_word(db_session: AsyncSession):
+    info = TranslatedWordSchema(
+        word=WordSchema('Car', 'en'),
+        translation_language='ru',
+        translations=[
+            WordSchema('Машина', 'ru'), WordSchema('машина', 'ru'), WordSchema('авто', 'ru'),
+        ],
+        synonyms=[
+            WordSchema('auto', 'en'), WordSchema('CAR', 'en'),
+            WordSchema('Auto', 'en'), WordSchema('vehicle', 'en'),
+        ],
+        examples=[TextSchema('my car'), TextSchema('my car')],
+        definitions=[TextSchema('a road vehicle')],
+    )
+    queue = WriteBehindQueue(
+        max_size=10, batch_size=10, batch_delay=0, max_retries=0, retry_delay=0
+    )
+    queue.start()
+    await queue.submit(info)
+    pending = TranslatedWordResponse.from_schema(queue.pending('car', 'en'))
+    await queue.stop(timeout=1)
+
+    word_model = await WordModel.get_full_word(db_session, 'car', 'en')
+    persisted = TranslatedWordResponse.from_model(word_model)
+
+    assert _sorted_response(pending) == _sorted_response(persisted)
+    assert [item.word for item in pending.translations] == ['Машина', 'авто']
+    assert [item.word for item in pending.synonyms] == ['auto', 'vehicle']